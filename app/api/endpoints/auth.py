@@ -1,11 +1,12 @@
 from datetime import timedelta
-from typing import Any
+from typing import Any, Optional
 
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from pydantic import BaseModel
 
 from app.core.config import settings
-from app.core.security import TEST_USERS, create_access_token
+from app.core.security import TEST_USERS, create_access_token, decode_token, token_cache
 
 router = APIRouter()
 
@@ -58,10 +59,19 @@ async def login(login_data: LoginRequest) -> Any:
 
 
 @router.post("/logout")
-async def logout() -> Any:
+async def logout(
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(HTTPBearer(auto_error=False))
+) -> Any:
     """
-    Logout endpoint - for JWT tokens, logout is handled client-side.
+    Logout endpoint - revokes the presented token until it expires.
     """
+    if credentials:
+        token = credentials.credentials
+        # Only genuine tokens are remembered, so junk can't crowd out real
+        # revocations
+        claims = token_cache.get(token) or decode_token(token)
+        if claims is not None:
+            token_cache.revoke(token, claims)
     return {"message": "Successfully logged out"}
 
 
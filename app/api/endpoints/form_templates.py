@@ -1,23 +1,67 @@
-from typing import Annotated, Optional
+from typing import Annotated, Any, Dict, Optional
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, Path, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Path, Query, Request, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.dependencies import get_current_user_id, get_pagination_params
 from app.core.security import User, get_current_user
 from app.db.session import get_db
 from app.schemas.form_template import (
+    FormTemplateClone,
     FormTemplateCreate,
     FormTemplatePagination,
     FormTemplateResponse,
     FormTemplateUpdate,
 )
 from app.services import form_template as template_service
+from app.services import template_schema as schema_service
+from app.services.derived_fields import FormulaError, compile_derived_fields
+from app.services.template_blob import hash_content
+from app.services.template_logic import LogicError, compile_template
 
 router = APIRouter()
 
 
+async def _check_template(sections: Optional[Dict[str, Any]], logic: Optional[Dict[str, Any]]) -> None:
+    try:
+        compile_template(sections, logic)
+    except LogicError as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"Invalid template logic: {e}"
+        )
+    try:
+        compile_derived_fields(sections)
+    except FormulaError as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"Invalid calculation: {e}"
+        )
+    try:
+        await schema_service.check_schema(sections, logic)
+    except schema_service.SchemaError as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"Invalid validation rules: {e}"
+        )
+
+
+def _etag_matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    tags = [tag.strip() for tag in header.split(",")]
+    return "*" in tags or etag in tags or f"W/{etag}" in tags
+
+
+def _not_modified(etag: str, cache_control: Optional[str] = None) -> Response:
+    headers = {"ETag": etag}
+    if cache_control:
+        headers["Cache-Control"] = cache_control
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+
 @router.post(
     "/", response_model=FormTemplateResponse, status_code=status.HTTP_201_CREATED
 )
@@ -29,6 +73,8 @@ async def create_template(
     """
     Create a new form template.
     """
+    await _check_template(template_in.sections, template_in.logic)
+    
     template = await template_service.create_template(
         db=db, obj_in=template_in, created_by=UUID(current_user_id)
     )
@@ -65,39 +111,146 @@ async def list_templates(
 @router.get("/{template_id}", response_model=FormTemplateResponse)
 async def get_template(
     template_id: Annotated[UUID, Path(title="The ID of the template to get")],
+    request: Request,
+    response: Response,
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
     """
-    Get a specific form template by ID.
+    Get a specific form template by ID. The ETag is the content hash plus
+    the last metadata change.
     """
     template = await template_service.get_template(db=db, template_id=template_id)
     if not template:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Form template not found"
         )
+    etag = f'"{template.content_hash}-{int(template.updated_at.timestamp() * 1000)}"'
+    if _etag_matches(request, etag):
+        return _not_modified(etag)
+    response.headers["ETag"] = etag
     return template
 
 
-@router.patch("/{template_id}", response_model=FormTemplateResponse)
-async def update_template(
-    template_id: Annotated[UUID, Path(title="The ID of the template to update")],
-    template_in: FormTemplateUpdate,
+@router.get("/{template_id}/content", response_model=Dict[str, Any])
+async def get_template_content(
+    template_id: Annotated[UUID, Path(title="The ID of the template")],
+    request: Request,
+    response: Response,
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
     """
-    Update a form template.
+    Get the sections, side headers and logic of a template. The ETag is the
+    content hash, so clones and metadata-only changes revalidate with a 304.
     """
     template = await template_service.get_template(db=db, template_id=template_id)
     if not template:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Form template not found"
         )
+    etag = f'"{template.content_hash}"'
+    if _etag_matches(request, etag):
+        return _not_modified(etag)
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = "private, no-cache"
+    return {
+        "sections": template.sections,
+        "side_headers": template.side_headers,
+        "logic": template.logic,
+    }
+
+
+@router.get("/{template_id}/versions/{version}/schema")
+async def get_template_schema(
+    template_id: Annotated[UUID, Path(title="The ID of the template")],
+    version: Annotated[int, Path(title="The template version")],
+    request: Request,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Get the JSON Schema for form data of a template version. A version's
+    schema never changes once published, so it is served as immutable.
+    """
+    published = await schema_service.get_schema(db=db, template_id=template_id, version=version)
+    if not published:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Template version not found"
+        )
+    cache_control = "private, max-age=31536000, immutable"
+    if _etag_matches(request, published.etag):
+        return _not_modified(published.etag, cache_control)
+    return Response(
+        content=published.document,
+        media_type="application/schema+json",
+        headers={"ETag": published.etag, "Cache-Control": cache_control},
+    )
+
+
+@router.post(
+    "/{template_id}/clone",
+    response_model=FormTemplateResponse,
+    status_code=status.HTTP_201_CREATED,
+)
+async def clone_template(
+    template_id: Annotated[UUID, Path(title="The ID of the template to clone")],
+    clone_in: FormTemplateClone,
+    db: AsyncSession = Depends(get_db),
+    current_user_id: str = Depends(get_current_user_id),
+):
+    """
+    Clone a form template, optionally with a new name, version or
+    description. The clone shares the source's content.
+    """
+    template = await template_service.clone_template(
+        db=db, template_id=template_id, obj_in=clone_in, created_by=UUID(current_user_id)
+    )
+    if not template:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Form template not found"
+        )
+    return template
+
+
+@router.patch("/{template_id}", response_model=FormTemplateResponse)
+async def update_template(
+    template_id: Annotated[UUID, Path(title="The ID of the template to update")],
+    template_in: FormTemplateUpdate,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Update a form template.
+    """
+    content_fields = {"sections", "side_headers", "logic"} & template_in.model_fields_set
+    if content_fields or template_in.version is not None:
+        current = await template_service.get_template(db=db, template_id=template_id)
+        if current:
+            content = {
+                field: getattr(template_in if field in content_fields else current, field)
+                for field in ("sections", "side_headers", "logic")
+            }
+            if content_fields:
+                await _check_template(content["sections"], content["logic"])
+            # A published version's schema is immutable, so is its content:
+            # no edit (or version change) may pair it with other content
+            content_hash = hash_content(**content)[0] if content_fields else current.content_hash
+            version = template_in.version if template_in.version is not None else current.version
+            published_hash = await schema_service.published_content_hash(db, template_id, version)
+            if published_hash is not None and published_hash != content_hash:
+                raise HTTPException(
+                    status_code=status.HTTP_409_CONFLICT,
+                    detail=f"Version {version} is published with other content; use a new version number"
+                )
     
     updated_template = await template_service.update_template(
         db=db, template_id=template_id, obj_in=template_in
     )
+    if not updated_template:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Form template not found"
+        )
     return updated_template
 
 
@@ -110,15 +263,8 @@ async def delete_template(
     """
     Delete a form template.
     """
-    template = await template_service.get_template(db=db, template_id=template_id)
-    if not template:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="Form template not found"
-        )
-    
     success = await template_service.delete_template(db=db, template_id=template_id)
     if not success:
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, 
-            detail="Failed to delete template"
+            status_code=status.HTTP_404_NOT_FOUND, detail="Form template not found"
         )
\ No newline at end of file
@@ -1,12 +1,17 @@
+import csv
+import io
+import json
 from typing import Annotated, Optional, Dict, Any
 from uuid import UUID
 
 from fastapi import APIRouter, Depends, HTTPException, Path, Query, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel
 
 from app.api.dependencies import get_current_user_id, get_pagination_params
 from app.core.security import User, get_current_user
+from app.db.base import AsyncSessionLocal
 from app.db.session import get_db
 from app.schemas.form import (
     FormCreate,
@@ -18,10 +23,52 @@ from app.schemas.form import (
     FormUpdate,
 )
 from app.services import form as form_service
+from app.services import form_template as template_service
+from app.services import template_schema as schema_service
 from app.services import volunteer as volunteer_service
+from app.services.derived_fields import derived_fields
+from app.services.template_logic import compiled_logic
 
 router = APIRouter()
 
+# Bytes of CSV buffered before each chunk of a streamed export
+CSV_CHUNK_SIZE = 64 * 1024
+# Leading characters that make spreadsheets evaluate a cell as a formula
+CSV_FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+
+def _csv_safe(value: Any) -> Any:
+    """Quote text a spreadsheet would run as a formula (CSV injection)"""
+    if isinstance(value, str) and value.startswith(CSV_FORMULA_PREFIXES):
+        try:
+            float(value)  # A negative number is just a number
+        except ValueError:
+            return "'" + value
+    return value
+
+
+async def _check_submission(
+    db: AsyncSession, template_id: UUID, data: Optional[Dict[str, Any]]
+) -> None:
+    missing = await template_service.missing_required_fields(
+        db=db, template_id=template_id, data=data
+    )
+    if missing is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Form template not found"
+        )
+    if missing:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail={"message": "Required fields are missing", "fields": missing},
+        )
+    error = await schema_service.validation_error(db=db, template_id=template_id, data=data)
+    if error:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail={"message": "Form data does not match the template schema", "error": error},
+        )
+
 
 # New schemas for bulk submission
 class FormSubmissionData(BaseModel):
@@ -77,17 +124,43 @@ async def bulk_submit_forms(
                 detail="Volunteer not found"
             )
 
-        # Create forms for each form in the submission
-        created_forms = []
-        for form_name, form_data in submission_data.forms_data.items():
-            # Create form entry
-            form_create = FormCreate(
+        form_creates = {
+            form_name: FormCreate(
                 template_id=form_name,  # Using form name as template_id for now
                 volunteer_id=UUID(submission_data.volunteer_id),
                 data=form_data,
                 status="submitted"
             )
-            
+            for form_name, form_data in submission_data.forms_data.items()
+        }
+
+        # Check every form before creating any, so a case is never half submitted
+        errors = {}
+        for form_name, form_create in form_creates.items():
+            missing = await template_service.missing_required_fields(
+                db=db, template_id=form_create.template_id, data=form_create.data
+            )
+            if missing is None:
+                errors[form_name] = ["Form template not found"]
+            elif missing:
+                errors[form_name] = [f"Required field '{field}' is missing" for field in missing]
+            else:
+                error = await schema_service.validation_error(
+                    db=db, template_id=form_create.template_id, data=form_create.data
+                )
+                if error:
+                    errors[form_name] = [error]
+        if errors:
+            return BulkSubmissionResponse(
+                success=False,
+                case_id=submission_data.case_id,
+                message="Some forms are incomplete",
+                errors=errors
+            )
+
+        # Create forms for each form in the submission
+        created_forms = []
+        for form_create in form_creates.values():
             form = await form_service.create_form(
                 db=db, obj_in=form_create, created_by=UUID(current_user_id)
             )
@@ -239,6 +312,9 @@ async def create_form(
             status_code=status.HTTP_404_NOT_FOUND, detail="Volunteer not found"
         )
     
+    if form_in.status == "submitted":
+        await _check_submission(db, form_in.template_id, form_in.data)
+    
     form = await form_service.create_form(
         db=db, obj_in=form_in, created_by=UUID(current_user_id)
     )
@@ -279,6 +355,54 @@ async def list_forms(
     }
 
 
+@router.get("/export")
+async def export_forms(
+    template_id: UUID,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Export a template's forms as CSV, one column per field. Fields the
+    template logic hides for a form are marked N/A instead of left blank.
+    """
+    template = await template_service.get_template(db=db, template_id=template_id)
+    if not template:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Form template not found"
+        )
+    
+    compiled = compiled_logic(template)
+    header = ["form_id", "volunteer_id", "status", "created_at", *compiled.fields]
+    
+    async def rows():
+        # The request's session is closed once the endpoint returns, before
+        # the body is sent, so the stream reads through its own
+        async with AsyncSessionLocal() as session:
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            writer.writerow([_csv_safe(name) for name in header])
+            async for form_id, volunteer_id, form_status, created_at, data in form_service.stream_template_forms(
+                db=session, template_id=template_id
+            ):
+                values = [
+                    _csv_safe(json.dumps(value) if isinstance(value, (dict, list)) else value)
+                    for value in compiled.export_values(data or {})
+                ]
+                writer.writerow([form_id, volunteer_id, _csv_safe(form_status), created_at, *values])
+                if buffer.tell() >= CSV_CHUNK_SIZE:
+                    yield buffer.getvalue()
+                    buffer.seek(0)
+                    buffer.truncate()
+            yield buffer.getvalue()
+    
+    filename = f"template-{template.id}-v{template.version}.csv"
+    return StreamingResponse(
+        rows(),
+        media_type="text/csv",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
 @router.get("/{form_id}", response_model=FormResponse)
 async def get_form(
     form_id: Annotated[UUID, Path(title="The ID of the form to get")],
@@ -312,6 +436,10 @@ async def update_form(
             status_code=status.HTTP_404_NOT_FOUND, detail="Form not found"
         )
     
+    if (form_in.status or form.status) == "submitted":
+        data = form_in.data if form_in.data is not None else form.data
+        await _check_submission(db, form.template_id, data)
+    
     updated_form = await form_service.update_form(
         db=db, form_id=form_id, obj_in=form_in, updated_by=UUID(current_user_id)
     )
@@ -365,6 +493,14 @@ async def update_table_cell(
             status_code=status.HTTP_404_NOT_FOUND, detail="Form not found"
         )
     
+    if form.cached_template and derived_fields(form.cached_template).is_derived_column(
+        cell_data.field_path, cell_data.column_id
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Column '{cell_data.column_id}' is calculated by the server"
+        )
+    
     updated_form = await form_service.update_table_cell(
         db=db, 
         form_id=form_id, 
@@ -401,6 +537,14 @@ async def patch_form_field(
             detail="Cannot change volunteer_id"
         )
     
+    if form.cached_template and derived_fields(form.cached_template).is_derived(
+        patch_data.field.split(".")[0]
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Field '{patch_data.field}' is calculated by the server"
+        )
+    
     # Validate date fields against volunteer.screening_date
     if form.volunteer and form.volunteer.screening_date:
         # This would validate date fields against the volunteer's screening date
@@ -0,0 +1,17 @@
+from typing import Any
+
+from fastapi import APIRouter, Depends
+
+from app.core.security import User, get_admin_user, token_cache
+
+router = APIRouter()
+
+
+@router.get("/token-cache")
+async def get_token_cache_metrics(
+    current_user: User = Depends(get_admin_user),
+) -> Any:
+    """
+    Verified-token cache size, revocations and hit counts for this worker (admin only)
+    """
+    return token_cache.stats()
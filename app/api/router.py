@@ -1,6 +1,6 @@
 from fastapi import APIRouter
 
-from app.api.endpoints import auth, change_log, form_templates, forms, volunteers
+from app.api.endpoints import auth, change_log, form_templates, forms, metrics, volunteers
 
 api_router = APIRouter()
 
@@ -16,4 +16,7 @@ api_router.include_router(
 )
 api_router.include_router(
     change_log.router, prefix="/change-log", tags=["change-log"]
-)
\ No newline at end of file
+)
+api_router.include_router(
+    metrics.router, prefix="/metrics", tags=["metrics"]
+)
@@ -21,11 +21,24 @@ class Settings(BaseSettings):
 
     # Database settings
     DATABASE_URL: PostgresDsn
+
+    # Connection pool (per API worker)
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: int = 30  # Seconds to wait for a free connection
+    DB_POOL_RECYCLE: int = 300
+    DB_POOL_PRE_PING: bool = True
     
     # JWT secret for local authentication
     JWT_SECRET: str = "your-secret-key-here"
     JWT_ALGORITHM: str = "HS256"
     JWT_EXPIRE_MINUTES: int = 60 * 24 * 7  # 7 days
+    JWT_CACHE_SIZE: int = 10000  # Verified tokens kept in memory per worker
+
+    # Parsed form templates kept in memory per worker
+    TEMPLATE_CACHE_SIZE: int = 1000
+    TEMPLATE_CACHE_TTL_SECONDS: int = 300  # Upper bound on staleness if a NOTIFY is missed
+    TEMPLATE_CACHE_CHANNEL: str = "form_template_changed"  # LISTEN/NOTIFY channel
     
     # Pagination defaults
     DEFAULT_PAGE_SIZE: int = 20
@@ -1,5 +1,9 @@
+import hashlib
+import heapq
+import time
+from collections import OrderedDict
 from datetime import datetime, timedelta
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 import httpx
 from fastapi import Depends, HTTPException, Request, status
@@ -29,6 +33,98 @@ class User(BaseModel):
     role: str
 
 
+class TokenCache:
+    """
+    Bounded LRU of verified JWT claims, keyed by the SHA-256 of the token.
+
+    Entries are kept until the token's exp, so a hit skips signature
+    verification entirely. Revoked tokens are remembered until they expire
+    so they cannot be verified and cached again; only verified tokens can be
+    revoked, so that list is bounded by the tokens actually issued and is
+    never trimmed early.
+
+    Known limit: state is per process. A logout handled by one worker does
+    not reach the others, which keep accepting the token until it expires.
+    Run a single worker, or keep JWT_EXPIRE_MINUTES short, where that matters.
+    """
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._claims: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._revoked: Dict[str, float] = {}
+        self._revoked_expiries: List[Tuple[float, str]] = []
+
+    @staticmethod
+    def _key(token: str) -> str:
+        return hashlib.sha256(token.encode()).hexdigest()
+
+    def get(self, token: str) -> Optional[Dict[str, Any]]:
+        """Return cached claims for a token that is still valid"""
+        key = self._key(token)
+        claims = self._claims.get(key)
+        if claims is None:
+            self.misses += 1
+            return None
+        if claims["exp"] <= time.time():
+            del self._claims[key]
+            self.misses += 1
+            return None
+        self._claims.move_to_end(key)
+        self.hits += 1
+        return claims
+
+    def put(self, token: str, claims: Dict[str, Any]) -> None:
+        # Without exp nothing bounds the entry's lifetime, so don't cache it
+        if self.max_size <= 0 or not isinstance(claims.get("exp"), (int, float)):
+            return
+        key = self._key(token)
+        if key in self._revoked:
+            return
+        self._claims[key] = claims
+        self._claims.move_to_end(key)
+        while len(self._claims) > self.max_size:
+            self._claims.popitem(last=False)
+
+    def is_revoked(self, token: str) -> bool:
+        self._purge_revoked()
+        return self._key(token) in self._revoked
+
+    def revoke(self, token: str, claims: Dict[str, Any]) -> None:
+        """
+        Evict a token and reject it until it expires (logout). claims must
+        come from verifying the token; callers ignore tokens that don't verify.
+        """
+        expires = claims.get("exp")
+        if not isinstance(expires, (int, float)):
+            # Valid forever; bounded by the tokens issued without exp
+            expires = float("inf")
+        key = self._key(token)
+        self._claims.pop(key, None)
+        self._purge_revoked()
+        if key not in self._revoked:
+            self._revoked[key] = expires
+            heapq.heappush(self._revoked_expiries, (expires, key))
+
+    def _purge_revoked(self) -> None:
+        now = time.time()
+        while self._revoked_expiries and self._revoked_expiries[0][0] <= now:
+            _, key = heapq.heappop(self._revoked_expiries)
+            self._revoked.pop(key, None)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "size": len(self._claims),
+            "revoked": len(self._revoked),
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+token_cache = TokenCache(settings.JWT_CACHE_SIZE)
+
+
 class SimpleAuth(HTTPBearer):
     async def __call__(
         self, request: Request
@@ -47,10 +143,22 @@ class SimpleAuth(HTTPBearer):
                 detail="Invalid authentication scheme",
             )
             
+        token = credentials.credentials
+        payload = token_cache.get(token)
+        if payload is not None:
+            request.state.user = User(id=payload["sub"], role=payload.get("role", "employee"))
+            return credentials
+
+        if token_cache.is_revoked(token):
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Token has been revoked",
+            )
+
         try:
             # Try to decode JWT token
             payload = jwt.decode(
-                credentials.credentials,
+                token,
                 settings.JWT_SECRET,
                 algorithms=[settings.JWT_ALGORITHM],
             )
@@ -68,6 +176,7 @@ class SimpleAuth(HTTPBearer):
             
             # Store user info in request state
             request.state.user = User(id=user_id, role=user_role)
+            token_cache.put(token, payload)
             
             return credentials
                 
@@ -110,6 +219,14 @@ def create_access_token(email: str, role: str, expires_delta: Optional[timedelta
     return encoded_jwt
 
 
+def decode_token(token: str) -> Optional[Dict[str, Any]]:
+    """Verified claims of a token, or None if it is invalid or expired"""
+    try:
+        return jwt.decode(token, settings.JWT_SECRET, algorithms=[settings.JWT_ALGORITHM])
+    except JWTError:
+        return None
+
+
 def get_current_user(request: Request) -> User:
     """Get the current user from the request state."""
     if not hasattr(request.state, 'user'):
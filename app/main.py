@@ -1,3 +1,5 @@
+import asyncio
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
@@ -28,6 +30,23 @@ auth = SupabaseAuth()
 app.include_router(api_router, prefix=settings.API_PREFIX, dependencies=[auth])
 
 
+@app.on_event("startup")
+async def start_template_listener():
+    """
+    Listen for form template changes made by other workers
+    """
+    from app.services.template_cache import listen_for_template_changes
+
+    app.state.template_listener = asyncio.create_task(listen_for_template_changes())
+
+
+@app.on_event("shutdown")
+async def stop_template_listener():
+    listener = getattr(app.state, "template_listener", None)
+    if listener is not None:
+        listener.cancel()
+
+
 @app.get("/health")
 async def health_check():
     """
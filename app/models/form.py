@@ -27,5 +27,7 @@ class Form(Base):
     )
 
     # Relationships
-    template = relationship("FormTemplate", lazy="joined")
+    # Not loaded with the form; reads attach the parsed template from
+    # app.services.template_cache as cached_template
+    template = relationship("FormTemplate", lazy="raise")
     volunteer = relationship("Volunteer", lazy="joined")
\ No newline at end of file
@@ -1,10 +1,12 @@
 import uuid
-from typing import Optional
+from typing import Any, Optional
 
-from sqlalchemy import Column, DateTime, Integer, String, Text, func
-from sqlalchemy.dialects.postgresql import JSONB, UUID
+from sqlalchemy import Column, DateTime, ForeignKey, Integer, String, Text, func
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import relationship
 
 from app.db.base import Base
+from app.models.template_blob import TemplateBlob
 
 
 class FormTemplate(Base):
@@ -14,11 +16,27 @@ class FormTemplate(Base):
     name = Column(String, nullable=False)
     version = Column(Integer, nullable=False)
     description = Column(Text, nullable=True)
-    sections = Column(JSONB, nullable=True)
-    side_headers = Column(JSONB, nullable=True)
-    logic = Column(JSONB, nullable=True)
+    content_hash = Column(
+        String(64), ForeignKey("template_blobs.content_hash"), nullable=False, index=True
+    )
     created_by = Column(UUID(as_uuid=True), nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(
         DateTime(timezone=True), server_default=func.now(), onupdate=func.now()
-    )
\ No newline at end of file
+    )
+
+    # Templates with the same content (clones, metadata-only version bumps)
+    # share one blob
+    blob = relationship(TemplateBlob, lazy="joined", innerjoin=True)
+
+    @property
+    def sections(self) -> Optional[Any]:
+        return self.blob.sections
+
+    @property
+    def side_headers(self) -> Optional[Any]:
+        return self.blob.side_headers
+
+    @property
+    def logic(self) -> Optional[Any]:
+        return self.blob.logic
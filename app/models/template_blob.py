@@ -0,0 +1,20 @@
+from sqlalchemy import Column, DateTime, Integer, String, func
+from sqlalchemy.dialects.postgresql import JSONB
+
+from app.db.base import Base
+
+
+class TemplateBlob(Base):
+    """
+    Template content (sections, side headers and logic), stored once per
+    distinct content and keyed by its SHA-256. Rows are never updated:
+    changed content is a new blob.
+    """
+    __tablename__ = "template_blobs"
+
+    content_hash = Column(String(64), primary_key=True)
+    sections = Column(JSONB, nullable=True)
+    side_headers = Column(JSONB, nullable=True)
+    logic = Column(JSONB, nullable=True)
+    size = Column(Integer, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
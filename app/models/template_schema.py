@@ -0,0 +1,21 @@
+from sqlalchemy import Column, DateTime, ForeignKey, Integer, String, func
+from sqlalchemy.dialects.postgresql import JSONB, UUID
+
+from app.db.base import Base
+
+
+class TemplateSchema(Base):
+    """
+    The JSON Schema published for one version of a template. Written once,
+    the first time the version's schema is requested or used to validate a
+    submission, and never changed afterwards.
+    """
+    __tablename__ = "template_schemas"
+
+    template_id = Column(
+        UUID(as_uuid=True), ForeignKey("form_templates.id", ondelete="CASCADE"), primary_key=True
+    )
+    version = Column(Integer, primary_key=True)
+    content_hash = Column(String(64), nullable=False)
+    document = Column(JSONB, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
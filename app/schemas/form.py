@@ -61,7 +61,8 @@ class FormInDB(FormBase):
 
 
 class FormResponse(FormInDB):
-    template: Optional[FormTemplateResponse] = None
+    # Forms carry their template from the template cache, not the relationship
+    template: Optional[FormTemplateResponse] = Field(None, validation_alias="cached_template")
     volunteer: Optional[VolunteerResponse] = None
 
 
@@ -27,8 +27,15 @@ class FormTemplateUpdate(BaseModel):
     logic: Optional[Dict[str, Any]] = None
 
 
+class FormTemplateClone(BaseModel):
+    name: Optional[str] = None
+    version: Optional[int] = None
+    description: Optional[str] = None
+
+
 class FormTemplateInDB(FormTemplateBase):
     id: UUID
+    content_hash: str
     created_by: Optional[UUID] = None
     created_at: datetime
     updated_at: datetime
@@ -16,9 +16,11 @@ async def create_change_log(
     new: Any,
     reason: str,
     changed_by: UUID,
+    commit: bool = True,
 ) -> ChangeLog:
     """
-    Create a new change log entry
+    Create a new change log entry. With commit=False the entry is only
+    added to the session, to be committed with the change it records.
     """
     db_obj = ChangeLog(
         form_id=form_id,
@@ -29,8 +31,9 @@ async def create_change_log(
         changed_by=changed_by,
     )
     db.add(db_obj)
-    await db.commit()
-    await db.refresh(db_obj)
+    if commit:
+        await db.commit()
+        await db.refresh(db_obj)
     return db_obj
 
 
@@ -0,0 +1,320 @@
+import ast
+import logging
+import math
+import operator
+from collections import OrderedDict
+from datetime import date, datetime
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from app.core.config import settings
+from app.schemas.form_template import FormTemplateResponse
+from app.services.template_logic import iter_fields
+
+logger = logging.getLogger(__name__)
+
+# Derived fields are template fields (or table columns) with a calculation:
+#
+#   {"id": "bmi", "type": "calculation",
+#    "calculation": {"formula": "round(weight / (height / 100) ** 2, 1)"}}
+#
+# Formulas are arithmetic over other field ids (+ - * / // % **), numbers,
+# and the functions in _FUNCTIONS; field("some-id") reads a field whose id is
+# not a valid name. A table column's formula reads the other columns of the
+# same row. If any input is blank or not a number the result is None.
+
+Lookup = Callable[[str], Any]
+
+# Largest exponent (either sign) a formula may raise to
+MAX_EXPONENT = 1000
+
+
+class FormulaError(ValueError):
+    """A calculation that cannot be compiled"""
+
+
+class _Undefined(Exception):
+    """An input is blank or has the wrong type; the result is None"""
+
+
+def _number(value: Any) -> float:
+    if isinstance(value, bool) or value is None or value == "":
+        raise _Undefined()
+    if isinstance(value, (int, float)):
+        return value
+    if isinstance(value, str):
+        try:
+            return float(value)
+        except ValueError:
+            raise _Undefined()
+    raise _Undefined()
+
+
+def _date(value: Any) -> date:
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    if isinstance(value, str) and value:
+        try:
+            return date.fromisoformat(value[:10])
+        except ValueError:
+            raise _Undefined()
+    raise _Undefined()
+
+
+def _years_between(start: Any, end: Any) -> int:
+    start, end = _date(start), _date(end)
+    return end.year - start.year - ((end.month, end.day) < (start.month, start.day))
+
+
+def _days_between(start: Any, end: Any) -> int:
+    return (_date(end) - _date(start)).days
+
+
+def _sqrt(x: Any) -> float:
+    x = _number(x)
+    if x < 0:
+        raise _Undefined()
+    return math.sqrt(x)
+
+
+def _cbrt(x: Any) -> float:
+    x = _number(x)
+    return math.copysign(abs(x) ** (1 / 3), x)
+
+
+def _power(base: Any, exponent: Any) -> float:
+    # Float, not int, arithmetic: 9 ** 9 ** 9 overflows at once instead of
+    # computing a number with hundreds of millions of digits
+    base, exponent = float(_number(base)), float(_number(exponent))
+    if abs(exponent) > MAX_EXPONENT:
+        raise _Undefined()
+    return base ** exponent
+
+
+def _round(x: Any, digits: Any = None) -> float:
+    if digits is None:
+        return round(_number(x))
+    return round(_number(x), int(_number(digits)))
+
+
+_FUNCTIONS: Dict[str, Callable[..., Any]] = {
+    "sqrt": _sqrt,
+    "cbrt": _cbrt,  # QTcF = qt / cbrt(rr)
+    "abs": lambda x: abs(_number(x)),
+    "round": _round,
+    "min": lambda *xs: min(_number(x) for x in xs),
+    "max": lambda *xs: max(_number(x) for x in xs),
+    "years_between": _years_between,  # age at screening
+    "days_between": _days_between,
+}
+
+_BINARY = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: operator.truediv,
+    ast.FloorDiv: operator.floordiv,
+    ast.Mod: operator.mod,
+    ast.Pow: _power,
+}
+
+
+def _compile_node(node: ast.AST, references: Set[str]) -> Callable[[Lookup], Any]:
+    if isinstance(node, ast.Constant) and isinstance(node.value, (int, float, str)) and not isinstance(node.value, bool):
+        value = node.value
+        return lambda get: value
+    if isinstance(node, ast.Name):
+        name = node.id
+        references.add(name)
+        return lambda get: get(name)
+    if isinstance(node, ast.BinOp) and type(node.op) in _BINARY:
+        op = _BINARY[type(node.op)]
+        left = _compile_node(node.left, references)
+        right = _compile_node(node.right, references)
+        return lambda get: op(_number(left(get)), _number(right(get)))
+    if isinstance(node, ast.UnaryOp) and isinstance(node.op, (ast.USub, ast.UAdd)):
+        operand = _compile_node(node.operand, references)
+        if isinstance(node.op, ast.USub):
+            return lambda get: -_number(operand(get))
+        return lambda get: _number(operand(get))
+    if isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and not node.keywords:
+        name = node.func.id
+        if name == "field":
+            if len(node.args) != 1 or not isinstance(node.args[0], ast.Constant) or not isinstance(node.args[0].value, str):
+                raise FormulaError('field() takes one field id, e.g. field("bp-sys")')
+            field_id = node.args[0].value
+            references.add(field_id)
+            return lambda get: get(field_id)
+        function = _FUNCTIONS.get(name)
+        if function is None:
+            raise FormulaError(f"Unknown function '{name}'")
+        args = [_compile_node(arg, references) for arg in node.args]
+        return lambda get: function(*(arg(get) for arg in args))
+    raise FormulaError(f"Unsupported expression: {ast.dump(node)[:80]}")
+
+
+class Formula:
+    def __init__(self, source: str):
+        try:
+            tree = ast.parse(source, mode="eval")
+        except SyntaxError as exc:
+            raise FormulaError(f"Invalid formula {source!r}: {exc.msg}")
+        self.source = source
+        self.references: Set[str] = set()
+        self._evaluate = _compile_node(tree.body, self.references)
+
+    def evaluate(self, get: Lookup) -> Any:
+        try:
+            result = self._evaluate(get)
+        except (_Undefined, ArithmeticError, ValueError, TypeError):
+            return None
+        # Numbers only (e.g. a negative base to a fractional power is complex)
+        if not isinstance(result, (int, float)) or isinstance(result, bool):
+            return None
+        if isinstance(result, float) and not math.isfinite(result):
+            return None
+        return result
+
+
+class DerivedGraph:
+    """
+    Derived values of one scope (the form, or one table's columns) and the
+    dependency DAG between them. downstream(name) is the derived values to
+    recompute when name changes, in dependency order; it is computed once
+    per name, so a recompute costs the size of the edit, not of the form.
+    """
+
+    def __init__(self, formulas: Dict[str, Formula], scope: str = "template"):
+        self.formulas = formulas
+        self._dependents: Dict[str, List[str]] = {}
+        for name, formula in formulas.items():
+            for reference in formula.references:
+                self._dependents.setdefault(reference, []).append(name)
+        self._order = self._topological_order(scope)
+        self._downstream: Dict[str, List[str]] = {}
+
+    def _topological_order(self, scope: str) -> Dict[str, int]:
+        pending = {
+            name: sum(1 for reference in formula.references if reference in self.formulas)
+            for name, formula in self.formulas.items()
+        }
+        ready = [name for name, count in pending.items() if count == 0]
+        order: Dict[str, int] = {}
+        while ready:
+            name = ready.pop()
+            order[name] = len(order)
+            for dependent in self._dependents.get(name, ()):
+                pending[dependent] -= 1
+                if pending[dependent] == 0:
+                    ready.append(dependent)
+        if len(order) != len(self.formulas):
+            cycle = sorted(name for name in self.formulas if name not in order)
+            raise FormulaError(f"Circular calculations in {scope}: {', '.join(cycle)}")
+        return order
+
+    def downstream(self, name: str) -> List[str]:
+        names = self._downstream.get(name)
+        if names is None:
+            seen: Set[str] = set()
+            stack = list(self._dependents.get(name, ()))
+            while stack:
+                dependent = stack.pop()
+                if dependent not in seen:
+                    seen.add(dependent)
+                    stack.extend(self._dependents.get(dependent, ()))
+            names = sorted(seen, key=self._order.__getitem__)
+            self._downstream[name] = names
+        return names
+
+    def recompute(self, values: Dict[str, Any], changed: str) -> List[Tuple[str, Any, Any]]:
+        """Update values in place; returns (name, old, new) for each change"""
+        changes = []
+        for name in self.downstream(changed):
+            new = self.formulas[name].evaluate(values.get)
+            old = values.get(name)
+            if new != old:
+                values[name] = new
+                changes.append((name, old, new))
+        return changes
+
+    def compute_all(self, values: Dict[str, Any]) -> List[Tuple[str, Any, Any]]:
+        changes = []
+        for name in sorted(self.formulas, key=self._order.__getitem__):
+            new = self.formulas[name].evaluate(values.get)
+            old = values.get(name)
+            if new != old:
+                values[name] = new
+                changes.append((name, old, new))
+        return changes
+
+
+class DerivedFields:
+    """Derived fields of a template version: form-level plus per-table columns"""
+
+    def __init__(self, fields: DerivedGraph, tables: Dict[str, DerivedGraph]):
+        self.fields = fields
+        self.tables = tables
+
+    def is_derived(self, field: str) -> bool:
+        return field in self.fields.formulas
+
+    def table(self, field_path: str) -> Optional[DerivedGraph]:
+        """Calculated columns of the table at a (possibly dotted) data path"""
+        # Tables are keyed by field id, the last part of the path
+        return self.tables.get(field_path.rsplit(".", 1)[-1])
+
+    def is_derived_column(self, field_path: str, column: str) -> bool:
+        graph = self.table(field_path)
+        return graph is not None and column in graph.formulas
+
+
+def _formula_of(definition: Dict[str, Any]) -> Optional[str]:
+    calculation = definition.get("calculation")
+    if isinstance(calculation, dict) and isinstance(calculation.get("formula"), str):
+        return calculation["formula"]
+    if isinstance(calculation, str):
+        return calculation
+    return None
+
+
+def compile_derived_fields(sections: Any) -> DerivedFields:
+    formulas: Dict[str, Formula] = {}
+    tables: Dict[str, DerivedGraph] = {}
+    for _, field in iter_fields(sections):
+        field_id = field.get("id") or field.get("name")
+        source = _formula_of(field)
+        if source:
+            formulas[field_id] = Formula(source)
+        columns = (field.get("tableConfig") or {}).get("columns") or field.get("columns") or []
+        column_formulas = {
+            column["id"]: Formula(_formula_of(column))
+            for column in columns
+            if isinstance(column, dict) and column.get("id") and _formula_of(column)
+        }
+        if column_formulas:
+            tables[field_id] = DerivedGraph(column_formulas, scope=f"table '{field_id}'")
+    return DerivedFields(DerivedGraph(formulas), tables)
+
+
+_compiled: "OrderedDict[str, DerivedFields]" = OrderedDict()
+
+
+def derived_fields(template: FormTemplateResponse) -> DerivedFields:
+    """Compiled derived fields for a template, cached by content hash"""
+    key = template.content_hash
+    compiled = _compiled.get(key)
+    if compiled is not None:
+        _compiled.move_to_end(key)
+        return compiled
+
+    try:
+        compiled = compile_derived_fields(template.sections)
+    except FormulaError as exc:
+        # Saved before calculations were validated; don't derive anything
+        logger.warning("Ignoring invalid calculations of template %s: %s", template.id, exc)
+        compiled = DerivedFields(DerivedGraph({}), {})
+    _compiled[key] = compiled
+    while len(_compiled) > settings.TEMPLATE_CACHE_SIZE:
+        _compiled.popitem(last=False)
+    return compiled
@@ -1,14 +1,19 @@
-from typing import Dict, List, Optional, Tuple, Any
+from typing import AsyncIterator, Dict, List, Optional, Tuple, Any
 from uuid import UUID
 
-from sqlalchemy import func, select
+from sqlalchemy import Row, func, select
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import joinedload
+from sqlalchemy.orm import joinedload, noload
+from sqlalchemy.orm.attributes import flag_modified
 
 from app.models.form import Form
-from app.models.volunteer import Volunteer
 from app.schemas.form import FormCreate, FormPatch, FormUpdate, TableRowCreate, TableCellUpdate
 from app.services.change_log import create_change_log
+from app.services.derived_fields import derived_fields
+from app.services.template_cache import template_cache
+
+# Forms fetched per round trip when streaming an export
+EXPORT_FETCH_SIZE = 500
 
 
 async def create_form(
@@ -17,18 +22,6 @@ async def create_form(
     """
     Create a new form
     """
-    # Validate that all date fields in data are >= volunteer.screening_date
-    if obj_in.data:
-        # Get volunteer screening date
-        volunteer_query = select(Volunteer).where(Volunteer.id == obj_in.volunteer_id)
-        volunteer_result = await db.execute(volunteer_query)
-        volunteer = volunteer_result.scalars().first()
-        
-        if volunteer and volunteer.screening_date:
-            # This would validate date fields in the data against the volunteer's screening date
-            # Implementation depends on the structure of the form data
-            pass
-    
     db_obj = Form(
         **obj_in.model_dump(),
         created_by=created_by,
@@ -36,20 +29,25 @@ async def create_form(
     db.add(db_obj)
     await db.commit()
     await db.refresh(db_obj)
+    db_obj.cached_template = await template_cache.get(db, db_obj.template_id)
     return db_obj
 
 
 async def get_form(db: AsyncSession, form_id: UUID) -> Optional[Form]:
     """
-    Get a form by ID with template and volunteer relationships loaded
+    Get a form by ID with its volunteer loaded and its template attached
+    from the template cache
     """
     query = (
         select(Form)
         .where(Form.id == form_id)
-        .options(joinedload(Form.template), joinedload(Form.volunteer))
+        .options(joinedload(Form.volunteer))
     )
     result = await db.execute(query)
-    return result.scalars().first()
+    form = result.scalars().first()
+    if form:
+        form.cached_template = await template_cache.get(db, form.template_id)
+    return form
 
 
 async def list_forms(
@@ -64,7 +62,7 @@ async def list_forms(
     List forms with optional filters and pagination
     """
     # Base query
-    query = select(Form).options(joinedload(Form.template), joinedload(Form.volunteer))
+    query = select(Form).options(joinedload(Form.volunteer))
     count_query = select(func.count()).select_from(Form)
     
     # Apply filters
@@ -91,9 +89,33 @@ async def list_forms(
     result = await db.execute(query)
     forms = result.scalars().all()
     
+    # Templates come from the cache instead of a join on every row
+    templates = await template_cache.get_many(db, (form.template_id for form in forms))
+    for form in forms:
+        form.cached_template = templates.get(form.template_id)
+    
     return forms, total_count
 
 
+async def stream_template_forms(
+    db: AsyncSession, template_id: UUID
+) -> AsyncIterator[Row]:
+    """
+    (id, volunteer_id, status, created_at, data) of every form of a template,
+    oldest first (exports). Rows come through a server-side cursor as plain
+    tuples, so memory stays flat however many forms there are.
+    """
+    query = (
+        select(Form.id, Form.volunteer_id, Form.status, Form.created_at, Form.data)
+        .where(Form.template_id == template_id)
+        .order_by(Form.created_at)
+        .execution_options(yield_per=EXPORT_FETCH_SIZE)
+    )
+    result = await db.stream(query)
+    async for row in result:
+        yield row
+
+
 async def update_form(
     db: AsyncSession, form_id: UUID, obj_in: FormUpdate, updated_by: UUID
 ) -> Optional[Form]:
@@ -148,6 +170,12 @@ async def add_table_row(
     if field_name not in current:
         current[field_name] = []
     
+    # Calculated columns of the new row come from the server, not the client
+    if form.cached_template:
+        table = derived_fields(form.cached_template).table(field_path)
+        if table is not None:
+            table.compute_all(row_data.setdefault('cells', {}))
+    
     # Add the new row
     current[field_name].append(row_data)
     
@@ -160,10 +188,12 @@ async def add_table_row(
         new=row_data,
         reason=reason,
         changed_by=user_id,
+        commit=False,
     )
     
     # Update the form
     form.data = current_data
+    flag_modified(form, "data")
     await db.commit()
     await db.refresh(form)
     return form
@@ -218,7 +248,8 @@ async def update_table_cell(
     old_value = current[row_index]['cells'].get(column_id)
     
     # Update the cell value
-    current[row_index]['cells'][column_id] = value
+    cells = current[row_index]['cells']
+    cells[column_id] = value
     
     # Create change log entry
     await create_change_log(
@@ -229,10 +260,28 @@ async def update_table_cell(
         new=value,
         reason=reason,
         changed_by=user_id,
+        commit=False,
     )
     
-    # Update the form
+    # Recalculate the row's calculated columns that depend on this one
+    if form.cached_template:
+        table = derived_fields(form.cached_template).table(field_path)
+        if table is not None:
+            for column, old, new in table.recompute(cells, column_id):
+                await create_change_log(
+                    db=db,
+                    form_id=form_id,
+                    field=f"{field_path}.{row_id}.{column}",
+                    old=old,
+                    new=new,
+                    reason=f"Recalculated after change to {field_path}.{row_id}.{column_id}",
+                    changed_by=user_id,
+                    commit=False,
+                )
+    
+    # Update the form, change log entries included, in one transaction
     form.data = current_data
+    flag_modified(form, "data")
     await db.commit()
     await db.refresh(form)
     return form
@@ -279,8 +328,26 @@ async def patch_form_field(
         new=patch_data.value,
         reason=patch_data.reason,
         changed_by=changed_by,
+        commit=False,
     )
     
+    # Recalculate the derived fields downstream of the patched one
+    if form.cached_template:
+        derived = derived_fields(form.cached_template)
+        for field, old, new in derived.fields.recompute(form.data, patch_data.field.split(".")[0]):
+            await create_change_log(
+                db=db,
+                form_id=form_id,
+                field=field,
+                old=old,
+                new=new,
+                reason=f"Recalculated after change to {patch_data.field}",
+                changed_by=changed_by,
+                commit=False,
+            )
+    
+    # Update the form, change log entries included, in one transaction
+    flag_modified(form, "data")
     await db.commit()
     await db.refresh(form)
     return form
@@ -1,11 +1,19 @@
-from typing import List, Optional, Tuple
+from typing import Any, Dict, List, Optional, Tuple
 from uuid import UUID
 
 from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.form_template import FormTemplate
-from app.schemas.form_template import FormTemplateCreate, FormTemplateUpdate
+from app.schemas.form_template import (
+    FormTemplateClone,
+    FormTemplateCreate,
+    FormTemplateResponse,
+    FormTemplateUpdate,
+)
+from app.services.template_blob import put_blob, release_blob
+from app.services.template_cache import template_cache
+from app.services.template_logic import compiled_logic
 
 
 async def create_template(
@@ -14,8 +22,12 @@ async def create_template(
     """
     Create a new form template
     """
+    content_hash = await put_blob(db, obj_in.sections, obj_in.side_headers, obj_in.logic)
     db_obj = FormTemplate(
-        **obj_in.model_dump(),
+        name=obj_in.name,
+        version=obj_in.version,
+        description=obj_in.description,
+        content_hash=content_hash,
         created_by=created_by,
     )
     db.add(db_obj)
@@ -24,10 +36,51 @@ async def create_template(
     return db_obj
 
 
-async def get_template(db: AsyncSession, template_id: UUID) -> Optional[FormTemplate]:
+async def clone_template(
+    db: AsyncSession, template_id: UUID, obj_in: FormTemplateClone, created_by: UUID
+) -> Optional[FormTemplate]:
+    """
+    Copy a form template. The copy points at the same content blob, so
+    nothing but the metadata row is written.
+    """
+    source = await get_template(db, template_id)
+    if not source:
+        return None
+
+    db_obj = FormTemplate(
+        name=obj_in.name if obj_in.name is not None else source.name,
+        version=obj_in.version if obj_in.version is not None else source.version,
+        description=obj_in.description if obj_in.description is not None else source.description,
+        content_hash=source.content_hash,
+        created_by=created_by,
+    )
+    db.add(db_obj)
+    await db.commit()
+    await db.refresh(db_obj)
+    return db_obj
+
+
+async def get_template(db: AsyncSession, template_id: UUID) -> Optional[FormTemplateResponse]:
+    """
+    Get a form template by ID (from the template cache)
     """
-    Get a form template by ID
+    return await template_cache.get(db, template_id)
+
+
+async def missing_required_fields(
+    db: AsyncSession, template_id: UUID, data: Optional[Dict[str, Any]]
+) -> Optional[List[str]]:
     """
+    Required fields left blank in data, after the template logic decides
+    which fields apply. None if the template does not exist.
+    """
+    template = await get_template(db, template_id)
+    if not template:
+        return None
+    return compiled_logic(template).missing_required(data or {})
+
+
+async def _load_template(db: AsyncSession, template_id: UUID) -> Optional[FormTemplate]:
     result = await db.execute(select(FormTemplate).where(FormTemplate.id == template_id))
     return result.scalars().first()
 
@@ -67,15 +120,29 @@ async def update_template(
     """
     Update a form template
     """
-    template = await get_template(db, template_id)
+    template = await _load_template(db, template_id)
     if not template:
         return None
     
     update_data = obj_in.model_dump(exclude_unset=True)
+    content_fields = ("sections", "side_headers", "logic")
+    if any(field in update_data for field in content_fields):
+        # Content is immutable: point at the blob for the new content
+        content = {
+            field: update_data.pop(field, getattr(template, field))
+            for field in content_fields
+        }
+        previous_hash = template.content_hash
+        template.content_hash = await put_blob(db, **content)
+        if template.content_hash != previous_hash:
+            await release_blob(db, previous_hash)
+
     for field, value in update_data.items():
         setattr(template, field, value)
     
+    await template_cache.notify(db, template_id)
     await db.commit()
+    template_cache.invalidate(template_id)
     await db.refresh(template)
     return template
 
@@ -84,10 +151,13 @@ async def delete_template(db: AsyncSession, template_id: UUID) -> bool:
     """
     Delete a form template
     """
-    template = await get_template(db, template_id)
+    template = await _load_template(db, template_id)
     if not template:
         return False
     
     await db.delete(template)
+    await release_blob(db, template.content_hash)
+    await template_cache.notify(db, template_id)
     await db.commit()
+    template_cache.invalidate(template_id)
     return True
\ No newline at end of file
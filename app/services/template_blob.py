@@ -0,0 +1,93 @@
+import hashlib
+import json
+from typing import Any, Dict, Optional, Tuple
+
+from sqlalchemy import delete, exists, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.form_template import FormTemplate
+from app.models.template_blob import TemplateBlob
+
+
+def canonical_content(
+    sections: Optional[Dict[str, Any]],
+    side_headers: Optional[Dict[str, Any]],
+    logic: Optional[Dict[str, Any]],
+) -> bytes:
+    """Template content as canonical JSON: sorted keys, no whitespace, UTF-8"""
+    content = {"sections": sections, "side_headers": side_headers, "logic": logic}
+    return json.dumps(
+        content, sort_keys=True, separators=(",", ":"), ensure_ascii=False
+    ).encode("utf-8")
+
+
+def hash_content(
+    sections: Optional[Dict[str, Any]],
+    side_headers: Optional[Dict[str, Any]],
+    logic: Optional[Dict[str, Any]],
+) -> Tuple[str, int]:
+    """SHA-256 of the canonical content, and its size in bytes"""
+    encoded = canonical_content(sections, side_headers, logic)
+    return hashlib.sha256(encoded).hexdigest(), len(encoded)
+
+
+async def put_blob(
+    db: AsyncSession,
+    sections: Optional[Dict[str, Any]],
+    side_headers: Optional[Dict[str, Any]],
+    logic: Optional[Dict[str, Any]],
+) -> str:
+    """
+    Store template content unless a blob with the same hash exists;
+    returns the hash. Part of the caller's transaction, which keeps the
+    blob locked against release_blob until it commits.
+    """
+    content_hash, size = hash_content(sections, side_headers, logic)
+    while True:
+        inserted = await db.execute(
+            insert(TemplateBlob)
+            .values(
+                content_hash=content_hash,
+                sections=sections,
+                side_headers=side_headers,
+                logic=logic,
+                size=size,
+            )
+            .on_conflict_do_nothing(index_elements=[TemplateBlob.content_hash])
+            .returning(TemplateBlob.content_hash)
+        )
+        if inserted.scalar() is not None:
+            return content_hash
+
+        # Already stored. ON CONFLICT DO NOTHING takes no lock, so take a key
+        # share lock: a concurrent delete then waits for this transaction and
+        # fails the foreign key check once its template points at the blob
+        locked = await db.execute(
+            select(TemplateBlob.content_hash)
+            .where(TemplateBlob.content_hash == content_hash)
+            .with_for_update(key_share=True)
+        )
+        if locked.scalar() is not None:
+            return content_hash
+        # Deleted between the insert and the lock; store it again
+
+
+async def release_blob(db: AsyncSession, content_hash: str) -> None:
+    """
+    Delete a blob once no template points at it. Call after the template
+    change is flushed. A transaction that got the same blob from put_blob
+    holds a lock on it, so the delete waits for that transaction; once its
+    template points at the blob the foreign key check fails and the delete
+    is skipped.
+    """
+    try:
+        async with db.begin_nested():
+            await db.execute(
+                delete(TemplateBlob)
+                .where(TemplateBlob.content_hash == content_hash)
+                .where(~exists(select(FormTemplate.id).where(FormTemplate.content_hash == content_hash)))
+            )
+    except IntegrityError:
+        pass
@@ -0,0 +1,155 @@
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional, Tuple
+from uuid import UUID
+
+import asyncpg
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.form_template import FormTemplate
+from app.schemas.form_template import FormTemplateResponse
+
+logger = logging.getLogger(__name__)
+
+
+class TemplateCache:
+    """
+    Parsed form templates keyed by (template_id, content_hash), filled lazily.
+
+    An index maps each template id to the content hash last loaded.
+    update/delete invalidate locally and NOTIFY the other workers; entries
+    also expire after ttl in case a notification was missed. State is per
+    process.
+    """
+
+    def __init__(self, max_size: int, ttl: float):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Tuple[UUID, str], Tuple[FormTemplateResponse, float]]" = OrderedDict()
+        self._hashes: Dict[UUID, str] = {}
+        # Bumped on every invalidation; a load that started before it
+        # must not store what it read
+        self._generation = 0
+
+    def _lookup(self, template_id: UUID) -> Optional[FormTemplateResponse]:
+        content_hash = self._hashes.get(template_id)
+        if content_hash is None:
+            return None
+        key = (template_id, content_hash)
+        cached = self._entries.get(key)
+        if cached is None or cached[1] <= time.monotonic():
+            self._drop(template_id)
+            return None
+        self._entries.move_to_end(key)
+        return cached[0]
+
+    def _store(self, template: FormTemplateResponse, generation: int) -> None:
+        if self.max_size <= 0 or generation != self._generation:
+            return
+        self._drop(template.id)
+        self._hashes[template.id] = template.content_hash
+        self._entries[(template.id, template.content_hash)] = (template, time.monotonic() + self.ttl)
+        while len(self._entries) > self.max_size:
+            (evicted_id, _), _ = self._entries.popitem(last=False)
+            self._hashes.pop(evicted_id, None)
+
+    def _drop(self, template_id: UUID) -> None:
+        content_hash = self._hashes.pop(template_id, None)
+        if content_hash is not None:
+            self._entries.pop((template_id, content_hash), None)
+
+    async def get(self, db: AsyncSession, template_id: UUID) -> Optional[FormTemplateResponse]:
+        templates = await self.get_many(db, [template_id])
+        return templates.get(template_id)
+
+    async def get_many(
+        self, db: AsyncSession, template_ids: Iterable[UUID]
+    ) -> Dict[UUID, FormTemplateResponse]:
+        """Cached templates for the given ids; misses are loaded in one query"""
+        found: Dict[UUID, FormTemplateResponse] = {}
+        missing = set()
+        for template_id in template_ids:
+            if template_id is None or template_id in found or template_id in missing:
+                continue
+            template = self._lookup(template_id)
+            if template is None:
+                missing.add(template_id)
+            else:
+                found[template_id] = template
+        self.hits += len(found)
+        self.misses += len(missing)
+
+        if missing:
+            generation = self._generation
+            result = await db.execute(select(FormTemplate).where(FormTemplate.id.in_(missing)))
+            for row in result.scalars().all():
+                template = FormTemplateResponse.model_validate(row)
+                self._store(template, generation)
+                found[template.id] = template
+        return found
+
+    def invalidate(self, template_id: UUID) -> None:
+        self._generation += 1
+        self._drop(template_id)
+
+    def clear(self) -> None:
+        self._generation += 1
+        self._entries.clear()
+        self._hashes.clear()
+
+    async def notify(self, db: AsyncSession, template_id: UUID) -> None:
+        """
+        Queue a cross-worker invalidation. Postgres delivers it when the
+        transaction commits, so other workers never see it before the change
+        """
+        await db.execute(
+            text("SELECT pg_notify(:channel, :payload)"),
+            {"channel": settings.TEMPLATE_CACHE_CHANNEL, "payload": str(template_id)},
+        )
+
+    def stats(self) -> Dict[str, int]:
+        return {"size": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+template_cache = TemplateCache(settings.TEMPLATE_CACHE_SIZE, settings.TEMPLATE_CACHE_TTL_SECONDS)
+
+
+def _on_template_changed(connection, pid, channel, payload) -> None:
+    try:
+        template_cache.invalidate(UUID(payload))
+    except ValueError:
+        template_cache.clear()
+
+
+async def listen_for_template_changes(retry_seconds: float = 5.0) -> None:
+    """
+    Keep a dedicated LISTEN connection open for template invalidations.
+    Runs until cancelled; while it is disconnected nothing is cached for
+    longer than the ttl, and the cache is cleared on every reconnect.
+    """
+    from app.db.base import engine
+
+    # LISTEN holds session state, so it gets its own connection outside the pool
+    _, connect_kwargs = engine.dialect.create_connect_args(engine.url)
+    while True:
+        connection = None
+        try:
+            connection = await asyncpg.connect(**connect_kwargs)
+            await connection.add_listener(settings.TEMPLATE_CACHE_CHANNEL, _on_template_changed)
+            template_cache.clear()
+            while not connection.is_closed():
+                await asyncio.sleep(retry_seconds)
+        except asyncio.CancelledError:
+            raise
+        except Exception as exc:
+            logger.warning("Template invalidation listener disconnected: %s", exc)
+        finally:
+            if connection is not None and not connection.is_closed():
+                await connection.close()
+        await asyncio.sleep(retry_seconds)
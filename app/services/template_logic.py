@@ -0,0 +1,316 @@
+import logging
+import operator
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterator, List, Optional, Set, Tuple
+
+from app.core.config import settings
+from app.schemas.form_template import FormTemplateResponse
+
+logger = logging.getLogger(__name__)
+
+# FormTemplate.logic maps a field id, or a section id (applies to all of the
+# section's fields), to its rules:
+#
+#   {"pregnancy_test": {"show_if": {"field": "gender", "op": "eq", "value": "female"}},
+#    "smoking_details": {"required_if": {"field": "smoker", "op": "eq", "value": "yes"}}}
+#
+# A condition is {"field": <id or dotted path>, "op": <op>, "value": ...}, or
+# {"all": [...]}, {"any": [...]}, {"not": <condition>}. Ops: eq, ne, gt, gte,
+# lt, lte, in, not_in, contains, empty, not_empty. Fields hidden by show_if
+# are "not applicable": never required, exported as NOT_APPLICABLE, and read
+# as empty by other fields' conditions.
+
+NOT_APPLICABLE = "N/A"
+
+# Field types that hold no answer
+_LAYOUT_TYPES = {"header"}
+
+Predicate = Callable[[Dict[str, Any], Set[str]], bool]
+
+
+class LogicError(ValueError):
+    """Template logic that cannot be compiled"""
+
+
+def is_blank(value: Any) -> bool:
+    return value is None or value == "" or value == [] or value == {}
+
+
+def iter_fields(sections: Any) -> Iterator[Tuple[Optional[str], Dict[str, Any]]]:
+    """
+    (section id, field) for every field, whether sections is a list of
+    sections, {"sections": [...]}, or a dict keyed by section id
+    """
+    if isinstance(sections, dict):
+        if isinstance(sections.get("sections"), list):
+            items = [(section.get("id"), section) for section in sections["sections"] if isinstance(section, dict)]
+        else:
+            items = list(sections.items())
+    elif isinstance(sections, list):
+        items = [(section.get("id"), section) for section in sections if isinstance(section, dict)]
+    else:
+        return
+    for section_id, section in items:
+        if not isinstance(section, dict):
+            continue
+        for field in section.get("fields") or []:
+            if isinstance(field, dict) and (field.get("id") or field.get("name")):
+                yield section_id, field
+
+
+def _getter(path: str) -> Callable[[Dict[str, Any], Set[str]], Any]:
+    root, *rest = path.split(".")
+    if not rest:
+        def get(data: Dict[str, Any], hidden: Set[str]) -> Any:
+            return None if root in hidden else data.get(root)
+        return get
+
+    def get_nested(data: Dict[str, Any], hidden: Set[str]) -> Any:
+        if root in hidden:
+            return None
+        value = data.get(root)
+        for part in rest:
+            if not isinstance(value, dict):
+                return None
+            value = value.get(part)
+        return value
+    return get_nested
+
+
+_ORDERINGS = {"gt": operator.gt, "gte": operator.ge, "lt": operator.lt, "lte": operator.le}
+
+
+def compile_condition(condition: Any, references: Set[str]) -> Predicate:
+    """Compile one condition to a closure; adds the fields it reads to references"""
+    if not isinstance(condition, dict):
+        raise LogicError(f"Condition must be an object, got {condition!r}")
+
+    for combinator in ("all", "any"):
+        if combinator in condition:
+            if not isinstance(condition[combinator], list):
+                raise LogicError(f"'{combinator}' takes a list of conditions")
+            parts = [compile_condition(part, references) for part in condition[combinator]]
+            if len(parts) == 1:
+                return parts[0]
+            # Plain loops: a generator per call costs more than the predicates
+            if combinator == "all":
+                def all_of(data: Dict[str, Any], hidden: Set[str]) -> bool:
+                    for part in parts:
+                        if not part(data, hidden):
+                            return False
+                    return True
+                return all_of
+
+            def any_of(data: Dict[str, Any], hidden: Set[str]) -> bool:
+                for part in parts:
+                    if part(data, hidden):
+                        return True
+                return False
+            return any_of
+    if "not" in condition:
+        inner = compile_condition(condition["not"], references)
+        return lambda data, hidden: not inner(data, hidden)
+
+    field = condition.get("field")
+    if not isinstance(field, str) or not field:
+        raise LogicError(f"Condition needs a field: {condition!r}")
+    references.add(field.split(".")[0])
+    get = _getter(field)
+    op = condition.get("op", "eq")
+    expected = condition.get("value")
+
+    if "." not in field and op in ("eq", "ne", "not_empty"):
+        # The common cases, with the field lookup inlined
+        if op == "eq":
+            return lambda data, hidden: (None if field in hidden else data.get(field)) == expected
+        if op == "ne":
+            return lambda data, hidden: (None if field in hidden else data.get(field)) != expected
+        return lambda data, hidden: field not in hidden and not is_blank(data.get(field))
+
+    if op == "empty":
+        return lambda data, hidden: is_blank(get(data, hidden))
+    if op == "not_empty":
+        return lambda data, hidden: not is_blank(get(data, hidden))
+    if op == "eq":
+        return lambda data, hidden: get(data, hidden) == expected
+    if op == "ne":
+        return lambda data, hidden: get(data, hidden) != expected
+    if op == "contains":
+        def contains(data: Dict[str, Any], hidden: Set[str]) -> bool:
+            actual = get(data, hidden)
+            return isinstance(actual, (list, str)) and expected in actual
+        return contains
+    if op in ("in", "not_in"):
+        if not isinstance(expected, list):
+            raise LogicError(f"'{op}' needs a list value: {condition!r}")
+        options = list(expected)
+
+        def is_in(data: Dict[str, Any], hidden: Set[str]) -> bool:
+            actual = get(data, hidden)
+            # Multi-select answers match if any choice is in the list
+            if isinstance(actual, list):
+                return any(item in options for item in actual)
+            return actual in options
+        if op == "in":
+            return is_in
+        return lambda data, hidden: not is_in(data, hidden)
+    if op in _ORDERINGS:
+        compare = _ORDERINGS[op]
+        numeric = isinstance(expected, (int, float)) and not isinstance(expected, bool)
+
+        def ordered(data: Dict[str, Any], hidden: Set[str]) -> bool:
+            actual = get(data, hidden)
+            if is_blank(actual):
+                return False
+            if numeric and isinstance(actual, str):
+                try:
+                    actual = float(actual)
+                except ValueError:
+                    return False
+            try:
+                return compare(actual, expected)
+            except TypeError:
+                return False
+        return ordered
+    raise LogicError(f"Unknown operator '{op}'")
+
+
+class CompiledLogic:
+    """
+    A template's fields and logic compiled to closures. show_if rules are
+    sorted so a rule runs after every rule that can hide a field it reads,
+    which settles all visibility in a single pass.
+    """
+
+    def __init__(
+        self,
+        fields: List[str],
+        required: List[str],
+        show_rules: List[Tuple[Tuple[str, ...], Predicate]],
+        required_rules: List[Tuple[str, Predicate]],
+    ):
+        self.fields = fields
+        self._required = required
+        self._show_rules = show_rules
+        self._required_rules = required_rules
+
+    def hidden_fields(self, data: Dict[str, Any]) -> Set[str]:
+        hidden: Set[str] = set()
+        for targets, predicate in self._show_rules:
+            if not predicate(data, hidden):
+                hidden.update(targets)
+        return hidden
+
+    def evaluate(self, data: Dict[str, Any]) -> Tuple[Set[str], List[str]]:
+        """Hidden (not applicable) fields and the fields required for this data"""
+        hidden = self.hidden_fields(data)
+        required = [field for field in self._required if field not in hidden]
+        for field, predicate in self._required_rules:
+            if field not in hidden and predicate(data, hidden):
+                required.append(field)
+        return hidden, required
+
+    def missing_required(self, data: Dict[str, Any]) -> List[str]:
+        _, required = self.evaluate(data)
+        return [field for field in required if is_blank(data.get(field))]
+
+    def export_values(self, data: Dict[str, Any]) -> List[Any]:
+        """One value per field, NOT_APPLICABLE where the logic hides it"""
+        hidden = self.hidden_fields(data)
+        return [NOT_APPLICABLE if field in hidden else data.get(field) for field in self.fields]
+
+
+def compile_template(sections: Any, logic: Any) -> CompiledLogic:
+    fields: List[str] = []
+    required: List[str] = []
+    section_fields: Dict[str, List[str]] = {}
+    for section_id, field in iter_fields(sections):
+        field_id = field.get("id") or field.get("name")
+        if field.get("type") in _LAYOUT_TYPES:
+            continue
+        fields.append(field_id)
+        if section_id:
+            section_fields.setdefault(section_id, []).append(field_id)
+        if field.get("required"):
+            required.append(field_id)
+
+    if logic is not None and not isinstance(logic, dict):
+        raise LogicError("Template logic must be an object")
+
+    show_rules: List[Tuple[Tuple[str, ...], Predicate, Set[str]]] = []
+    required_rules: List[Tuple[str, Predicate]] = []
+    for target, rules in (logic or {}).items():
+        if not isinstance(rules, dict):
+            raise LogicError(f"Rules for '{target}' must be an object")
+        if "show_if" in rules:
+            references: Set[str] = set()
+            predicate = compile_condition(rules["show_if"], references)
+            targets = (target, *section_fields.get(target, ()))
+            show_rules.append((targets, predicate, references))
+        if "required_if" in rules:
+            predicate = compile_condition(rules["required_if"], set())
+            for field in section_fields.get(target, (target,)):
+                required_rules.append((field, predicate))
+
+    ordered = _order_show_rules(show_rules)
+    return CompiledLogic(fields, required, ordered, required_rules)
+
+
+def _order_show_rules(
+    rules: List[Tuple[Tuple[str, ...], Predicate, Set[str]]]
+) -> List[Tuple[Tuple[str, ...], Predicate]]:
+    # Kahn's algorithm over "rule j can hide a field that rule i reads"
+    hidden_by: Dict[str, List[int]] = {}
+    for index, (targets, _, _) in enumerate(rules):
+        for target in targets:
+            hidden_by.setdefault(target, []).append(index)
+    dependencies = [
+        {dep for field in references for dep in hidden_by.get(field, ())}
+        for _, _, references in rules
+    ]
+    dependents: Dict[int, List[int]] = {}
+    for index, deps in enumerate(dependencies):
+        for dep in deps:
+            dependents.setdefault(dep, []).append(index)
+
+    pending = [len(deps) for deps in dependencies]
+    ready = [index for index, count in enumerate(pending) if count == 0]
+    ordered = []
+    while ready:
+        index = ready.pop()
+        ordered.append(rules[index][:2])
+        for dependent in dependents.get(index, ()):
+            pending[dependent] -= 1
+            if pending[dependent] == 0:
+                ready.append(dependent)
+    if len(ordered) != len(rules):
+        cycle = sorted({rules[index][0][0] for index, count in enumerate(pending) if count})
+        raise LogicError(f"Circular show_if rules: {', '.join(cycle)}")
+    return ordered
+
+
+_compiled: "OrderedDict[str, CompiledLogic]" = OrderedDict()
+
+
+def compiled_logic(template: FormTemplateResponse) -> CompiledLogic:
+    """
+    Compiled logic for a template, cached by content hash: templates with the
+    same content share it, and an edit (with or without a version bump)
+    changes the hash.
+    """
+    key = template.content_hash
+    compiled = _compiled.get(key)
+    if compiled is not None:
+        _compiled.move_to_end(key)
+        return compiled
+
+    try:
+        compiled = compile_template(template.sections, template.logic)
+    except LogicError as exc:
+        # Saved before logic was validated; enforce the static rules only
+        logger.warning("Ignoring invalid logic of template %s: %s", template.id, exc)
+        compiled = compile_template(template.sections, None)
+    _compiled[key] = compiled
+    while len(_compiled) > settings.TEMPLATE_CACHE_SIZE:
+        _compiled.popitem(last=False)
+    return compiled
@@ -0,0 +1,384 @@
+import asyncio
+import hashlib
+import json
+import re
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+from uuid import UUID
+
+import fastjsonschema
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.template_schema import TemplateSchema
+from app.schemas.form_template import FormTemplateResponse
+from app.services.template_cache import template_cache
+from app.services.template_logic import iter_fields
+
+# Each template version is compiled once to a JSON Schema (draft-07) for the
+# form data: one property per field, typed from the field type and options,
+# and "required" for statically required fields. Fields targeted by logic
+# (show_if / required_if) are never statically required; the compiled
+# template logic decides those. Numeric fields are JSON numbers (blank is a
+# string of whitespace or null); the browser sends number inputs as strings,
+# so numeric strings are converted before validating, as the schema's
+# $comment tells offline clients to do too.
+
+SCHEMA_DIALECT = "http://json-schema.org/draft-07/schema#"
+SCHEMA_COMMENT = (
+    "Convert numeric strings in number fields (and table cells) to numbers "
+    "before validating"
+)
+
+_NUMBER = r"\s*-?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?\s*"
+_NUMBER_RE = re.compile(_NUMBER)
+_NUMBER_TYPES = {"number", "range", "rating", "scale", "calculation"}
+_STRING_TYPES = {
+    "text", "textarea", "email", "tel", "url", "password", "hidden",
+    "date", "time", "datetime", "signature",
+}
+_CHOICE_TYPES = {"select", "radio"}
+_NOT_BLANK = {"not": {"enum": [None, "", [], {}]}}
+
+
+def _option_values(options: Any) -> List[Any]:
+    values = []
+    for option in options or []:
+        value = option.get("value") if isinstance(option, dict) else option
+        if value is not None:
+            values.append(value)
+    return values
+
+
+def _field_schema(field: Dict[str, Any], required: bool) -> Dict[str, Any]:
+    field_type = field.get("type") or "text"
+    validation = field.get("validation") or {}
+
+    if field_type in _CHOICE_TYPES and _option_values(field.get("options")):
+        values = _option_values(field.get("options"))
+        return {"enum": values if required else [*values, "", None]}
+
+    if field_type == "checkbox":
+        values = _option_values(field.get("options"))
+        if values:
+            schema: Dict[str, Any] = {"type": "array", "items": {"enum": values}}
+            return {**schema, "minItems": 1} if required else {**schema, "type": ["array", "null"]}
+        if required:
+            return {"type": ["boolean", "string"], "minLength": 1}
+        return {"type": ["boolean", "string", "null"]}
+
+    if field_type in _NUMBER_TYPES:
+        schema = {"type": "number"} if required else {"type": ["number", "string", "null"], "pattern": r"^\s*$"}
+        for keyword, key in (("minimum", "min"), ("maximum", "max")):
+            if isinstance(validation.get(key), (int, float)) and not isinstance(validation.get(key), bool):
+                schema[keyword] = validation[key]
+        return schema
+
+    if field_type in _STRING_TYPES:
+        schema = {"type": "string", "minLength": 1} if required else {"type": ["string", "null"]}
+        pattern = validation.get("pattern")
+        if isinstance(pattern, str) and pattern:
+            if required:
+                schema["pattern"] = pattern
+            else:
+                schema["anyOf"] = [{"maxLength": 0}, {"pattern": pattern}]
+        return schema
+
+    if field_type == "table":
+        columns = (field.get("tableConfig") or {}).get("columns") or field.get("columns") or []
+        cells = {
+            column["id"]: _field_schema(column, bool(column.get("required")))
+            for column in columns
+            if isinstance(column, dict) and column.get("id")
+        }
+        cells_schema: Dict[str, Any] = {"type": "object", "properties": cells}
+        required_cells = sorted(
+            column["id"] for column in columns
+            if isinstance(column, dict) and column.get("id") and column.get("required")
+        )
+        if required_cells:
+            cells_schema["required"] = required_cells
+        schema = {
+            "type": "array",
+            "items": {"type": "object", "properties": {"cells": cells_schema}},
+        }
+        return {**schema, "minItems": 1} if required else {**schema, "type": ["array", "null"]}
+
+    # Types without a fixed value shape (yesno, matrix, file, ...)
+    return dict(_NOT_BLANK) if required else {}
+
+
+def _logic_targets(sections: Any, logic: Any) -> Set[str]:
+    section_fields: Dict[str, List[str]] = {}
+    for section_id, field in iter_fields(sections):
+        if section_id:
+            section_fields.setdefault(section_id, []).append(field.get("id") or field.get("name"))
+    targets: Set[str] = set()
+    for target in (logic or {}) if isinstance(logic, dict) else ():
+        targets.add(target)
+        targets.update(section_fields.get(target, ()))
+    return targets
+
+
+class SchemaError(ValueError):
+    """A template whose form data schema cannot be compiled"""
+
+
+def build_schema(template: FormTemplateResponse) -> Dict[str, Any]:
+    """JSON Schema for the data of forms using this template"""
+    return _build_schema(template.sections, template.logic, f"{template.name} v{template.version}")
+
+
+def _build_schema(sections: Any, logic: Any, title: str) -> Dict[str, Any]:
+    conditional = _logic_targets(sections, logic)
+    properties: Dict[str, Any] = {}
+    required: List[str] = []
+    # Fields of the same shape share a definition, so the schema and the
+    # validator generated from it grow with the number of distinct shapes
+    # rather than the number of fields
+    definitions: Dict[str, Any] = {}
+    names: Dict[str, str] = {}
+    for _, field in iter_fields(sections):
+        if field.get("type") == "header":
+            continue
+        field_id = field.get("id") or field.get("name")
+        is_required = bool(field.get("required")) and field_id not in conditional
+        field_schema = _field_schema(field, is_required)
+        if field_schema:
+            shape = json.dumps(field_schema, sort_keys=True)
+            name = names.get(shape)
+            if name is None:
+                name = names[shape] = f"field{len(names)}"
+                definitions[name] = field_schema
+            field_schema = {"$ref": f"#/definitions/{name}"}
+        properties[field_id] = field_schema
+        if is_required:
+            required.append(field_id)
+
+    schema = {
+        "$schema": SCHEMA_DIALECT,
+        "$comment": SCHEMA_COMMENT,
+        "title": title,
+        "type": "object",
+        "properties": properties,
+    }
+    if required:
+        schema["required"] = required
+    if definitions:
+        schema["definitions"] = definitions
+    return schema
+
+
+def _check_patterns(sections: Any) -> None:
+    for _, field in iter_fields(sections):
+        columns = (field.get("tableConfig") or {}).get("columns") or field.get("columns") or []
+        for item in [field, *columns]:
+            pattern = (item.get("validation") or {}).get("pattern") if isinstance(item, dict) else None
+            if isinstance(pattern, str) and pattern:
+                try:
+                    re.compile(pattern)
+                except re.error as exc:
+                    field_id = item.get("id") or item.get("name")
+                    raise SchemaError(f"{field_id}: invalid pattern {pattern!r} ({exc})")
+
+
+async def check_schema(sections: Any, logic: Any) -> None:
+    """
+    Compile the schema these sections would publish, so a template that
+    cannot validate form data is rejected on save rather than failing every
+    submission. Raises SchemaError.
+    """
+    # Patterns are checked first for a message that names the field;
+    # validation uses Python's re, so JavaScript-only syntax is invalid too
+    _check_patterns(sections)
+    try:
+        await asyncio.to_thread(fastjsonschema.compile, _build_schema(sections, logic, "check"))
+    except (re.error, fastjsonschema.JsonSchemaDefinitionException) as exc:
+        raise SchemaError(str(exc))
+
+
+def _is_numeric(schema: Dict[str, Any]) -> bool:
+    types = schema.get("type")
+    return types == "number" or (isinstance(types, list) and "number" in types)
+
+
+def _numeric_paths(document: Dict[str, Any]) -> Tuple[List[str], Dict[str, List[str]]]:
+    """Number fields, and number columns of each table field, of a schema"""
+    definitions = document.get("definitions") or {}
+
+    def resolve(schema: Dict[str, Any]) -> Dict[str, Any]:
+        ref = schema.get("$ref", "")
+        return definitions.get(ref.rsplit("/", 1)[-1], {}) if ref else schema
+
+    fields: List[str] = []
+    tables: Dict[str, List[str]] = {}
+    for field_id, schema in (document.get("properties") or {}).items():
+        schema = resolve(schema)
+        if _is_numeric(schema):
+            fields.append(field_id)
+            continue
+        cells = ((schema.get("items") or {}).get("properties") or {}).get("cells") or {}
+        columns = [
+            column for column, column_schema in (cells.get("properties") or {}).items()
+            if _is_numeric(column_schema)
+        ]
+        if columns:
+            tables[field_id] = columns
+    return fields, tables
+
+
+def _to_number(value: Any) -> Any:
+    if isinstance(value, str) and _NUMBER_RE.fullmatch(value):
+        return float(value)
+    return value
+
+
+def coerce_numbers(
+    data: Dict[str, Any], fields: List[str], tables: Dict[str, List[str]]
+) -> Dict[str, Any]:
+    """
+    A copy of data with numeric strings in number fields and number table
+    cells converted to numbers; data itself is left as stored
+    """
+    coerced = dict(data)
+    for field in fields:
+        if field in coerced:
+            coerced[field] = _to_number(coerced[field])
+    for table, columns in tables.items():
+        rows = coerced.get(table)
+        if not isinstance(rows, list):
+            continue
+        coerced_rows = []
+        for row in rows:
+            if isinstance(row, dict) and isinstance(row.get("cells"), dict):
+                cells = dict(row["cells"])
+                for column in columns:
+                    if column in cells:
+                        cells[column] = _to_number(cells[column])
+                row = {**row, "cells": cells}
+            coerced_rows.append(row)
+        coerced[table] = coerced_rows
+    return coerced
+
+
+class PublishedSchema:
+    """A stored schema: its serialized form, strong ETag and compiled validator"""
+
+    def __init__(self, document: Dict[str, Any], content_hash: str):
+        self.document = json.dumps(
+            document, sort_keys=True, separators=(",", ":"), ensure_ascii=False
+        ).encode("utf-8")
+        self.etag = f'"{hashlib.sha256(self.document).hexdigest()}"'
+        self.content_hash = content_hash
+        self._schema = document
+        self._numeric_fields, self._numeric_tables = _numeric_paths(document)
+        self._validate: Optional[Callable[[Any], Any]] = None
+
+    async def compile(self) -> None:
+        """
+        Generate the validator, once; serving the schema doesn't need it.
+        A large template takes hundreds of milliseconds, so this runs in a
+        thread to keep the event loop responsive.
+        """
+        if self._validate is None:
+            self._validate = await asyncio.to_thread(fastjsonschema.compile, self._schema)
+
+    def validation_error(self, data: Dict[str, Any]) -> Optional[str]:
+        """The first violation in data, or None if it is valid; call compile() first"""
+        try:
+            self._validate(coerce_numbers(data, self._numeric_fields, self._numeric_tables))
+        except fastjsonschema.JsonSchemaValueException as exc:
+            return exc.message
+        return None
+
+
+_published: "OrderedDict[Tuple[UUID, int], PublishedSchema]" = OrderedDict()
+
+
+async def get_schema(
+    db: AsyncSession, template_id: UUID, version: int
+) -> Optional[PublishedSchema]:
+    """
+    The schema of a template version. The current version's schema is
+    built and stored on first use; an older version has one only if it was
+    published while current. None if the template or schema doesn't exist.
+    """
+    template = await template_cache.get(db, template_id)
+    if template is None:
+        return None
+
+    key = (template_id, version)
+    published = _published.get(key)
+    if published is not None:
+        _published.move_to_end(key)
+        return published
+
+    query = select(TemplateSchema.document, TemplateSchema.content_hash).where(
+        TemplateSchema.template_id == template_id, TemplateSchema.version == version
+    )
+    row = (await db.execute(query)).first()
+    if row is None:
+        if template.version != version:
+            return None
+        row = await _publish(template, query)
+
+    published = PublishedSchema(row.document, row.content_hash)
+    _published[key] = published
+    while len(_published) > settings.TEMPLATE_CACHE_SIZE:
+        _published.popitem(last=False)
+    return published
+
+
+async def _publish(template: FormTemplateResponse, query: Any) -> Any:
+    # Own session and transaction: publishing must not commit (or be rolled
+    # back with) whatever the caller's session is doing
+    from app.db.base import AsyncSessionLocal
+
+    async with AsyncSessionLocal() as session:
+        await session.execute(
+            insert(TemplateSchema)
+            .values(
+                template_id=template.id,
+                version=template.version,
+                content_hash=template.content_hash,
+                document=build_schema(template),
+            )
+            .on_conflict_do_nothing(index_elements=[TemplateSchema.template_id, TemplateSchema.version])
+        )
+        # Another worker may have published first; serve what was stored
+        row = (await session.execute(query)).first()
+        await session.commit()
+    return row
+
+
+async def published_content_hash(db: AsyncSession, template_id: UUID, version: int) -> Optional[str]:
+    """Content hash a version's schema was published from, None if unpublished"""
+    published = _published.get((template_id, version))
+    if published is not None:
+        return published.content_hash
+    result = await db.execute(
+        select(TemplateSchema.content_hash).where(
+            TemplateSchema.template_id == template_id, TemplateSchema.version == version
+        )
+    )
+    return result.scalar()
+
+
+async def validation_error(
+    db: AsyncSession, template_id: UUID, data: Optional[Dict[str, Any]]
+) -> Optional[str]:
+    """
+    Check form data against the schema of the template's current version,
+    publishing it if needed. None if the data is valid (or there's no
+    template).
+    """
+    template = await template_cache.get(db, template_id)
+    if template is None:
+        return None
+    published = await get_schema(db, template_id, template.version)
+    if published is None:
+        return None
+    await published.compile()
+    return published.validation_error(data or {})
@@ -1,3 +1,4 @@
+from datetime import datetime
 from typing import Any, List, Optional
 from uuid import UUID
 
@@ -7,23 +8,37 @@ from sqlalchemy import select, func, desc
 from sqlalchemy.orm import selectinload
 
 from app.core.security import get_current_user, get_admin_user, User as SecurityUser
-from app.db.session import get_db
+from app.db.session import get_read_db
 from app.models.unified_models import AuditLog
-from app.schemas.unified_schemas import AuditLogResponse, PaginatedResponse
+from app.schemas.unified_schemas import AuditLogResponse, CursorPaginatedResponse, PaginatedResponse
+from app.services import audit_service
 from app.services.audit_service import get_audit_trail
+from app.utils.pagination import decode_cursor, encode_cursor
 
 router = APIRouter()
 
+def _apply_date_range(query, date_from: Optional[datetime], date_to: Optional[datetime]):
+    """
+    Restrict an audit log query to [date_from, date_to)
+    """
+    if date_from:
+        query = query.where(AuditLog.created_at >= date_from)
+    if date_to:
+        query = query.where(AuditLog.created_at < date_to)
+    return query
+
 @router.get("/", response_model=PaginatedResponse)
 async def get_audit_logs(
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: SecurityUser = Depends(get_current_user),
     page: int = Query(1, ge=1),
     limit: int = Query(50, ge=1, le=100),
     resource_type: Optional[str] = None,
     resource_id: Optional[UUID] = None,
     user_id: Optional[UUID] = None,
-    action: Optional[str] = None
+    action: Optional[str] = None,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None
 ) -> Any:
     """
     Get audit logs with filtering and pagination
@@ -52,6 +67,8 @@ async def get_audit_logs(
     if action:
         query = query.where(AuditLog.action == action)
     
+    query = _apply_date_range(query, date_from, date_to)
+    
     # Get total count
     count_query = select(func.count()).select_from(query.subquery())
     total_result = await db.execute(count_query)
@@ -75,8 +92,10 @@ async def get_audit_logs(
 @router.get("/form/{form_id}", response_model=List[AuditLogResponse])
 async def get_form_audit_trail(
     form_id: UUID,
-    db: AsyncSession = Depends(get_db),
-    current_user: SecurityUser = Depends(get_current_user)
+    db: AsyncSession = Depends(get_read_db),
+    current_user: SecurityUser = Depends(get_current_user),
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None
 ) -> Any:
     """
     Get audit trail for a specific form
@@ -111,10 +130,13 @@ async def get_form_audit_trail(
                 detail="You don't have access to this form's audit trail"
             )
     
-    # Get audit logs for this form
+    # Get audit logs for this form from idx_audit_logs_form_created. The trail
+    # isn't paginated, so a short one is read with a bitmap scan and sorted in
+    # memory, which the planner rightly finds cheaper than an ordered scan
     query = select(AuditLog).options(selectinload(AuditLog.user)).where(
         AuditLog.form_id == form_id
-    ).order_by(desc(AuditLog.created_at))
+    )
+    query = _apply_date_range(query, date_from, date_to).order_by(desc(AuditLog.created_at))
     
     result = await db.execute(query)
     audit_logs = result.scalars().all()
@@ -124,10 +146,12 @@ async def get_form_audit_trail(
 @router.get("/user/{user_id}", response_model=PaginatedResponse)
 async def get_user_audit_trail(
     user_id: UUID,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: SecurityUser = Depends(get_admin_user),  # Only admins can view other users' audit trails
     page: int = Query(1, ge=1),
-    limit: int = Query(50, ge=1, le=100)
+    limit: int = Query(50, ge=1, le=100),
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None
 ) -> Any:
     """
     Get audit trail for a specific user (admin only)
@@ -146,10 +170,11 @@ async def get_user_audit_trail(
             detail="User not found"
         )
     
-    # Get audit logs for this user
+    # Get audit logs for this user (served in order by idx_audit_logs_user_created)
     query = select(AuditLog).options(selectinload(AuditLog.user)).where(
         AuditLog.user_id == user_id
     )
+    query = _apply_date_range(query, date_from, date_to)
     
     # Get total count
     count_query = select(func.count()).select_from(query.subquery())
@@ -174,10 +199,12 @@ async def get_user_audit_trail(
 @router.get("/project/{project_id}", response_model=PaginatedResponse)
 async def get_project_audit_trail(
     project_id: UUID,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: SecurityUser = Depends(get_current_user),
     page: int = Query(1, ge=1),
-    limit: int = Query(50, ge=1, le=100)
+    limit: int = Query(50, ge=1, le=100),
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None
 ) -> Any:
     """
     Get audit trail for a specific project
@@ -207,12 +234,11 @@ async def get_project_audit_trail(
                 detail="You don't have access to this project's audit trail"
             )
     
-    # Get audit logs for this project and related forms
-    from sqlalchemy import text
-    
+    # Get audit logs for this project (served in order by idx_audit_logs_resource_created)
     query = select(AuditLog).options(selectinload(AuditLog.user)).where(
         (AuditLog.resource_type == "project") & (AuditLog.resource_id == project_id)
     )
+    query = _apply_date_range(query, date_from, date_to)
     
     # Get total count
     count_query = select(func.count()).select_from(query.subquery())
@@ -234,50 +260,74 @@ async def get_project_audit_trail(
         pages=(total + limit - 1) // limit
     )
 
-@router.get("/stats", response_model=dict)
-async def get_audit_stats(
-    db: AsyncSession = Depends(get_db),
-    current_user: SecurityUser = Depends(get_admin_user)  # Only admins can view stats
+@router.get("/search", response_model=CursorPaginatedResponse)
+async def search_audit_logs(
+    db: AsyncSession = Depends(get_read_db),
+    current_user: SecurityUser = Depends(get_admin_user),  # Only admins can search the audit trail
+    field_path: Optional[str] = Query(None, description="Dotted path of a changed field, e.g. hematology.hemoglobin"),
+    q: Optional[str] = Query(None, description="Full-text search over change reasons"),
+    project_id: Optional[UUID] = None,
+    user_id: Optional[UUID] = None,
+    action: Optional[str] = None,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=100)
 ) -> Any:
     """
-    Get audit statistics
+    Search audit logs by changed field path and reason text (keyset paginated)
     """
-    from sqlalchemy import text
-    from datetime import datetime, timedelta
-    
-    # Get basic stats
-    total_logs = await db.execute(select(func.count(AuditLog.id)))
-    total_count = total_logs.scalar()
+    after = None
+    if cursor:
+        try:
+            created_at, log_id = decode_cursor(cursor, 2)
+            after = (datetime.fromisoformat(created_at), UUID(log_id))
+        except (ValueError, TypeError):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid cursor"
+            )
     
-    # Get logs from last 24 hours
-    yesterday = datetime.utcnow() - timedelta(days=1)
-    recent_logs = await db.execute(
-        select(func.count(AuditLog.id)).where(AuditLog.created_at >= yesterday)
+    audit_logs = await audit_service.search_audit_logs(
+        db=db,
+        field_path=field_path,
+        text_query=q,
+        project_id=project_id,
+        user_id=user_id,
+        action=action,
+        date_from=date_from,
+        date_to=date_to,
+        after=after,
+        limit=limit
     )
-    recent_count = recent_logs.scalar()
-    
-    # Get top actions
-    top_actions = await db.execute(
-        select(AuditLog.action, func.count(AuditLog.id).label('count'))
-        .group_by(AuditLog.action)
-        .order_by(desc(text('count')))
-        .limit(10)
+    
+    next_cursor = None
+    if len(audit_logs) == limit:
+        last = audit_logs[-1]
+        next_cursor = encode_cursor(last.created_at.isoformat(), last.id)
+    
+    return CursorPaginatedResponse(
+        items=[AuditLogResponse.model_validate(log) for log in audit_logs],
+        limit=limit,
+        next_cursor=next_cursor
     )
-    top_actions_list = [{"action": row[0], "count": row[1]} for row in top_actions.fetchall()]
-    
-    # Get top users
-    top_users = await db.execute(
-        select(AuditLog.user_id, func.count(AuditLog.id).label('count'))
-        .where(AuditLog.user_id.isnot(None))
-        .group_by(AuditLog.user_id)
-        .order_by(desc(text('count')))
-        .limit(10)
+
+@router.get("/stats", response_model=dict)
+async def get_audit_stats(
+    db: AsyncSession = Depends(get_read_db),
+    current_user: SecurityUser = Depends(get_admin_user),  # Only admins can view stats
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    granularity: str = Query("day", pattern="^(hour|day|week|month)$"),
+    top: int = Query(10, ge=1, le=100)
+) -> Any:
+    """
+    Get audit statistics for a time range, bucketed by the requested granularity
+    """
+    return await audit_service.get_audit_stats(
+        db=db,
+        date_from=date_from,
+        date_to=date_to,
+        granularity=granularity,
+        top=top
     )
-    top_users_list = [{"user_id": str(row[0]), "count": row[1]} for row in top_users.fetchall()]
-    
-    return {
-        "total_logs": total_count,
-        "recent_logs_24h": recent_count,
-        "top_actions": top_actions_list,
-        "top_users": top_users_list
-    }
\ No newline at end of file
@@ -1,11 +1,16 @@
-from datetime import timedelta
-from typing import Any
+from datetime import datetime, timedelta, timezone
+from typing import Any, Optional
 
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from pydantic import BaseModel
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import settings
-from app.core.security import create_access_token
+from app.core.security import create_access_token, decode_token, password_hasher, token_cache
+from app.db.session import get_db
+from app.models.unified_models import User, UserStatus
 
 # Test users configuration
 TEST_USERS = {
@@ -37,9 +42,10 @@ class Token(BaseModel):
 
 
 @router.post("/login", response_model=Token)
-async def login(user_credentials: UserLogin) -> Any:
+async def login(user_credentials: UserLogin, db: AsyncSession = Depends(get_db)) -> Any:
     """
-    Login endpoint that bypasses password checks for test users.
+    Login endpoint. Test users bypass the password check; everyone else is
+    checked against the stored hash, which is upgraded if its cost is outdated.
     """
     email = user_credentials.email.lower().strip()
     
@@ -50,7 +56,7 @@ async def login(user_credentials: UserLogin) -> Any:
         
         # Create access token
         access_token = create_access_token(
-            email=email,
+            subject=email,
             role=user_info["role"]
         )
         
@@ -68,18 +74,60 @@ async def login(user_credentials: UserLogin) -> Any:
             user=user_response
         )
     
-    # For non-test users, reject for now
-    raise HTTPException(
+    invalid_credentials = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Invalid credentials. Only test accounts are supported.",
+        detail="Invalid credentials",
+    )
+    if db is None:
+        raise invalid_credentials
+
+    user = (await db.execute(select(User).where(User.email == email))).scalar_one_or_none()
+    if user is None:
+        raise invalid_credentials
+
+    verified, new_hash = await password_hasher.verify(user_credentials.password, user.hashed_password)
+    if not verified:
+        raise invalid_credentials
+    if user.status != UserStatus.ACTIVE:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail=f"User account is {user.status}",
+        )
+
+    if new_hash is not None:
+        # Stored with outdated cost parameters; replace it now that we
+        # have the plain password
+        user.hashed_password = new_hash
+    user.last_login = datetime.now(timezone.utc)
+    await db.commit()
+
+    return Token(
+        access_token=create_access_token(subject=user.id, role=user.role),
+        token_type="bearer",
+        user=UserResponse(
+            id=str(user.id),
+            email=user.email,
+            role=user.role,
+            first_name=user.first_name or "",
+            last_name=user.last_name or "",
+        ),
     )
 
 
 @router.post("/logout")
-async def logout() -> Any:
+async def logout(
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(HTTPBearer(auto_error=False))
+) -> Any:
     """
-    Logout endpoint - for JWT tokens, logout is handled client-side.
+    Logout endpoint - revokes the presented token until it expires.
     """
+    if credentials:
+        token = credentials.credentials
+        # Only genuine tokens are remembered, so junk can't crowd out real
+        # revocations
+        claims = token_cache.get(token) or decode_token(token)
+        if claims is not None:
+            token_cache.revoke(token, claims)
     return {"message": "Successfully logged out"}
 
 
@@ -89,5 +137,3 @@ async def get_current_user_info() -> Any:
     Get current user info - placeholder for now.
     """
     return {"message": "User info endpoint"}
-
-router = APIRouter()
\ No newline at end of file
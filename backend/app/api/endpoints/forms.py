@@ -1,3 +1,4 @@
+import asyncio
 from typing import Any, List, Optional
 from uuid import UUID
 
@@ -7,7 +8,8 @@ from sqlalchemy import select, func, and_, or_
 from sqlalchemy.orm import selectinload
 
 from app.core.security import get_current_user, get_admin_user, User as SecurityUser
-from app.db.session import get_db
+from app.db.instrumentation import query_budget
+from app.db.session import get_db, get_read_db
 from app.models.unified_models import Form, Project, FormStatus, FormType
 from app.schemas.unified_schemas import (
     FormCreate,
@@ -20,6 +22,7 @@ from app.schemas.unified_schemas import (
     PaginatedResponse
 )
 from app.services.audit_service import log_activity
+from app.services.pdf_cache import pdf_cache
 
 router = APIRouter()
 
@@ -109,8 +112,9 @@ async def create_form(
     return FormResponse.model_validate(form_with_relations)
 
 @router.get("/", response_model=PaginatedResponse)
+@query_budget(7)
 async def get_forms(
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: SecurityUser = Depends(get_current_user),
     page: int = Query(1, ge=1),
     limit: int = Query(20, ge=1, le=100),
@@ -297,6 +301,7 @@ async def update_form(
     )
     
     await db.commit()
+    await asyncio.to_thread(pdf_cache.invalidate, form.id)
     
     return FormResponse.model_validate(form)
 
@@ -374,6 +379,7 @@ async def submit_form(
     )
     
     await db.commit()
+    await asyncio.to_thread(pdf_cache.invalidate, form.id)
     
     return FormResponse.model_validate(form)
 
@@ -462,6 +468,7 @@ async def approve_or_reject_form(
     )
     
     await db.commit()
+    await asyncio.to_thread(pdf_cache.invalidate, form.id)
     
     return FormResponse.model_validate(form)
 
@@ -521,5 +528,6 @@ async def delete_form(
     
     await db.delete(form)
     await db.commit()
+    await asyncio.to_thread(pdf_cache.invalidate, form_id)
     
     return {"message": "Form deleted successfully"}
\ No newline at end of file
@@ -0,0 +1,90 @@
+from typing import Any, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+
+from app.core.security import User, get_admin_user, token_cache
+from app.db.pool import pool_status
+from app.db.slow_requests import slow_request_recorder
+
+router = APIRouter()
+
+
+@router.get("/db-pool")
+async def get_db_pool_metrics(
+    current_user: User = Depends(get_admin_user),
+) -> Any:
+    """
+    Connection pool usage and checkout wait times for this worker (admin only)
+    """
+    from app.db.base import engine, read_engine
+    from app.db.replica import replica_guard
+
+    if engine is None:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Database is not configured"
+        )
+
+    metrics = pool_status(engine)
+    if read_engine is not None:
+        metrics["replica"] = pool_status(read_engine)
+        metrics["replica"]["lag_seconds"] = replica_guard.lag
+    return metrics
+
+
+@router.get("/token-cache")
+async def get_token_cache_metrics(
+    current_user: User = Depends(get_admin_user),
+) -> Any:
+    """
+    Verified-token cache size, revocations and hit counts for this worker (admin only)
+    """
+    return token_cache.stats()
+
+
+@router.get("/slow-requests")
+async def get_slow_requests(
+    limit: int = Query(50, ge=1, le=1000),
+    path: Optional[str] = None,
+    current_user: User = Depends(get_admin_user),
+) -> Any:
+    """
+    Recent slow requests recorded by this worker, newest first (admin only)
+    """
+    entries = slow_request_recorder.entries()
+    if path:
+        entries = [entry for entry in entries if entry["path"].startswith(path)]
+    return {
+        "threshold_ms": round(slow_request_recorder.threshold * 1000),
+        "items": [
+            {key: value for key, value in entry.items() if key != "statements"}
+            for entry in entries[:limit]
+        ],
+    }
+
+
+@router.get("/slow-requests/{entry_id}")
+async def get_slow_request(
+    entry_id: int,
+    current_user: User = Depends(get_admin_user),
+) -> Any:
+    """
+    One slow request with its captured statements and plans (admin only)
+    """
+    entry = slow_request_recorder.get(entry_id)
+    if entry is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Slow request not found (it may have been rotated out)"
+        )
+    return entry
+
+
+@router.delete("/slow-requests", status_code=status.HTTP_204_NO_CONTENT)
+async def clear_slow_requests(
+    current_user: User = Depends(get_admin_user),
+) -> None:
+    """
+    Empty this worker's slow-request buffer (admin only)
+    """
+    slow_request_recorder.clear()
@@ -1,25 +1,167 @@
+import os
 from typing import Any
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, status, Response
+from fastapi import APIRouter, Depends, HTTPException, status, Request, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.security import get_current_user, User as SecurityUser
 from app.db.session import get_db
-from app.schemas.unified_schemas import PDFExportRequest
+from app.schemas.unified_schemas import PDFExportRequest, PDFBatchExportRequest
 from app.services.pdf_service import pdf_export_service
+from app.utils.streaming import iter_file, iter_zip
 
 router = APIRouter()
 
+# Batch routes are declared first so "batch" is not parsed as a form id
+@router.post("/batch")
+async def export_batch_pdf(
+    request: Request,
+    batch_request: PDFBatchExportRequest,
+    db: AsyncSession = Depends(get_db),
+    current_user: SecurityUser = Depends(get_current_user)
+) -> Any:
+    """
+    Export a project, case or list of forms as a streamed ZIP of PDFs
+    """
+    from datetime import datetime, timezone
+    from sqlalchemy import select, exists, or_, true
+    from app.core.config import settings
+    from app.db.base import AsyncSessionLocal
+    from app.models.unified_models import Form, user_projects
+    from app.services.audit_service import log_activity
+
+    if not (batch_request.project_id or batch_request.case_id or batch_request.form_ids):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Provide a project_id, case_id or form_ids"
+        )
+
+    # One scoped access check for the whole batch: employees may export forms
+    # they created or that belong to a project they are assigned to
+    if current_user.role == "employee":
+        allowed = or_(
+            Form.created_by == current_user.id,
+            exists().where(
+                user_projects.c.project_id == Form.project_id,
+                user_projects.c.user_id == current_user.id
+            )
+        )
+    else:
+        allowed = true()
+
+    query = select(Form.id, allowed.label("allowed"))
+    if batch_request.project_id:
+        query = query.where(Form.project_id == batch_request.project_id)
+    if batch_request.case_id:
+        query = query.where(Form.case_id == batch_request.case_id)
+    if batch_request.form_ids:
+        query = query.where(Form.id.in_(batch_request.form_ids))
+
+    result = await db.execute(query.order_by(Form.created_at, Form.id))
+    rows = result.all()
+
+    if not rows or (batch_request.form_ids and len(rows) < len(set(batch_request.form_ids))):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Form not found" if rows else "No forms match the selection"
+        )
+
+    if not all(row.allowed for row in rows):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="You don't have access to all forms in this batch"
+        )
+
+    if len(rows) > settings.PDF_BATCH_MAX_FORMS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Batch exports are limited to {settings.PDF_BATCH_MAX_FORMS} forms"
+        )
+
+    form_ids = [row.id for row in rows]
+    progress = pdf_export_service.start_batch(len(form_ids), current_user.id)
+
+    # A single audit entry covers the batch
+    await log_activity(
+        db=db,
+        action="export_pdf_batch",
+        resource_type="pdf_batch",
+        resource_id=UUID(progress["batch_id"]),
+        user_id=current_user.id,
+        details={
+            "project_id": str(batch_request.project_id) if batch_request.project_id else None,
+            "case_id": batch_request.case_id,
+            "form_ids": [str(form_id) for form_id in form_ids],
+            "include_audit_trail": batch_request.include_audit_trail,
+            "watermark": batch_request.watermark is not None
+        },
+        ip_address=request.client.host if request.client else None,
+        user_agent=request.headers.get("user-agent")
+    )
+    await db.commit()
+
+    async def entries():
+        # The request session is closed before the body streams, so use our own
+        try:
+            async with AsyncSessionLocal() as session:
+                async for form, pdf_bytes in pdf_export_service.iter_batch_pdfs(
+                    db=session,
+                    form_ids=form_ids,
+                    progress=progress,
+                    include_audit_trail=batch_request.include_audit_trail,
+                    watermark=batch_request.watermark
+                ):
+                    yield f"form_{form.case_id or form.id}_{form.form_type}_{str(form.id)[:8]}.pdf", pdf_bytes
+            progress["status"] = "completed"
+        except BaseException:
+            progress["status"] = "aborted"
+            raise
+        finally:
+            progress["finished_at"] = datetime.now(timezone.utc).isoformat()
+
+    filename = f"forms_{batch_request.case_id or batch_request.project_id or 'batch'}.zip"
+    return StreamingResponse(
+        iter_zip(entries()),
+        media_type="application/zip",
+        headers={
+            "Content-Disposition": f"attachment; filename={filename}",
+            "X-Batch-Id": progress["batch_id"]
+        }
+    )
+
+@router.get("/batch/{batch_id}")
+async def get_batch_progress(
+    batch_id: str,
+    current_user: SecurityUser = Depends(get_current_user)
+) -> Any:
+    """
+    Progress of a batch export (tracked by the API worker streaming it)
+    """
+    progress = pdf_export_service.get_batch(batch_id)
+
+    if not progress or (
+        progress["requested_by"] != str(current_user.id)
+        and current_user.role not in ["admin", "super_admin"]
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Batch not found"
+        )
+
+    return progress
+
 @router.post("/{form_id}")
 async def export_form_pdf(
     form_id: UUID,
+    request: Request,
     export_request: PDFExportRequest,
     db: AsyncSession = Depends(get_db),
     current_user: SecurityUser = Depends(get_current_user)
 ) -> Any:
     """
-    Export a form as PDF
+    Export a form as PDF (served from the PDF cache when unchanged)
     """
     # Verify form access (similar to get_form endpoint)
     from app.models.unified_models import Form, Project
@@ -56,9 +198,23 @@ async def export_form_pdf(
     
     # Generate PDF
     try:
-        pdf_bytes = await pdf_export_service.generate_form_pdf(
+        cache_key = await pdf_export_service.get_cache_key(
             db=db,
-            form_id=form_id,
+            form=form,
+            include_audit_trail=export_request.include_audit_trail,
+            watermark=export_request.watermark
+        )
+        etag = f'"{cache_key}"'
+        headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+
+        # The client already holds this exact export
+        if request.headers.get("if-none-match") == etag:
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+        pdf = await pdf_export_service.get_form_pdf(
+            db=db,
+            form=form,
+            cache_key=cache_key,
             include_audit_trail=export_request.include_audit_trail,
             watermark=export_request.watermark
         )
@@ -79,20 +235,19 @@ async def export_form_pdf(
         )
         await db.commit()
         
-        # Return PDF response
+        # Return PDF response, streaming cache hits straight from disk
         filename = f"form_{form.case_id or form_id}_{form.form_type}.pdf"
+        headers["Content-Disposition"] = f"attachment; filename={filename}"
+
+        if isinstance(pdf, bytes):
+            return Response(content=pdf, media_type="application/pdf", headers=headers)
+        # Stream from the handle opened at lookup: the file itself may be
+        # evicted or invalidated before the body is sent
+        headers["Content-Length"] = str(os.fstat(pdf.fileno()).st_size)
+        return StreamingResponse(iter_file(pdf), media_type="application/pdf", headers=headers)
         
-        # Note: For HTML content (since we're not using actual PDF generation yet)
-        # Change content type to "application/pdf" when using real PDF generation
-        return Response(
-            content=pdf_bytes,
-            media_type="text/html",  # Change to "application/pdf" for real PDFs
-            headers={
-                "Content-Disposition": f"attachment; filename={filename}",
-                "Content-Type": "text/html"  # Change to "application/pdf" for real PDFs
-            }
-        )
-        
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -145,19 +300,21 @@ async def preview_form_pdf(
     
     # Generate HTML preview
     try:
-        pdf_bytes = await pdf_export_service.generate_form_pdf(
+        html_chunks = await pdf_export_service.generate_form_html(
             db=db,
             form_id=form_id,
             include_audit_trail=include_audit_trail,
             watermark=watermark
         )
         
-        # Return HTML response for preview
-        return Response(
-            content=pdf_bytes,
+        # Stream the HTML preview as the template renders
+        return StreamingResponse(
+            html_chunks,
             media_type="text/html"
         )
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -3,9 +3,11 @@ from uuid import UUID
 
 from fastapi import APIRouter, Depends, HTTPException, status, Request, Query
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, and_, or_, delete
+from sqlalchemy import select, func, and_, or_, delete, exists, tuple_, any_, bindparam
+from sqlalchemy.dialects.postgresql import ARRAY, UUID as pg_UUID, insert as pg_insert
 from sqlalchemy.orm import selectinload
 
+from app.core.config import settings
 from app.core.security import get_current_user, get_admin_user, User as SecurityUser
 from app.db.session import get_db
 from app.models.unified_models import Project, User, user_projects, ProjectStatus
@@ -14,10 +16,15 @@ from app.schemas.unified_schemas import (
     ProjectUpdate,
     ProjectResponse,
     ProjectAssignment,
+    ProjectBulkAssignment,
+    ProjectBulkAssignmentResponse,
+    ProjectBulkUnassignmentResponse,
     PaginatedResponse,
-    UserResponse
+    CursorPaginatedResponse,
+    ProjectUserResponse
 )
 from app.services.audit_service import log_activity
+from app.utils.pagination import decode_cursor, encode_cursor
 
 router = APIRouter()
 
@@ -396,39 +403,229 @@ async def unassign_user_from_project(
     
     return {"message": f"User {user.email} unassigned from project {project.name}"}
 
-@router.get("/{project_id}/users", response_model=List[UserResponse])
+def _user_ids_param(user_ids: List[UUID]):
+    # One array parameter, so the statement is the same whatever the list length
+    return any_(bindparam("user_ids", user_ids, type_=ARRAY(pg_UUID(as_uuid=True))))
+
+@router.post("/{project_id}/assignments", response_model=ProjectBulkAssignmentResponse)
+async def assign_users_to_project(
+    project_id: UUID,
+    request: Request,
+    assignment: ProjectBulkAssignment,
+    db: AsyncSession = Depends(get_db),
+    current_user: SecurityUser = Depends(get_admin_user)  # Only admins can assign users
+) -> Any:
+    """
+    Assign several users to a project in one transaction
+    """
+    user_ids = list(dict.fromkeys(assignment.user_ids))
+
+    # Verify project exists
+    project_result = await db.execute(
+        select(Project.id, Project.name).where(Project.id == project_id)
+    )
+    project = project_result.one_or_none()
+    
+    if not project:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Project not found"
+        )
+    
+    # Verify all users exist with a single lookup
+    user_result = await db.execute(
+        select(User.id, User.email).where(User.id == _user_ids_param(user_ids))
+    )
+    emails = dict(user_result.all())
+    missing = [str(user_id) for user_id in user_ids if user_id not in emails]
+    
+    if missing:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Users not found: {', '.join(missing)}"
+        )
+    
+    # Existing assignments are skipped by the conflict clause rather than pre-checked
+    insert_result = await db.execute(
+        pg_insert(user_projects)
+        .values([
+            {"user_id": user_id, "project_id": project_id, "assigned_by": current_user.id}
+            for user_id in user_ids
+        ])
+        .on_conflict_do_nothing(index_elements=[user_projects.c.user_id, user_projects.c.project_id])
+        .returning(user_projects.c.user_id)
+    )
+    assigned = set(insert_result.scalars().all())
+    
+    if assigned:
+        await log_activity(
+            db=db,
+            action="assign_users_to_project",
+            resource_type="project",
+            resource_id=project_id,
+            user_id=current_user.id,
+            new_values={
+                "assigned_users": [
+                    {"user_id": str(user_id), "email": emails[user_id]}
+                    for user_id in user_ids if user_id in assigned
+                ],
+                "project_name": project.name
+            },
+            ip_address=request.client.host if request.client else None,
+            user_agent=request.headers.get("user-agent")
+        )
+    
+    await db.commit()
+    
+    return ProjectBulkAssignmentResponse(
+        assigned=[user_id for user_id in user_ids if user_id in assigned],
+        already_assigned=[user_id for user_id in user_ids if user_id not in assigned]
+    )
+
+@router.delete("/{project_id}/assignments", response_model=ProjectBulkUnassignmentResponse)
+async def unassign_users_from_project(
+    project_id: UUID,
+    request: Request,
+    assignment: ProjectBulkAssignment,
+    db: AsyncSession = Depends(get_db),
+    current_user: SecurityUser = Depends(get_admin_user)  # Only admins can unassign users
+) -> Any:
+    """
+    Unassign several users from a project in one transaction
+    """
+    user_ids = list(dict.fromkeys(assignment.user_ids))
+
+    # Verify project exists
+    project_result = await db.execute(
+        select(Project.id, Project.name).where(Project.id == project_id)
+    )
+    project = project_result.one_or_none()
+    
+    if not project:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Project not found"
+        )
+    
+    # Users that were not assigned simply match no rows
+    delete_result = await db.execute(
+        delete(user_projects)
+        .where(
+            user_projects.c.project_id == project_id,
+            user_projects.c.user_id == _user_ids_param(user_ids)
+        )
+        .returning(user_projects.c.user_id)
+    )
+    unassigned = set(delete_result.scalars().all())
+    
+    if unassigned:
+        await log_activity(
+            db=db,
+            action="unassign_users_from_project",
+            resource_type="project",
+            resource_id=project_id,
+            user_id=current_user.id,
+            old_values={
+                "assigned_user_ids": [str(user_id) for user_id in user_ids if user_id in unassigned],
+                "project_name": project.name
+            },
+            ip_address=request.client.host if request.client else None,
+            user_agent=request.headers.get("user-agent")
+        )
+    
+    await db.commit()
+    
+    return ProjectBulkUnassignmentResponse(
+        unassigned=[user_id for user_id in user_ids if user_id in unassigned],
+        not_assigned=[user_id for user_id in user_ids if user_id not in unassigned]
+    )
+
+@router.get("/{project_id}/users", response_model=CursorPaginatedResponse)
 async def get_project_users(
     project_id: UUID,
     db: AsyncSession = Depends(get_db),
-    current_user: SecurityUser = Depends(get_current_user)
+    current_user: SecurityUser = Depends(get_current_user),
+    q: Optional[str] = Query(None, min_length=1, description="Prefix of the user's email, first or last name"),
+    cursor: Optional[str] = None,
+    limit: int = Query(settings.DEFAULT_PAGE_SIZE, ge=1, le=settings.MAX_PAGE_SIZE)
 ) -> Any:
     """
-    Get all users assigned to a project
+    Get users assigned to a project (keyset paginated by email)
     """
-    # Verify project exists and user has access
+    # Verify project exists and user has access without loading the assignees
     result = await db.execute(
-        select(Project)
-        .options(selectinload(Project.assigned_users))
-        .where(Project.id == project_id)
+        select(
+            exists().where(Project.id == project_id),
+            exists().where(
+                user_projects.c.project_id == project_id,
+                user_projects.c.user_id == current_user.id
+            )
+        )
     )
-    project = result.scalar_one_or_none()
+    project_exists, user_assigned = result.one()
     
-    if not project:
+    if not project_exists:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Project not found"
         )
     
     # Check access permissions
-    if current_user.role == "employee":
-        user_assigned = any(user.id == current_user.id for user in project.assigned_users)
-        if not user_assigned:
+    if current_user.role == "employee" and not user_assigned:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="You don't have access to this project"
+        )
+    
+    # Display columns only; the project_id index drives the join
+    query = (
+        select(
+            User.id,
+            User.email,
+            User.first_name,
+            User.last_name,
+            User.role,
+            User.status,
+            user_projects.c.assigned_at
+        )
+        .select_from(user_projects)
+        .join(User, User.id == user_projects.c.user_id)
+        .where(user_projects.c.project_id == project_id)
+    )
+    
+    if q:
+        # Anchored prefix pattern (wildcards in q escaped) so the lower(...)
+        # text_pattern_ops indexes apply
+        pattern = q.lower().replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+        query = query.where(or_(
+            func.lower(User.email).like(pattern),
+            func.lower(User.first_name).like(pattern),
+            func.lower(User.last_name).like(pattern)
+        ))
+    
+    if cursor:
+        try:
+            email, user_id = decode_cursor(cursor, 2)
+            after = (email, UUID(user_id))
+        except ValueError:
             raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="You don't have access to this project"
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid cursor"
             )
+        query = query.where(tuple_(User.email, User.id) > tuple_(*after))
+    
+    result = await db.execute(query.order_by(User.email, User.id).limit(limit))
+    rows = result.all()
+    
+    next_cursor = None
+    if len(rows) == limit:
+        next_cursor = encode_cursor(rows[-1].email, rows[-1].id)
     
-    return [UserResponse.model_validate(user) for user in project.assigned_users]
+    return CursorPaginatedResponse(
+        items=[ProjectUserResponse.model_validate(row) for row in rows],
+        limit=limit,
+        next_cursor=next_cursor
+    )
 
 @router.delete("/{project_id}")
 async def delete_project(
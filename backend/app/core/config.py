@@ -25,16 +25,81 @@ class Settings(BaseSettings):
 
     # Database settings (optional for testing)
     DATABASE_URL: Optional[PostgresDsn] = None
+
+    # "direct" (Postgres itself), "transaction" (PgBouncer/Neon pooler in
+    # transaction mode, local pool kept), "serverless" (pooler, no local pool)
+    # or "auto" (transaction mode for Neon "-pooler" hosts)
+    DB_POOLER_MODE: str = "auto"
+
+    # Connection pool (per API worker)
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: int = 30  # Seconds to wait for a free connection
+    DB_POOL_RECYCLE: int = 300
+    DB_POOL_PRE_PING: str = "idle"  # "always", "idle" (only after DB_POOL_PRE_PING_IDLE_SECONDS) or "off"
+    DB_POOL_PRE_PING_IDLE_SECONDS: int = 30
+
+    # Optional read replica for read-only endpoints; falls back to the primary
+    # when its replay lag exceeds READ_REPLICA_MAX_LAG_SECONDS
+    DATABASE_READ_URL: Optional[PostgresDsn] = None
+    READ_REPLICA_MAX_LAG_SECONDS: float = 5.0
+    READ_REPLICA_LAG_CHECK_SECONDS: float = 1.0  # How often each worker re-measures the lag
+
+    # Per-request SQL statistics (Server-Timing header and request_sql log lines)
+    SQL_INSTRUMENTATION_ENABLED: bool = True
+    SQL_N_PLUS_ONE_THRESHOLD: int = 10  # Same statement this often in one request is logged
+    SQL_QUERY_BUDGET_STRICT: bool = False  # Answer 500 instead of only logging when an endpoint exceeds @query_budget (tests)
+
+    # Slow-request recorder (needs SQL_INSTRUMENTATION_ENABLED; threshold 0 disables it)
+    SLOW_REQUEST_THRESHOLD_MS: int = 1000
+    SLOW_REQUEST_BUFFER_SIZE: int = 100  # Requests kept per worker, oldest dropped first
+    SLOW_REQUEST_MAX_STATEMENTS: int = 20  # Slowest statements kept per request
+    SLOW_REQUEST_EXPLAIN: bool = False  # Re-run captured SELECTs with EXPLAIN (ANALYZE, BUFFERS)
+    SLOW_REQUEST_EXPLAIN_TOP: int = 3
+    SLOW_REQUEST_EXPLAIN_TIMEOUT_MS: int = 5000
     
     # JWT secret for local authentication
     JWT_SECRET: str = "your-secret-key-here-replace-in-production"
     JWT_ALGORITHM: str = "HS256"
     JWT_EXPIRE_MINUTES: int = 60 * 24 * 7  # 7 days
+    JWT_CACHE_SIZE: int = 10000  # Verified tokens kept in memory per worker
+    USER_CACHE_TTL_SECONDS: int = 30  # How long other workers may serve a changed user
+    USER_CACHE_SIZE: int = 10000
+
+    # Password hashing; stored hashes with a different cost are upgraded on login
+    BCRYPT_ROUNDS: int = 12
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_MAX_PENDING: int = 32  # Hashes running or queued per API worker before 503
+
+    # Rate limiting: "<requests>/<seconds>" per user (or IP before login)
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_DEFAULT: str = "60/60"
+    RATE_LIMIT_ROUTES: Dict[str, str] = {"/api/v1/auth/login": "10/60"}  # Path prefix -> rule
+    RATE_LIMIT_BACKEND: str = "memory"  # "memory" (per worker) or "sqlite" (shared on one host)
+    RATE_LIMIT_SQLITE_PATH: str = "var/rate-limit.sqlite3"
+    RATE_LIMIT_MAX_KEYS: int = 100000
+
+    # Signed session cookies for non-API routes (the API itself is bearer-token only)
+    SESSION_MIDDLEWARE_ENABLED: bool = False
     
     # Pagination defaults
     DEFAULT_PAGE_SIZE: int = 20
     MAX_PAGE_SIZE: int = 100
 
+    # Audit statistics rollup
+    AUDIT_ROLLUP_INTERVAL_SECONDS: int = 300
+    AUDIT_ROLLUP_LAG_SECONDS: int = 120  # Grace period for in-flight audit transactions
+
+    # PDF rendering worker pool
+    PDF_RENDER_WORKERS: int = 2
+    PDF_RENDER_MAX_CONCURRENCY: int = 4  # Renders in flight or queued per API worker
+    PDF_RENDER_TIMEOUT_SECONDS: int = 120
+    PDF_BATCH_MAX_FORMS: int = 10000
+
+    # Rendered PDF cache (0 disables it)
+    PDF_CACHE_DIR: str = "var/pdf-cache"
+    PDF_CACHE_MAX_MB: int = 512
+
     model_config = SettingsConfigDict(env_file=".env", case_sensitive=True)
 
 
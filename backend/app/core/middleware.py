@@ -0,0 +1,204 @@
+import json
+import logging
+import time
+from typing import Iterable, List, Optional, Tuple
+
+from starlette.middleware.sessions import SessionMiddleware
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+from app.core.rate_limit import RateLimiter, client_key, retry_after_header
+from app.db.instrumentation import QueryStats, budget_message, collect_queries, shorten_sql
+from app.db.slow_requests import SlowRequestRecorder
+
+logger = logging.getLogger(__name__)
+
+# Pure ASGI middleware. Unlike @app.middleware("http") these don't spawn a
+# task or re-wrap the response body per request; they only touch the
+# http.response.start message, so streamed bodies pass straight through.
+
+SECURITY_HEADERS: List[Tuple[bytes, bytes]] = [
+    (b"x-content-type-options", b"nosniff"),
+    (b"x-frame-options", b"DENY"),
+    (b"x-xss-protection", b"1; mode=block"),
+    (b"strict-transport-security", b"max-age=31536000; includeSubDomains"),
+    (b"referrer-policy", b"strict-origin-when-cross-origin"),
+    (b"content-security-policy", b"default-src 'self'"),
+]
+
+RATE_LIMITED_BODY = json.dumps({"detail": "Rate limit exceeded"}).encode()
+
+# Marks the 500 that replaces a response over its @query_budget (strict mode)
+QUERY_BUDGET_HEADER = b"x-query-budget"
+
+
+class APIMiddleware:
+    """
+    Rate limiting, security headers, X-Process-Time and per-request SQL
+    statistics (Server-Timing header, a structured log line, and the
+    slow-request recorder) in a single layer
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        headers: Iterable[Tuple[bytes, bytes]] = SECURITY_HEADERS,
+        rate_limiter: Optional[RateLimiter] = None,
+        instrument_sql: bool = False,
+        slow_requests: Optional[SlowRequestRecorder] = None
+    ):
+        self.app = app
+        self.headers = list(headers)
+        self.rate_limiter = rate_limiter
+        self.instrument_sql = instrument_sql
+        self.slow_requests = slow_requests if slow_requests is not None and slow_requests.enabled else None
+        self.capture = settings.SLOW_REQUEST_MAX_STATEMENTS if self.slow_requests is not None else 0
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start_time = time.perf_counter()
+
+        if self.rate_limiter is not None:
+            authorization = None
+            for name, value in scope["headers"]:
+                if name == b"authorization":
+                    authorization = value.decode("latin-1")
+                    break
+            client = scope.get("client")
+            rule, retry_after = await self.rate_limiter.hit(
+                scope["path"], client_key(authorization, client[0] if client else None)
+            )
+            if retry_after:
+                await self._send_rate_limited(send, rule.limit, retry_after)
+                return
+
+        stats: Optional[QueryStats] = None
+        status_code = 500
+        over_budget = False
+
+        async def send_with_headers(message: Message) -> None:
+            nonlocal status_code, over_budget
+            if over_budget:
+                # The endpoint's own response was replaced; drop its body
+                return
+            if message["type"] == "http.response.start":
+                if stats is not None and settings.SQL_QUERY_BUDGET_STRICT:
+                    failure = self._budget_failure(scope, stats)
+                    if failure is not None:
+                        # Fail while the response can still be replaced, so
+                        # the test client sees a 500 instead of a success
+                        over_budget = True
+                        status_code = 500
+                        await self._send_budget_failure(send, failure)
+                        return
+                status_code = message["status"]
+                process_time = time.perf_counter() - start_time
+                headers = [
+                    *message.get("headers", ()),
+                    *self.headers,
+                    (b"x-process-time", str(process_time).encode()),
+                ]
+                if stats is not None:
+                    # Statements run while a body streams are only in the log
+                    timing = f"{stats.server_timing()}, app;dur={process_time * 1000:.1f}"
+                    headers.append((b"server-timing", timing.encode()))
+                message["headers"] = headers
+            await send(message)
+
+        if not self.instrument_sql:
+            await self.app(scope, receive, send_with_headers)
+            return
+
+        with collect_queries(self.capture) as stats:
+            await self.app(scope, receive, send_with_headers)
+        duration = time.perf_counter() - start_time
+        if self.slow_requests is not None and self.slow_requests.is_slow(duration):
+            self.slow_requests.record(scope["method"], scope["path"], status_code, duration, stats)
+        self._report_sql(scope, status_code, stats, duration)
+
+    def _report_sql(self, scope: Scope, status_code: int, stats: QueryStats, duration: float) -> None:
+        if not stats.count:
+            return
+
+        record = {
+            "event": "request_sql",
+            "method": scope["method"],
+            "path": scope["path"],
+            "status": status_code,
+            "duration_ms": round(duration * 1000, 2),
+            **stats.summary(),
+        }
+        level = logging.INFO
+
+        repeated = stats.repeated(settings.SQL_N_PLUS_ONE_THRESHOLD)
+        if repeated:
+            record["repeated_statements"] = {shorten_sql(sql, 200): n for sql, n in repeated.items()}
+            level = logging.WARNING
+
+        budget = self._budget(scope)
+        if budget is not None and stats.count > budget:
+            # Statements run while a body streams can only be reported here
+            record["query_budget"] = budget
+            level = logging.WARNING
+
+        logger.log(level, json.dumps(record))
+
+    @staticmethod
+    def _budget(scope: Scope) -> Optional[int]:
+        # Starlette leaves the matched endpoint in the scope
+        return getattr(scope.get("endpoint"), "query_budget", None)
+
+    def _budget_failure(self, scope: Scope, stats: QueryStats) -> Optional[str]:
+        budget = self._budget(scope)
+        if budget is None or stats.count <= budget:
+            return None
+        return budget_message(stats, budget, f"{scope['method']} {scope['path']}")
+
+    async def _send_budget_failure(self, send: Send, failure: str) -> None:
+        body = failure.encode()
+        await send({
+            "type": "http.response.start",
+            "status": 500,
+            "headers": [
+                (b"content-type", b"text/plain; charset=utf-8"),
+                (b"content-length", str(len(body)).encode()),
+                (QUERY_BUDGET_HEADER, b"exceeded"),
+                *self.headers,
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
+
+    async def _send_rate_limited(self, send: Send, limit: int, retry_after: float) -> None:
+        await send({
+            "type": "http.response.start",
+            "status": 429,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(RATE_LIMITED_BODY)).encode()),
+                (b"retry-after", retry_after_header(retry_after).encode()),
+                (b"x-ratelimit-limit", str(limit).encode()),
+                *self.headers,
+            ],
+        })
+        await send({"type": "http.response.body", "body": RATE_LIMITED_BODY})
+
+
+class ScopedSessionMiddleware:
+    """
+    SessionMiddleware that skips the given path prefixes, so bearer-token API
+    routes don't read or sign a session cookie
+    """
+
+    def __init__(self, app: ASGIApp, exclude_prefixes: Iterable[str] = (), **options):
+        self.app = app
+        self.session_app = SessionMiddleware(app, **options)
+        self.exclude_prefixes = tuple(exclude_prefixes)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] in ("http", "websocket") and not scope["path"].startswith(self.exclude_prefixes):
+            await self.session_app(scope, receive, send)
+        else:
+            await self.app(scope, receive, send)
@@ -0,0 +1,237 @@
+import asyncio
+import math
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, List, NamedTuple, Optional, Protocol, Tuple
+
+from app.core.config import settings
+from app.core.security import decode_token, token_cache
+
+# Approximate sliding-window rate limiting. Each key keeps two counters: the
+# current fixed window and the previous one. The request rate is estimated as
+# previous * (share of the previous window still inside the sliding window)
+# + current, so every check is O(1) and every key costs a fixed few integers.
+
+
+class Rule(NamedTuple):
+    limit: int
+    window: int  # seconds
+
+
+def parse_rule(value: str) -> Rule:
+    """Parse a "<requests>/<seconds>" rule, e.g. "60/60" """
+    limit, _, window = value.partition("/")
+    rule = Rule(int(limit), int(window or 60))
+    if rule.limit < 1 or rule.window < 1:
+        raise ValueError(f"Invalid rate limit rule {value!r}: requests and seconds must be at least 1")
+    return rule
+
+
+def _advance(
+    stored_window: int, previous: int, current: int, window_index: int
+) -> Tuple[int, int]:
+    """Roll stored counters forward to window_index"""
+    if stored_window == window_index:
+        return previous, current
+    if stored_window == window_index - 1:
+        return current, 0
+    return 0, 0
+
+
+def _check(previous: int, current: int, rule: Rule, now: float) -> float:
+    """Return 0 if one more request fits, else the seconds until it would"""
+    elapsed = (now % rule.window) / rule.window
+    if previous * (1 - elapsed) + current + 1 <= rule.limit:
+        return 0.0
+
+    if current + 1 <= rule.limit:
+        # The previous window's weight decays until the request fits
+        fits_at = 1 - (rule.limit - 1 - current) / previous
+        return max(fits_at - elapsed, 0.0) * rule.window
+
+    # Wait for the next window, then for this window's weight to decay
+    fits_at = max(1 - (rule.limit - 1) / current, 0.0)
+    return (1 - elapsed + fits_at) * rule.window
+
+
+class RateLimitBackend(Protocol):
+    # True if hit() does I/O and must run off the event loop
+    blocking: bool
+
+    def hit(self, key: str, rule: Rule, now: float) -> float:
+        """Count a request unless it is over the limit; return the retry delay"""
+        ...
+
+
+class MemoryBackend:
+    """
+    Counters in a dict, private to this worker. Keys idle for two windows are
+    swept out periodically, and the dict never holds more than max_keys.
+    """
+
+    blocking = False
+
+    def __init__(self, max_keys: int, sweep_interval: float = 60.0):
+        self.max_keys = max_keys
+        self.sweep_interval = sweep_interval
+        # key -> [window index, previous count, current count, idle after]
+        self._counters: Dict[str, List] = {}
+        self._next_sweep = 0.0
+
+    def hit(self, key: str, rule: Rule, now: float) -> float:
+        if now >= self._next_sweep or (
+            len(self._counters) >= self.max_keys and key not in self._counters
+        ):
+            self._sweep(now)
+
+        window_index = int(now // rule.window)
+        entry = self._counters.get(key)
+        if entry is None:
+            previous = current = 0
+        else:
+            previous, current = _advance(entry[0], entry[1], entry[2], window_index)
+
+        retry_after = _check(previous, current, rule, now)
+        if not retry_after:
+            current += 1
+        self._counters[key] = [window_index, previous, current, (window_index + 2) * rule.window]
+        return retry_after
+
+    def _sweep(self, now: float) -> None:
+        self._next_sweep = now + self.sweep_interval
+        for key in [k for k, entry in self._counters.items() if entry[3] <= now]:
+            del self._counters[key]
+        # Still full of active keys: drop the longest-standing tenth
+        overflow = len(self._counters) - int(self.max_keys * 0.9)
+        if overflow > 0:
+            for key in list(self._counters)[:overflow]:
+                del self._counters[key]
+
+
+class SQLiteBackend:
+    """
+    Counters in a SQLite file shared by every worker on the host. Each hit is
+    one short IMMEDIATE transaction; with WAL and synchronous=OFF that is a
+    few tens of microseconds and needs no extra service, but a write lock
+    held by another worker can stall it for up to the busy timeout, so hits
+    run in a thread rather than on the event loop.
+    """
+
+    blocking = True
+
+    def __init__(self, path: str, sweep_interval: float = 60.0):
+        self.path = path
+        self.sweep_interval = sweep_interval
+        self._local = threading.local()
+        self._next_sweep = 0.0
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=OFF")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS rate_limits ("
+                " key TEXT PRIMARY KEY, window_index INTEGER NOT NULL,"
+                " previous INTEGER NOT NULL, current INTEGER NOT NULL,"
+                " idle_after REAL NOT NULL) WITHOUT ROWID"
+            )
+            self._local.conn = conn
+        return conn
+
+    def hit(self, key: str, rule: Rule, now: float) -> float:
+        conn = self._connection()
+        window_index = int(now // rule.window)
+
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT window_index, previous, current FROM rate_limits WHERE key = ?",
+                (key,),
+            ).fetchone()
+            previous, current = _advance(*row, window_index) if row else (0, 0)
+
+            retry_after = _check(previous, current, rule, now)
+            if not retry_after:
+                current += 1
+            conn.execute(
+                "INSERT OR REPLACE INTO rate_limits VALUES (?, ?, ?, ?, ?)",
+                (key, window_index, previous, current, (window_index + 2) * rule.window),
+            )
+
+            if now >= self._next_sweep:
+                self._next_sweep = now + self.sweep_interval
+                conn.execute("DELETE FROM rate_limits WHERE idle_after <= ?", (now,))
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return retry_after
+
+
+class RateLimiter:
+    """
+    Applies a default rule plus per-route rules, matched by longest path
+    prefix. Each rule has its own counters per client.
+    """
+
+    def __init__(self, backend: RateLimitBackend, default: str, routes: Dict[str, str]):
+        self.backend = backend
+        self.default = parse_rule(default)
+        self.routes = sorted(
+            ((prefix, parse_rule(rule)) for prefix, rule in routes.items()),
+            key=lambda item: len(item[0]),
+            reverse=True,
+        )
+
+    def rule_for(self, path: str) -> Tuple[str, Rule]:
+        for prefix, rule in self.routes:
+            if path.startswith(prefix):
+                return prefix, rule
+        return "*", self.default
+
+    async def hit(self, path: str, client: str) -> Tuple[Rule, float]:
+        """Count a request; returns the rule and the retry delay (0 if allowed)"""
+        scope, rule = self.rule_for(path)
+        key = f"{scope}|{client}"
+        if self.backend.blocking:
+            return rule, await asyncio.to_thread(self.backend.hit, key, rule, time.time())
+        return rule, self.backend.hit(key, rule, time.time())
+
+
+def client_key(authorization: Optional[str], client_host: Optional[str]) -> str:
+    """
+    Rate-limit by the bearer token's verified subject, otherwise by IP.
+    Claims come from the token cache or are verified here (and cached for
+    the auth dependency), so every worker keys a request the same way.
+    Unverified claims are never trusted here.
+    """
+    if authorization and authorization[:7].lower() == "bearer ":
+        token = authorization[7:]
+        claims = token_cache.peek(token)
+        if claims is None and not token_cache.is_revoked(token):
+            claims = decode_token(token)
+            if claims is not None:
+                token_cache.put(token, claims)
+        if claims is not None and claims.get("sub"):
+            return f"user:{claims['sub']}"
+    return f"ip:{client_host or 'unknown'}"
+
+
+def retry_after_header(retry_after: float) -> str:
+    return str(max(math.ceil(retry_after), 1))
+
+
+def _make_backend() -> RateLimitBackend:
+    if settings.RATE_LIMIT_BACKEND == "sqlite":
+        return SQLiteBackend(settings.RATE_LIMIT_SQLITE_PATH)
+    return MemoryBackend(settings.RATE_LIMIT_MAX_KEYS)
+
+
+rate_limiter = RateLimiter(_make_backend(), settings.RATE_LIMIT_DEFAULT, settings.RATE_LIMIT_ROUTES)
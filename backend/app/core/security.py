@@ -1,5 +1,12 @@
+import asyncio
+import hashlib
+import heapq
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Any, Dict, Optional, Union
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+from uuid import UUID
 
 from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
@@ -8,8 +15,13 @@ from passlib.context import CryptContext
 from pydantic import BaseModel
 
 from app.core.config import settings
+from app.db.base import AsyncSessionLocal
+from app.models.unified_models import UserStatus
+from app.services.user_cache import user_cache
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+pwd_context = CryptContext(
+    schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=settings.BCRYPT_ROUNDS
+)
 
 
 class TokenPayload(BaseModel):
@@ -22,6 +34,9 @@ class User(BaseModel):
     id: str
     email: str
     role: str
+    status: str = UserStatus.ACTIVE.value
+    first_name: Optional[str] = None
+    last_name: Optional[str] = None
 
 
 def create_access_token(
@@ -33,33 +48,174 @@ def create_access_token(
         expire = datetime.utcnow() + expires_delta
     else:
         expire = datetime.utcnow() + timedelta(
-            minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES
+            minutes=settings.JWT_EXPIRE_MINUTES
         )
     to_encode = {"exp": expire, "sub": str(subject), "role": role}
-    encoded_jwt = jwt.encode(to_encode, settings.JWT_SECRET_KEY, algorithm=settings.JWT_ALGORITHM)
+    encoded_jwt = jwt.encode(to_encode, settings.JWT_SECRET, algorithm=settings.JWT_ALGORITHM)
     return encoded_jwt
 
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+class PasswordHasher:
+    """
+    Runs bcrypt on a small dedicated thread pool so hashing never blocks the
+    event loop. Calls beyond max_pending are refused with 503 rather than
+    queueing, so a login burst cannot back up behind itself indefinitely.
+    """
 
+    def __init__(self, workers: int, max_pending: int):
+        self.workers = workers
+        self.max_pending = max_pending
+        self._pending = 0
+        self._pool: Optional[ThreadPoolExecutor] = None
 
-def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
+    async def hash(self, password: str) -> str:
+        return await self._run(pwd_context.hash, password)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+        """
+        Check a password. When the stored hash uses outdated cost parameters
+        the second item is a replacement hash for the caller to save.
+        """
+        return await self._run(pwd_context.verify_and_update, plain_password, hashed_password)
+
+    def shutdown(self) -> None:
+        pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    async def _run(self, func: Callable[..., Any], *args: Any) -> Any:
+        if self._pending >= self.max_pending:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Too many sign-in requests in progress, please retry",
+                headers={"Retry-After": "1"},
+            )
+
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(
+                max_workers=self.workers, thread_name_prefix="password-hash"
+            )
+
+        self._pending += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._pool, func, *args)
+        finally:
+            self._pending -= 1
+
+
+password_hasher = PasswordHasher(settings.PASSWORD_HASH_WORKERS, settings.PASSWORD_HASH_MAX_PENDING)
 
 
 def decode_token(token: str) -> Optional[dict]:
     try:
         payload = jwt.decode(
-            token, settings.JWT_SECRET_KEY, algorithms=[settings.JWT_ALGORITHM]
+            token, settings.JWT_SECRET, algorithms=[settings.JWT_ALGORITHM]
         )
         return payload
-    except jwt.ExpiredSignatureError:
-        return None
-    except jwt.InvalidTokenError:
+    except JWTError:
+        # Includes ExpiredSignatureError
         return None
 
 
+class TokenCache:
+    """
+    Bounded LRU of verified JWT claims, keyed by the SHA-256 of the token.
+
+    Entries are kept until the token's exp, so a hit skips signature
+    verification entirely. Revoked tokens are remembered until they expire
+    so they cannot be verified and cached again; only verified tokens can be
+    revoked, so that list is bounded by the tokens actually issued and is
+    never trimmed early.
+
+    Known limit: state is per process. A logout handled by one worker does
+    not reach the others, which keep accepting the token until it expires.
+    Run a single worker, or keep JWT_EXPIRE_MINUTES short, where that matters.
+    """
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._claims: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._revoked: Dict[str, float] = {}
+        self._revoked_expiries: List[Tuple[float, str]] = []
+
+    @staticmethod
+    def _key(token: str) -> str:
+        return hashlib.sha256(token.encode()).hexdigest()
+
+    def get(self, token: str) -> Optional[Dict[str, Any]]:
+        """Return cached claims for a token that is still valid"""
+        key = self._key(token)
+        claims = self._claims.get(key)
+        if claims is None:
+            self.misses += 1
+            return None
+        if claims["exp"] <= time.time():
+            del self._claims[key]
+            self.misses += 1
+            return None
+        self._claims.move_to_end(key)
+        self.hits += 1
+        return claims
+
+    def peek(self, token: str) -> Optional[Dict[str, Any]]:
+        """Like get(), but without touching the LRU order or the counters"""
+        claims = self._claims.get(self._key(token))
+        if claims is None or claims["exp"] <= time.time():
+            return None
+        return claims
+
+    def put(self, token: str, claims: Dict[str, Any]) -> None:
+        # Without exp nothing bounds the entry's lifetime, so don't cache it
+        if self.max_size <= 0 or not isinstance(claims.get("exp"), (int, float)):
+            return
+        key = self._key(token)
+        if key in self._revoked:
+            return
+        self._claims[key] = claims
+        self._claims.move_to_end(key)
+        while len(self._claims) > self.max_size:
+            self._claims.popitem(last=False)
+
+    def is_revoked(self, token: str) -> bool:
+        self._purge_revoked()
+        return self._key(token) in self._revoked
+
+    def revoke(self, token: str, claims: Dict[str, Any]) -> None:
+        """
+        Evict a token and reject it until it expires (logout). claims must
+        come from verifying the token; callers ignore tokens that don't verify.
+        """
+        expires = claims.get("exp")
+        if not isinstance(expires, (int, float)):
+            # Valid forever; bounded by the tokens issued without exp
+            expires = float("inf")
+        key = self._key(token)
+        self._claims.pop(key, None)
+        self._purge_revoked()
+        if key not in self._revoked:
+            self._revoked[key] = expires
+            heapq.heappush(self._revoked_expiries, (expires, key))
+
+    def _purge_revoked(self) -> None:
+        now = time.time()
+        while self._revoked_expiries and self._revoked_expiries[0][0] <= now:
+            _, key = heapq.heappop(self._revoked_expiries)
+            self._revoked.pop(key, None)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "size": len(self._claims),
+            "revoked": len(self._revoked),
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+token_cache = TokenCache(settings.JWT_CACHE_SIZE)
+
+
 class JWTAuth(HTTPBearer):
     async def __call__(
         self, request: Request
@@ -79,12 +235,21 @@ class JWTAuth(HTTPBearer):
             )
             
         try:
-            payload = decode_token(credentials.credentials)
+            token = credentials.credentials
+            payload = token_cache.get(token)
             if payload is None:
-                raise HTTPException(
-                    status_code=status.HTTP_401_UNAUTHORIZED,
-                    detail="Invalid token",
-                )
+                if token_cache.is_revoked(token):
+                    raise HTTPException(
+                        status_code=status.HTTP_401_UNAUTHORIZED,
+                        detail="Token has been revoked",
+                    )
+                payload = decode_token(token)
+                if payload is None:
+                    raise HTTPException(
+                        status_code=status.HTTP_401_UNAUTHORIZED,
+                        detail="Invalid token",
+                    )
+                token_cache.put(token, payload)
                 
             user_id = payload.get("sub")
             user_role = payload.get("role", "employee")
@@ -95,21 +260,57 @@ class JWTAuth(HTTPBearer):
                     detail="Invalid token payload",
                 )
                 
-            # Store user information in request state
-            request.state.user = User(
-                id=user_id, 
-                email=f"user_{user_id}@example.com",  # Will be replaced with actual user fetch
-                role=user_role
-            )
-            
-            return credentials
-                
+        except HTTPException:
+            raise
         except (JWTError, Exception) as e:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail=f"Could not validate credentials: {str(e)}",
             )
 
+        # Store user information in request state
+        request.state.user = await resolve_user(user_id, user_role)
+
+        return credentials
+
+
+async def resolve_user(user_id: str, role: str) -> User:
+    """
+    Load the token's user through the user cache and reject inactive accounts
+    """
+    if AsyncSessionLocal is None:
+        # No database configured (local testing); trust the token claims
+        return User(id=user_id, email=f"user_{user_id}@example.com", role=role)
+
+    try:
+        key = UUID(user_id)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid token payload",
+        )
+
+    row = await user_cache.get(key)
+    if row is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="User not found",
+        )
+    if row["status"] != UserStatus.ACTIVE:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail=f"User account is {row['status']}",
+        )
+
+    return User(
+        id=user_id,
+        email=row["email"],
+        role=row["role"],
+        status=row["status"],
+        first_name=row["first_name"],
+        last_name=row["last_name"],
+    )
+
 
 def get_current_user(request: Request) -> User:
     return request.state.user
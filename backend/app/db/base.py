@@ -1,9 +1,11 @@
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
 from typing import Optional
 
 from app.core.config import settings
+from app.db.pool import InstrumentedQueuePool, enable_idle_pre_ping
 
 # Base declarative class - will be used in unified_models.py
 Base = declarative_base()
@@ -12,26 +14,74 @@ Base = declarative_base()
 engine: Optional[create_async_engine] = None
 AsyncSessionLocal: Optional[sessionmaker] = None
 
-if settings.DATABASE_URL:
+# Optional read replica for read-only endpoints (see get_read_db)
+read_engine: Optional[create_async_engine] = None
+AsyncReadSessionLocal: Optional[sessionmaker] = None
+
+
+def pooler_mode(url: str) -> str:
+    """Resolve DB_POOLER_MODE; "auto" detects Neon's pooled endpoints"""
+    if settings.DB_POOLER_MODE != "auto":
+        return settings.DB_POOLER_MODE
+    return "transaction" if "-pooler." in url else "direct"
+
+
+def _create_engine(url: str):
     # Configure SSL for Neon database
     connect_args = {}
-    if "neon" in str(settings.DATABASE_URL):
+    if "neon" in url:
         # For Neon PostgreSQL, use SSL
         connect_args = {
             "ssl": "require",
             "server_settings": {"jit": "off"}
         }
 
+    mode = pooler_mode(url)
+    if mode != "direct":
+        # Behind a transaction-mode pooler consecutive transactions may run on
+        # different server connections, so nothing may be cached per
+        # connection. Unnamed statements are replaced by the next one and
+        # cannot collide or pile up on the server.
+        connect_args.update(
+            statement_cache_size=0,
+            prepared_statement_cache_size=0,
+            prepared_statement_name_func=lambda: "",
+        )
+
+    if mode == "serverless":
+        # Many short-lived replicas: let the pooler own every connection
+        pool_args = {"poolclass": NullPool}
+    else:
+        pool_args = {
+            "poolclass": InstrumentedQueuePool,
+            "pool_size": settings.DB_POOL_SIZE,
+            "max_overflow": settings.DB_MAX_OVERFLOW,
+            "pool_timeout": settings.DB_POOL_TIMEOUT,
+            "pool_recycle": settings.DB_POOL_RECYCLE,
+            "pool_pre_ping": settings.DB_POOL_PRE_PING == "always",
+        }
+
     # Create engine with SSL configuration for production
-    engine = create_async_engine(
-        str(settings.DATABASE_URL),
+    new_engine = create_async_engine(
+        url,
         echo=settings.DEBUG,
         future=True,
-        pool_pre_ping=True,
-        pool_recycle=300,
-        connect_args=connect_args
+        connect_args=connect_args,
+        **pool_args
     )
+    if mode != "serverless" and settings.DB_POOL_PRE_PING == "idle":
+        enable_idle_pre_ping(new_engine, settings.DB_POOL_PRE_PING_IDLE_SECONDS)
+    return new_engine
+
 
+if settings.DATABASE_URL:
+    engine = _create_engine(str(settings.DATABASE_URL))
     AsyncSessionLocal = sessionmaker(
         engine, class_=AsyncSession, expire_on_commit=False, autoflush=False
-    )
\ No newline at end of file
+    )
+
+    if settings.DATABASE_READ_URL:
+        read_engine = _create_engine(str(settings.DATABASE_READ_URL))
+        AsyncReadSessionLocal = sessionmaker(
+            read_engine, class_=AsyncSession, expire_on_commit=False, autoflush=False
+        )
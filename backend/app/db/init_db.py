@@ -8,7 +8,7 @@ from sqlalchemy import select
 from app.db.base import Base, engine
 from app.db.session import AsyncSessionLocal
 from app.models.unified_models import User, UserRole, UserStatus
-from app.core.security import get_password_hash
+from app.core.security import password_hasher
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -52,7 +52,7 @@ async def create_test_users(db: AsyncSession) -> None:
         if not existing_user:
             user = User(
                 email=user_data["email"],
-                hashed_password=get_password_hash(user_data["password"]),
+                hashed_password=await password_hasher.hash(user_data["password"]),
                 first_name=user_data["first_name"],
                 last_name=user_data["last_name"],
                 role=user_data["role"],
@@ -0,0 +1,150 @@
+import heapq
+import logging
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator, List, NamedTuple, Optional, Tuple, TypeVar
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+class CapturedStatement(NamedTuple):
+    seq: int
+    statement: str
+    parameters: Any
+    duration: float
+    executemany: bool
+
+
+class QueryStats:
+    """
+    SQL statements executed while collecting (one request, or one
+    assert_query_budget block). Nested collectors also count into their
+    parents. With capture > 0 the slowest `capture` statements are kept
+    along with their parameters.
+    """
+
+    def __init__(self, parent: Optional["QueryStats"] = None, capture: int = 0):
+        self.parent = parent
+        self.capture = capture
+        self.count = 0
+        self.total = 0.0
+        self.slowest = 0.0
+        self.slowest_statement: Optional[str] = None
+        self.statements: Dict[str, int] = {}
+        self._captured: List[Tuple[float, int, CapturedStatement]] = []
+
+    def record(self, statement: str, parameters: Any, duration: float, executemany: bool = False) -> None:
+        stats: Optional[QueryStats] = self
+        while stats is not None:
+            stats.count += 1
+            stats.total += duration
+            if duration > stats.slowest:
+                stats.slowest = duration
+                stats.slowest_statement = statement
+            stats.statements[statement] = stats.statements.get(statement, 0) + 1
+            if stats.capture:
+                item = CapturedStatement(stats.count, statement, parameters, duration, executemany)
+                # Min-heap on duration: the fastest one drops out when full
+                if len(stats._captured) < stats.capture:
+                    heapq.heappush(stats._captured, (duration, item.seq, item))
+                else:
+                    heapq.heappushpop(stats._captured, (duration, item.seq, item))
+            stats = stats.parent
+
+    def captured(self) -> List[CapturedStatement]:
+        """Kept statements in execution order"""
+        return sorted((item for _, _, item in self._captured), key=lambda item: item.seq)
+
+    def repeated(self, threshold: int) -> Dict[str, int]:
+        """Statements run at least `threshold` times, the usual sign of an N+1"""
+        return {statement: n for statement, n in self.statements.items() if n >= threshold}
+
+    def server_timing(self) -> str:
+        return f'db;dur={self.total * 1000:.1f};desc="{self.count} queries"'
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "queries": self.count,
+            "db_ms": round(self.total * 1000, 2),
+            "slowest_ms": round(self.slowest * 1000, 2),
+            "slowest_statement": shorten_sql(self.slowest_statement),
+        }
+
+
+_current_stats: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+
+def shorten_sql(statement: Optional[str], limit: int = 300) -> Optional[str]:
+    """Collapse whitespace and truncate a statement for logs and headers"""
+    if statement is None:
+        return None
+    statement = " ".join(statement.split())
+    return statement if len(statement) <= limit else statement[:limit] + "..."
+
+
+@contextmanager
+def collect_queries(capture: int = 0) -> Iterator[QueryStats]:
+    """Record every statement executed in this context (and its tasks)"""
+    stats = QueryStats(parent=_current_stats.get(), capture=capture)
+    token = _current_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _current_stats.reset(token)
+
+
+@contextmanager
+def assert_query_budget(max_queries: int) -> Iterator[QueryStats]:
+    """
+    For tests: fail if the block executes more than max_queries statements
+    """
+    with collect_queries() as stats:
+        yield stats
+    if stats.count > max_queries:
+        raise AssertionError(budget_message(stats, max_queries))
+
+
+def query_budget(max_queries: int) -> Callable[[F], F]:
+    """
+    Declare how many statements an endpoint may execute. Overruns are logged;
+    with SQL_QUERY_BUDGET_STRICT set (test runs) the response is also
+    replaced by a 500 naming the statements, if it hasn't started yet.
+    """
+    def decorate(endpoint: F) -> F:
+        endpoint.query_budget = max_queries
+        return endpoint
+    return decorate
+
+
+def budget_message(stats: QueryStats, max_queries: int, where: str = "block") -> str:
+    lines = [f"{where} executed {stats.count} SQL statements, budget is {max_queries}"]
+    lines += [f"  {n}x {shorten_sql(statement, 200)}" for statement, n in stats.statements.items()]
+    return "\n".join(lines)
+
+
+if settings.SQL_INSTRUMENTATION_ENABLED:
+    @event.listens_for(Engine, "before_cursor_execute")
+    def _start_timer(conn, cursor, statement, parameters, context, executemany) -> None:
+        if _current_stats.get() is not None:
+            conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    @event.listens_for(Engine, "after_cursor_execute")
+    def _record_statement(conn, cursor, statement, parameters, context, executemany) -> None:
+        stats = _current_stats.get()
+        started = conn.info.get("query_started")
+        if stats is not None and started:
+            stats.record(statement, parameters, time.perf_counter() - started.pop(), executemany)
+
+    @event.listens_for(Engine, "handle_error")
+    def _discard_timer(exception_context) -> None:
+        started = exception_context.connection.info.get("query_started") if exception_context.connection else None
+        if started:
+            started.pop()
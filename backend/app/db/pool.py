@@ -0,0 +1,111 @@
+import bisect
+import itertools
+import time
+from typing import Any, Dict, List
+
+from sqlalchemy import event
+from sqlalchemy.exc import DisconnectionError
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+# Upper bounds (seconds) of the checkout wait histogram buckets
+WAIT_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class PoolMetrics:
+    """Checkout counters and wait-time histogram for one connection pool"""
+
+    def __init__(self):
+        self.checkouts = 0
+        self.failures = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.wait_counts: List[int] = [0] * (len(WAIT_BUCKETS) + 1)
+
+    def observe_wait(self, seconds: float) -> None:
+        self.checkouts += 1
+        self.wait_total += seconds
+        self.wait_max = max(self.wait_max, seconds)
+        self.wait_counts[bisect.bisect_left(WAIT_BUCKETS, seconds)] += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        # Cumulative, like a Prometheus histogram: le_<x> counts every
+        # checkout that waited at most x seconds
+        labels = [f"le_{bound}" for bound in WAIT_BUCKETS] + ["le_inf"]
+        return {
+            "checkouts": self.checkouts,
+            "checkout_failures": self.failures,
+            "wait_seconds_total": round(self.wait_total, 6),
+            "wait_seconds_max": round(self.wait_max, 6),
+            "wait_histogram": dict(zip(labels, itertools.accumulate(self.wait_counts))),
+        }
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """
+    Queue pool that times how long each checkout waits for a connection and
+    counts checkouts that fail (pool timeout or connect error)
+    """
+
+    def __init__(self, *args: Any, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self.metrics = PoolMetrics()
+
+    def recreate(self) -> "InstrumentedQueuePool":
+        # Keep the counters across engine.dispose()
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+    def _do_get(self) -> Any:
+        start = time.perf_counter()
+        try:
+            record = super()._do_get()
+        except Exception:
+            self.metrics.failures += 1
+            raise
+        self.metrics.observe_wait(time.perf_counter() - start)
+        return record
+
+
+def enable_idle_pre_ping(engine: AsyncEngine, idle_seconds: float) -> None:
+    """
+    Ping a connection on checkout only if it sat idle in the pool for longer
+    than idle_seconds; busy connections skip the extra round trip
+    """
+    sync_engine = engine.sync_engine
+
+    @event.listens_for(sync_engine, "checkin")
+    def _record_checkin(dbapi_connection: Any, connection_record: Any) -> None:
+        connection_record.info["checked_in_at"] = time.monotonic()
+
+    @event.listens_for(sync_engine, "checkout")
+    def _ping_idle_connection(dbapi_connection: Any, connection_record: Any, connection_proxy: Any) -> None:
+        checked_in_at = connection_record.info.get("checked_in_at")
+        if checked_in_at is None or time.monotonic() - checked_in_at < idle_seconds:
+            return
+        try:
+            alive = sync_engine.dialect.do_ping(dbapi_connection)
+        except Exception as exc:
+            # The pool discards this connection and retries with a fresh one
+            raise DisconnectionError() from exc
+        if not alive:
+            raise DisconnectionError()
+
+
+def pool_status(engine: AsyncEngine) -> Dict[str, Any]:
+    pool = engine.sync_engine.pool
+    status: Dict[str, Any] = {"pool": type(pool).__name__}
+    if isinstance(pool, AsyncAdaptedQueuePool):
+        status.update(
+            size=pool.size(),
+            checked_out=pool.checkedout(),
+            checked_in=pool.checkedin(),
+            overflow=max(pool.overflow(), 0),
+            max_overflow=pool._max_overflow,
+            timeout=pool.timeout(),
+        )
+    metrics = getattr(pool, "metrics", None)
+    if metrics is not None:
+        status.update(metrics.snapshot())
+    return status
@@ -0,0 +1,69 @@
+import logging
+import time
+from typing import Optional
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.core.config import settings
+from app.db.base import read_engine
+
+logger = logging.getLogger(__name__)
+
+# Seconds the replica is behind the primary. A replica that has replayed
+# everything it received counts as current even if the primary has been idle,
+# and a server that is not in recovery (a stand-in database) reports 0.
+REPLICA_LAG_SQL = text("""
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())
+    END
+""")
+
+
+class ReplicaLagGuard:
+    """
+    Decides whether reads may go to the replica. The lag is measured at most
+    once per check interval per worker; an unreachable replica counts as
+    stale until the next check.
+    """
+
+    def __init__(self, engine: AsyncEngine, max_lag: float, check_interval: float):
+        self.engine = engine
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        self.lag: Optional[float] = None
+        self._fresh = False
+        self._checked_at = float("-inf")
+
+    async def is_fresh(self) -> bool:
+        now = time.monotonic()
+        if now - self._checked_at < self.check_interval:
+            return self._fresh
+        # Claim the check before awaiting so concurrent requests reuse the last result
+        self._checked_at = now
+
+        try:
+            async with self.engine.connect() as conn:
+                lag = (await conn.execute(REPLICA_LAG_SQL)).scalar()
+        except Exception:
+            logger.warning("Read replica unavailable, using the primary", exc_info=True)
+            self.lag, self._fresh = None, False
+            return False
+
+        self.lag = float(lag) if lag is not None else 0.0
+        self._fresh = self.lag <= self.max_lag
+        if not self._fresh:
+            logger.warning("Read replica is %.1fs behind, using the primary", self.lag)
+        return self._fresh
+
+
+replica_guard: Optional[ReplicaLagGuard] = (
+    ReplicaLagGuard(
+        read_engine,
+        settings.READ_REPLICA_MAX_LAG_SECONDS,
+        settings.READ_REPLICA_LAG_CHECK_SECONDS
+    )
+    if read_engine is not None else None
+)
@@ -1,8 +1,13 @@
 from typing import AsyncGenerator
 
+from fastapi import Request
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.db.base import AsyncSessionLocal
+from app.db.base import AsyncReadSessionLocal, AsyncSessionLocal
+from app.db.replica import replica_guard
+
+# Clients that must see their own just-committed writes send this header
+READ_YOUR_WRITES_HEADER = "X-Read-Your-Writes"
 
 
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
@@ -19,4 +24,25 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
         try:
             yield session
         finally:
-            await session.close()
\ No newline at end of file
+            await session.close()
+
+
+async def get_read_db(request: Request) -> AsyncGenerator[AsyncSession, None]:
+    """
+    Dependency for read-only endpoints. Uses the read replica when one is
+    configured and within the lag limit, otherwise the primary.
+    """
+    if (
+        AsyncReadSessionLocal is None
+        or request.headers.get(READ_YOUR_WRITES_HEADER)
+        or not await replica_guard.is_fresh()
+    ):
+        async for session in get_db():
+            yield session
+        return
+
+    async with AsyncReadSessionLocal() as session:
+        try:
+            yield session
+        finally:
+            await session.close()
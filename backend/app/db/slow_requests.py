@@ -0,0 +1,181 @@
+import asyncio
+import itertools
+import logging
+import re
+from collections import deque
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from typing import Any, Deque, Dict, List, Optional, Set
+from uuid import UUID
+
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.core.config import settings
+from app.db.instrumentation import CapturedStatement, QueryStats, shorten_sql
+
+logger = logging.getLogger(__name__)
+
+# Postgres prints bound parameters into ANALYZE plans as typed literals
+_TEXT_LITERAL = re.compile(
+    r"'(?:[^']|'')*'::(text|character varying|character|bpchar|name|jsonb?|citext)\b"
+)
+
+
+def redact_parameter(value: Any) -> Any:
+    """
+    Keep values that identify rows rather than describe people (numbers,
+    ids, dates) so a plan can be reproduced; reduce the rest to type and size
+    """
+    if value is None or isinstance(value, (bool, int, float)):
+        return value
+    if isinstance(value, (Decimal, UUID, datetime, date)):
+        return str(value)
+    if isinstance(value, str):
+        return f"<str:{len(value)}>"
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return f"<bytes:{len(value)}>"
+    if isinstance(value, dict):
+        return f"<dict:{len(value)} keys>"
+    if isinstance(value, (list, tuple)):
+        items = [redact_parameter(item) for item in value[:10]]
+        if len(value) > 10:
+            items.append(f"<{len(value) - 10} more>")
+        return items
+    return f"<{type(value).__name__}>"
+
+
+def redact_plan(plan: str) -> str:
+    """Mask text-typed literals (parameter values) in an EXPLAIN plan"""
+    return _TEXT_LITERAL.sub(r"'<redacted>'::\1", plan)
+
+
+def redact_parameters(parameters: Any, executemany: bool = False) -> Any:
+    if executemany:
+        return f"<{len(parameters)} parameter sets>"
+    if isinstance(parameters, dict):
+        return {key: redact_parameter(value) for key, value in parameters.items()}
+    return redact_parameter(parameters)
+
+
+class SlowRequestRecorder:
+    """
+    Keeps the most recent slow requests of this worker in a ring buffer,
+    with their slowest statements (parameters redacted) and optionally an
+    EXPLAIN (ANALYZE, BUFFERS) plan for each captured SELECT.
+    """
+
+    def __init__(
+        self,
+        threshold: float,
+        size: int,
+        explain: bool = False,
+        explain_top: int = 3,
+        explain_timeout_ms: int = 5000
+    ):
+        self.threshold = threshold
+        self.explain = explain
+        self.explain_top = explain_top
+        self.explain_timeout_ms = explain_timeout_ms
+        self._entries: Deque[Dict[str, Any]] = deque(maxlen=size)
+        self._ids = itertools.count(1)
+        self._explaining = False
+        self._tasks: Set[asyncio.Task] = set()
+
+    @property
+    def enabled(self) -> bool:
+        return self.threshold > 0
+
+    def is_slow(self, duration: float) -> bool:
+        return self.enabled and duration >= self.threshold
+
+    def record(self, method: str, path: str, status_code: int, duration: float, stats: QueryStats) -> Dict[str, Any]:
+        captured = stats.captured()
+        entry = {
+            "id": next(self._ids),
+            "recorded_at": datetime.now(timezone.utc).isoformat(),
+            "method": method,
+            "path": path,
+            "status": status_code,
+            "duration_ms": round(duration * 1000, 2),
+            **stats.summary(),
+            "statements": [
+                {
+                    "statement": shorten_sql(item.statement, 2000),
+                    "parameters": redact_parameters(item.parameters, item.executemany),
+                    "duration_ms": round(item.duration * 1000, 2),
+                }
+                for item in captured
+            ],
+        }
+        self._entries.append(entry)
+
+        if self.explain and captured:
+            # One plan run at a time per worker; a burst of slow requests
+            # must not turn into a burst of EXPLAIN ANALYZE
+            if self._explaining:
+                entry["explain"] = "skipped"
+            else:
+                entry["explain"] = "pending"
+                self._explaining = True
+                task = asyncio.create_task(self._explain(entry, captured))
+                self._tasks.add(task)
+                task.add_done_callback(self._tasks.discard)
+        return entry
+
+    async def _explain(self, entry: Dict[str, Any], captured: List[CapturedStatement]) -> None:
+        from app.db.base import engine, read_engine
+
+        try:
+            target = read_engine if read_engine is not None else engine
+            if target is None:
+                entry["explain"] = "skipped"
+                return
+            candidates = [
+                (index, item) for index, item in enumerate(captured)
+                if not item.executemany and item.statement.lstrip()[:6].upper() == "SELECT"
+            ]
+            candidates.sort(key=lambda pair: pair[1].duration, reverse=True)
+            for index, item in candidates[:self.explain_top]:
+                entry["statements"][index]["plan"] = await self._explain_statement(target, item)
+            entry["explain"] = "done"
+        except Exception as exc:
+            logger.warning("EXPLAIN for slow request %s failed: %s", entry["id"], exc)
+            entry["explain"] = "failed"
+        finally:
+            self._explaining = False
+
+    async def _explain_statement(self, target: AsyncEngine, item: CapturedStatement) -> Optional[str]:
+        # ANALYZE really executes the statement, so only SELECTs get here and
+        # they run in a read-only transaction that is always rolled back
+        async with target.connect() as conn:
+            await conn.exec_driver_sql("SET TRANSACTION READ ONLY")
+            await conn.exec_driver_sql(f"SET LOCAL statement_timeout = {int(self.explain_timeout_ms)}")
+            result = await conn.exec_driver_sql(
+                f"EXPLAIN (ANALYZE, BUFFERS) {item.statement}", item.parameters
+            )
+            plan = redact_plan("\n".join(row[0] for row in result))
+            await conn.rollback()
+        return plan
+
+    def entries(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Newest first"""
+        entries = list(reversed(self._entries))
+        return entries[:limit] if limit is not None else entries
+
+    def get(self, entry_id: int) -> Optional[Dict[str, Any]]:
+        for entry in self._entries:
+            if entry["id"] == entry_id:
+                return entry
+        return None
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+slow_request_recorder = SlowRequestRecorder(
+    settings.SLOW_REQUEST_THRESHOLD_MS / 1000,
+    settings.SLOW_REQUEST_BUFFER_SIZE,
+    explain=settings.SLOW_REQUEST_EXPLAIN,
+    explain_top=settings.SLOW_REQUEST_EXPLAIN_TOP,
+    explain_timeout_ms=settings.SLOW_REQUEST_EXPLAIN_TIMEOUT_MS,
+)
@@ -4,12 +4,16 @@ from fastapi.middleware.trustedhost import TrustedHostMiddleware
 from fastapi.responses import JSONResponse
 from fastapi.exceptions import RequestValidationError
 from starlette.exceptions import HTTPException as StarletteHTTPException
-from starlette.middleware.sessions import SessionMiddleware
-import time
+import asyncio
 import logging
 
 from app.api.router import api_router
 from app.core.config import settings
+from app.core.middleware import APIMiddleware, ScopedSessionMiddleware
+from app.core.rate_limit import rate_limiter
+from app.db.base import AsyncSessionLocal
+from app.db.slow_requests import slow_request_recorder
+from app.services.audit_service import run_audit_rollup_periodically
 
 # Configure logging
 logging.basicConfig(
@@ -27,53 +31,13 @@ app = FastAPI(
     redoc_url="/redoc" if settings.DEBUG else None,
 )
 
-# Security Headers Middleware
-@app.middleware("http")
-async def add_security_headers(request: Request, call_next):
-    start_time = time.time()
-    
-    response = await call_next(request)
-    
-    # Add security headers
-    response.headers["X-Content-Type-Options"] = "nosniff"
-    response.headers["X-Frame-Options"] = "DENY"
-    response.headers["X-XSS-Protection"] = "1; mode=block"
-    response.headers["Strict-Transport-Security"] = "max-age=31536000; includeSubDomains"
-    response.headers["Referrer-Policy"] = "strict-origin-when-cross-origin"
-    response.headers["Content-Security-Policy"] = "default-src 'self'"
-    
-    # Add processing time header
-    process_time = time.time() - start_time
-    response.headers["X-Process-Time"] = str(process_time)
-    
-    return response
-
-# Rate limiting middleware (basic implementation)
-request_counts = {}
-@app.middleware("http") 
-async def rate_limit_middleware(request: Request, call_next):
-    client_ip = request.client.host if request.client else "unknown"
-    current_time = time.time()
-    
-    # Clean old entries (older than 1 minute)
-    request_counts[client_ip] = [
-        timestamp for timestamp in request_counts.get(client_ip, [])
-        if current_time - timestamp < 60
-    ]
-    
-    # Check rate limit (60 requests per minute)
-    if len(request_counts.get(client_ip, [])) >= 60:
-        return JSONResponse(
-            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-            content={"detail": "Rate limit exceeded"}
-        )
-    
-    # Add current request
-    if client_ip not in request_counts:
-        request_counts[client_ip] = []
-    request_counts[client_ip].append(current_time)
-    
-    return await call_next(request)
+# Rate limiting, security headers, request timing and SQL statistics
+app.add_middleware(
+    APIMiddleware,
+    rate_limiter=rate_limiter if settings.RATE_LIMIT_ENABLED else None,
+    instrument_sql=settings.SQL_INSTRUMENTATION_ENABLED,
+    slow_requests=slow_request_recorder
+)
 
 # Trusted hosts (production security)
 if not settings.DEBUG:
@@ -82,14 +46,16 @@ if not settings.DEBUG:
         allowed_hosts=["*.edc.com", "localhost", "127.0.0.1"]  # Configure for production
     )
 
-# Session middleware for additional security
-app.add_middleware(
-    SessionMiddleware,
-    secret_key=settings.JWT_SECRET_KEY,
-    max_age=settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60,
-    same_site="strict",
-    https_only=not settings.DEBUG
-)
+# Session cookies are only for browser-facing routes; the API uses bearer tokens
+if settings.SESSION_MIDDLEWARE_ENABLED:
+    app.add_middleware(
+        ScopedSessionMiddleware,
+        exclude_prefixes=[settings.API_V1_STR],
+        secret_key=settings.JWT_SECRET,
+        max_age=settings.JWT_EXPIRE_MINUTES * 60,
+        same_site="strict",
+        https_only=not settings.DEBUG
+    )
 
 # CORS middleware
 if settings.BACKEND_CORS_ORIGINS:
@@ -99,7 +65,7 @@ if settings.BACKEND_CORS_ORIGINS:
         allow_credentials=True,
         allow_methods=["GET", "POST", "PUT", "DELETE", "PATCH", "OPTIONS"],
         allow_headers=["*"],
-        expose_headers=["X-Process-Time"]
+        expose_headers=["X-Process-Time", "Server-Timing"]
     )
 
 # Exception handlers
@@ -130,6 +96,30 @@ async def general_exception_handler(request: Request, exc: Exception):
 # Include API router
 app.include_router(api_router, prefix=settings.API_V1_STR)
 
+@app.on_event("startup")
+async def start_background_tasks():
+    """
+    Start periodic maintenance jobs
+    """
+    if AsyncSessionLocal is not None:
+        app.state.audit_rollup_task = asyncio.create_task(
+            run_audit_rollup_periodically(settings.AUDIT_ROLLUP_INTERVAL_SECONDS)
+        )
+
+@app.on_event("shutdown")
+async def stop_background_tasks():
+    """
+    Stop periodic maintenance jobs
+    """
+    task = getattr(app.state, "audit_rollup_task", None)
+    if task is not None:
+        task.cancel()
+
+    from app.core.security import password_hasher
+    from app.services.pdf_service import pdf_export_service
+    pdf_export_service.shutdown()
+    password_hasher.shutdown()
+
 @app.get("/health")
 async def health_check():
     """
@@ -5,6 +5,7 @@ from .unified_models import (
     Project,
     Form,
     AuditLog,
+    AuditRollupHourly,
     UserRole,
     UserStatus,
     ProjectStatus,
@@ -26,6 +27,7 @@ __all__ = [
     "Project", 
     "Form",
     "AuditLog",
+    "AuditRollupHourly",
     "UserRole",
     "UserStatus",
     "ProjectStatus",
@@ -3,10 +3,10 @@ from datetime import datetime, date
 from typing import Optional, Dict, Any, List
 from enum import Enum
 
-from sqlalchemy import Column, String, DateTime, Boolean, Integer, Date, Text, JSON, ForeignKey, Table
-from sqlalchemy.dialects.postgresql import UUID as pg_UUID
+from sqlalchemy import Column, String, DateTime, Boolean, Integer, BigInteger, Date, Text, JSON, ForeignKey, Table
+from sqlalchemy.dialects.postgresql import UUID as pg_UUID, ARRAY
 from sqlalchemy.orm import relationship
-from sqlalchemy.sql import func
+from sqlalchemy.sql import func, literal_column
 
 from app.db.base import Base
 
@@ -70,7 +70,13 @@ class User(Base):
     last_login = Column(DateTime(timezone=True))
     
     # Relationships
-    assigned_projects = relationship("Project", secondary=user_projects, back_populates="assigned_users")
+    assigned_projects = relationship(
+        "Project",
+        secondary=user_projects,
+        primaryjoin="User.id == user_projects.c.user_id",
+        secondaryjoin="Project.id == user_projects.c.project_id",
+        back_populates="assigned_users"
+    )
     created_projects = relationship("Project", foreign_keys="Project.created_by", back_populates="creator")
     created_forms = relationship("Form", foreign_keys="Form.created_by", back_populates="creator")
     audit_logs = relationship("AuditLog", back_populates="user")
@@ -102,7 +108,13 @@ class Project(Base):
     
     # Relationships
     creator = relationship("User", foreign_keys=[created_by], back_populates="created_projects")
-    assigned_users = relationship("User", secondary=user_projects, back_populates="assigned_projects")
+    assigned_users = relationship(
+        "User",
+        secondary=user_projects,
+        primaryjoin="Project.id == user_projects.c.project_id",
+        secondaryjoin="User.id == user_projects.c.user_id",
+        back_populates="assigned_projects"
+    )
     forms = relationship("Form", back_populates="project")
 
 class Form(Base):
@@ -163,6 +175,7 @@ class AuditLog(Base):
     old_values = Column(JSON)
     new_values = Column(JSON)
     field_changes = Column(JSON)  # Specific field-level changes
+    changed_paths = Column(ARRAY(Text))  # Dotted paths of every changed field, for search
     
     # Context information
     reason = Column(Text)
@@ -179,6 +192,15 @@ class AuditLog(Base):
     user = relationship("User", back_populates="audit_logs")
     form = relationship("Form", back_populates="audit_logs")
 
+class AuditRollupHourly(Base):
+    __tablename__ = "audit_rollup_hourly"
+
+    # One row per (hour, action, user); filled from audit_logs by the rollup job
+    bucket = Column(DateTime(timezone=True), primary_key=True)
+    action = Column(String(100), primary_key=True)
+    user_id = Column(pg_UUID(as_uuid=True), primary_key=True)  # Nil UUID for system actions
+    count = Column(BigInteger, nullable=False, default=0)
+
 # Create indexes for better performance
 from sqlalchemy import Index
 
@@ -186,6 +208,16 @@ from sqlalchemy import Index
 Index('idx_users_email', User.email)
 Index('idx_users_role', User.role)
 Index('idx_users_status', User.status)
+# Case-insensitive prefix search (LIKE 'abc%') on name and email
+Index('idx_users_email_prefix', func.lower(User.email).label('email_lower'),
+      postgresql_ops={'email_lower': 'text_pattern_ops'})
+Index('idx_users_first_name_prefix', func.lower(User.first_name).label('first_name_lower'),
+      postgresql_ops={'first_name_lower': 'text_pattern_ops'})
+Index('idx_users_last_name_prefix', func.lower(User.last_name).label('last_name_lower'),
+      postgresql_ops={'last_name_lower': 'text_pattern_ops'})
+
+# Assignment lookups by project (the primary key leads with user_id)
+Index('idx_user_projects_project_user', user_projects.c.project_id, user_projects.c.user_id)
 
 # Project indexes
 Index('idx_projects_status', Project.status)
@@ -201,8 +233,21 @@ Index('idx_forms_created_by', Form.created_by)
 Index('idx_forms_submitted_at', Form.submitted_at)
 
 # Audit log indexes
-Index('idx_audit_logs_user_id', AuditLog.user_id)
-Index('idx_audit_logs_resource', AuditLog.resource_type, AuditLog.resource_id)
+# Composite indexes return per-entity trails already ordered newest first;
+# the BRIN index serves date-range scans over the append-only table
+Index('idx_audit_logs_user_created', AuditLog.user_id, AuditLog.created_at.desc())
+Index('idx_audit_logs_form_created', AuditLog.form_id, AuditLog.created_at.desc())
+Index(
+    'idx_audit_logs_resource_created',
+    AuditLog.resource_type, AuditLog.resource_id, AuditLog.created_at.desc()
+)
 Index('idx_audit_logs_action', AuditLog.action)
 Index('idx_audit_logs_created_at', AuditLog.created_at)
-Index('idx_audit_logs_form_id', AuditLog.form_id)
\ No newline at end of file
+Index('idx_audit_logs_created_at_brin', AuditLog.created_at, postgresql_using='brin')
+Index('idx_audit_logs_changed_paths', AuditLog.changed_paths, postgresql_using='gin')
+# Full-text search on reasons; queries must use this exact expression (with
+# literal arguments, not bound parameters) for the planner to match the index
+audit_reason_tsv = func.to_tsvector(
+    literal_column("'english'"), func.coalesce(AuditLog.reason, literal_column("''"))
+)
+Index('idx_audit_logs_reason_tsv', audit_reason_tsv, postgresql_using='gin')
\ No newline at end of file
@@ -1,7 +1,7 @@
 from datetime import datetime, date
 from typing import Optional, Dict, Any, List
 from uuid import UUID
-from pydantic import BaseModel, EmailStr, ConfigDict
+from pydantic import BaseModel, EmailStr, ConfigDict, Field
 
 from app.models.unified_models import UserRole, UserStatus, ProjectStatus, FormStatus, FormType
 
@@ -83,6 +83,26 @@ class ProjectAssignment(BaseModel):
     user_id: UUID
     project_id: UUID
 
+class ProjectBulkAssignment(BaseModel):
+    user_ids: List[UUID] = Field(..., min_length=1, max_length=1000)
+
+class ProjectBulkAssignmentResponse(BaseModel):
+    assigned: List[UUID] = []
+    already_assigned: List[UUID] = []
+
+class ProjectBulkUnassignmentResponse(BaseModel):
+    unassigned: List[UUID] = []
+    not_assigned: List[UUID] = []
+
+class ProjectUserResponse(BaseSchema):
+    id: UUID
+    email: str
+    first_name: Optional[str]
+    last_name: Optional[str]
+    role: UserRole
+    status: UserStatus
+    assigned_at: Optional[datetime]
+
 # Form schemas
 class FormCreate(BaseModel):
     form_type: FormType
@@ -142,6 +162,7 @@ class AuditLogResponse(BaseSchema):
     old_values: Optional[Dict[str, Any]]
     new_values: Optional[Dict[str, Any]]
     field_changes: Optional[Dict[str, Any]]
+    changed_paths: Optional[List[str]] = None
     reason: Optional[str]
     ip_address: Optional[str]
     user_agent: Optional[str]
@@ -160,6 +181,11 @@ class PaginatedResponse(BaseModel):
     limit: int
     pages: int
 
+class CursorPaginatedResponse(BaseModel):
+    items: List[Any]
+    limit: int
+    next_cursor: Optional[str] = None
+
 # Filter schemas
 class FormFilters(BaseModel):
     form_type: Optional[FormType] = None
@@ -198,4 +224,12 @@ class DashboardStats(BaseModel):
 class PDFExportRequest(BaseModel):
     form_id: UUID
     include_audit_trail: bool = False
-    watermark: Optional[str] = None
\ No newline at end of file
+    watermark: Optional[str] = None
+
+class PDFBatchExportRequest(BaseModel):
+    # Selectors are combined; at least one is required
+    project_id: Optional[UUID] = None
+    case_id: Optional[str] = None
+    form_ids: Optional[List[UUID]] = None
+    include_audit_trail: bool = False
+    watermark: Optional[str] = None
@@ -1,9 +1,59 @@
-from typing import Dict, Any, Optional, UUID
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Any, Optional, Tuple
 from uuid import UUID as UUIDType
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import func
+from sqlalchemy import func, select, desc, literal, literal_column, union_all
+from sqlalchemy.dialects.postgresql import UUID as pg_UUID, insert as pg_insert
 
-from app.models.unified_models import AuditLog
+from app.core.config import settings
+from app.models.unified_models import AuditLog, AuditRollupHourly
+
+logger = logging.getLogger(__name__)
+
+# Rollup rows use the nil UUID for actions without a user (primary key columns can't be NULL)
+SYSTEM_USER_ID = UUIDType(int=0)
+
+# Advisory lock key that keeps concurrent workers from rolling up the same hours
+AUDIT_ROLLUP_LOCK_ID = 702_026
+
+AUDIT_STATS_GRANULARITIES = ("hour", "day", "week", "month")
+
+# Top-level keys whose nested changes are also indexed relative to the key,
+# so "hematology.hemoglobin" matches a change to form_data.hematology.hemoglobin
+DATA_ROOT_FIELDS = ("form_data",)
+
+
+def get_changed_paths(field_changes: Optional[Dict[str, Any]]) -> list[str]:
+    """
+    Flatten field changes into the dotted paths of every changed field
+    """
+    if not field_changes:
+        return []
+
+    paths = set()
+
+    def walk(path: str, old: Any, new: Any) -> None:
+        paths.add(path)
+        for root in DATA_ROOT_FIELDS:
+            if path.startswith(f"{root}."):
+                paths.add(path[len(root) + 1:])
+
+        if isinstance(old, dict) or isinstance(new, dict):
+            old = old if isinstance(old, dict) else {}
+            new = new if isinstance(new, dict) else {}
+            for key in old.keys() | new.keys():
+                if old.get(key) != new.get(key):
+                    walk(f"{path}.{key}", old.get(key), new.get(key))
+
+    for field, change in field_changes.items():
+        if isinstance(change, dict) and ("old" in change or "new" in change):
+            walk(field, change.get("old"), change.get("new"))
+        else:
+            paths.add(field)
+
+    return sorted(paths)
 
 async def log_activity(
     db: AsyncSession,
@@ -50,6 +100,7 @@ async def log_activity(
         old_values=old_values,
         new_values=new_values,
         field_changes=field_changes,
+        changed_paths=get_changed_paths(field_changes) or None,
         reason=reason,
         ip_address=ip_address,
         user_agent=user_agent,
@@ -94,4 +145,272 @@ async def get_audit_trail(
     query = query.order_by(desc(AuditLog.created_at)).limit(limit).offset(offset)
     
     result = await db.execute(query)
-    return result.scalars().all()
\ No newline at end of file
+    return result.scalars().all()
+
+async def search_audit_logs(
+    db: AsyncSession,
+    field_path: Optional[str] = None,
+    text_query: Optional[str] = None,
+    project_id: Optional[UUIDType] = None,
+    user_id: Optional[UUIDType] = None,
+    action: Optional[str] = None,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    after: Optional[Tuple[datetime, UUIDType]] = None,
+    limit: int = 50
+) -> list[AuditLog]:
+    """
+    Search audit logs by changed field path and reason text, newest first.
+    Pass the (created_at, id) of the last row seen as `after` to get the next page.
+    """
+    from sqlalchemy import and_, or_, tuple_
+    from sqlalchemy.orm import selectinload
+    from app.models.unified_models import Form, audit_reason_tsv
+
+    query = select(AuditLog).options(selectinload(AuditLog.user))
+
+    if field_path:
+        # GIN lookup on idx_audit_logs_changed_paths
+        query = query.where(AuditLog.changed_paths.contains([field_path]))
+
+    if text_query:
+        # GIN lookup on idx_audit_logs_reason_tsv
+        query = query.where(
+            audit_reason_tsv.bool_op("@@")(func.websearch_to_tsquery("english", text_query))
+        )
+
+    if project_id:
+        project_forms = select(Form.id).where(Form.project_id == project_id)
+        query = query.where(
+            or_(
+                AuditLog.form_id.in_(project_forms),
+                and_(AuditLog.resource_type == "project", AuditLog.resource_id == project_id)
+            )
+        )
+
+    if user_id:
+        query = query.where(AuditLog.user_id == user_id)
+
+    if action:
+        query = query.where(AuditLog.action == action)
+
+    if date_from:
+        query = query.where(AuditLog.created_at >= date_from)
+
+    if date_to:
+        query = query.where(AuditLog.created_at < date_to)
+
+    if after:
+        query = query.where(tuple_(AuditLog.created_at, AuditLog.id) < tuple_(*after))
+
+    query = query.order_by(desc(AuditLog.created_at), desc(AuditLog.id)).limit(limit)
+
+    result = await db.execute(query)
+    return result.scalars().all()
+
+def _as_utc(value: datetime) -> datetime:
+    """Treat naive datetimes as UTC"""
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+def _floor_hour(value: datetime) -> datetime:
+    return value.replace(minute=0, second=0, microsecond=0)
+
+
+def _ceil_hour(value: datetime) -> datetime:
+    floored = _floor_hour(value)
+    return floored if floored == value else floored + timedelta(hours=1)
+
+
+async def get_audit_rollup_watermark(db: AsyncSession) -> Optional[datetime]:
+    """
+    Get the high-water mark of the hourly rollup: every audit log created
+    before it is counted in audit_rollup_hourly, nothing after it is
+    """
+    result = await db.execute(select(func.max(AuditRollupHourly.bucket)))
+    last_bucket = result.scalar()
+    return last_bucket + timedelta(hours=1) if last_bucket else None
+
+
+async def roll_up_audit_logs(db: AsyncSession) -> int:
+    """
+    Fold closed hours of audit_logs past the high-water mark into audit_rollup_hourly
+    """
+    # Only one worker rolls up at a time; the others skip this round
+    locked = await db.execute(select(func.pg_try_advisory_xact_lock(AUDIT_ROLLUP_LOCK_ID)))
+    if not locked.scalar():
+        await db.rollback()
+        return 0
+
+    watermark = await get_audit_rollup_watermark(db)
+    cutoff = _floor_hour(
+        datetime.now(timezone.utc) - timedelta(seconds=settings.AUDIT_ROLLUP_LAG_SECONDS)
+    )
+    if watermark is not None and watermark >= cutoff:
+        await db.rollback()
+        return 0
+
+    bucket = func.date_trunc(literal_column("'hour'"), AuditLog.created_at)
+    user_id = func.coalesce(AuditLog.user_id, literal(SYSTEM_USER_ID, pg_UUID(as_uuid=True)))
+    source = (
+        select(bucket, AuditLog.action, user_id, func.count())
+        .where(AuditLog.created_at < cutoff)
+        .group_by(bucket, AuditLog.action, user_id)
+    )
+    if watermark is not None:
+        source = source.where(AuditLog.created_at >= watermark)
+
+    stmt = pg_insert(AuditRollupHourly).from_select(
+        ["bucket", "action", "user_id", "count"], source
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["bucket", "action", "user_id"],
+        set_={"count": AuditRollupHourly.count + stmt.excluded.count},
+    )
+    result = await db.execute(stmt)
+    await db.commit()
+
+    return result.rowcount
+
+
+async def run_audit_rollup_periodically(interval_seconds: int) -> None:
+    """
+    Background loop that keeps audit_rollup_hourly up to date
+    """
+    from app.db.base import AsyncSessionLocal
+
+    while True:
+        try:
+            async with AsyncSessionLocal() as db:
+                rows = await roll_up_audit_logs(db)
+            if rows:
+                logger.info(f"Audit rollup wrote {rows} hourly buckets")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Audit rollup failed: {str(e)}", exc_info=True)
+
+        await asyncio.sleep(interval_seconds)
+
+
+def _live_audit_counts(date_from: Optional[datetime], date_to: Optional[datetime]):
+    """Hourly counts computed directly from audit_logs"""
+    bucket = func.date_trunc(literal_column("'hour'"), AuditLog.created_at)
+    user_id = func.coalesce(AuditLog.user_id, literal(SYSTEM_USER_ID, pg_UUID(as_uuid=True)))
+    query = select(
+        bucket.label("bucket"),
+        AuditLog.action.label("action"),
+        user_id.label("user_id"),
+        func.count().label("count"),
+    ).group_by(bucket, AuditLog.action, user_id)
+
+    if date_from is not None:
+        query = query.where(AuditLog.created_at >= date_from)
+    if date_to is not None:
+        query = query.where(AuditLog.created_at < date_to)
+
+    return query
+
+
+def _audit_counts(
+    date_from: Optional[datetime],
+    date_to: datetime,
+    watermark: Optional[datetime],
+):
+    """
+    Hourly (bucket, action, user_id, count) rows for [date_from, date_to).
+
+    Whole hours below the rollup watermark are read from audit_rollup_hourly;
+    the partial first hour and the not yet rolled-up tail are counted live.
+    """
+    rolled_from = _ceil_hour(date_from) if date_from is not None else None
+    rolled_to = min(_floor_hour(date_to), watermark) if watermark is not None else None
+
+    if rolled_to is None or (rolled_from is not None and rolled_from >= rolled_to):
+        return _live_audit_counts(date_from, date_to).subquery()
+
+    rolled = select(
+        AuditRollupHourly.bucket,
+        AuditRollupHourly.action,
+        AuditRollupHourly.user_id,
+        AuditRollupHourly.count,
+    ).where(AuditRollupHourly.bucket < rolled_to)
+    live_parts = [_live_audit_counts(rolled_to, date_to)]
+
+    if rolled_from is not None:
+        rolled = rolled.where(AuditRollupHourly.bucket >= rolled_from)
+        if date_from < rolled_from:
+            live_parts.append(_live_audit_counts(date_from, rolled_from))
+
+    parts = [rolled, *live_parts]
+
+    return union_all(*parts).subquery()
+
+
+async def get_audit_stats(
+    db: AsyncSession,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    granularity: str = "day",
+    top: int = 10,
+) -> Dict[str, Any]:
+    """
+    Get audit statistics for a time range, served from the hourly rollup
+    """
+    if granularity not in AUDIT_STATS_GRANULARITIES:
+        raise ValueError(f"Unsupported granularity: {granularity}")
+
+    now = datetime.now(timezone.utc)
+    date_from = _as_utc(date_from) if date_from else None
+    date_to = _as_utc(date_to) if date_to else now
+    watermark = await get_audit_rollup_watermark(db)
+
+    counts = _audit_counts(date_from, date_to, watermark)
+    total = func.sum(counts.c.count)
+
+    # Time series
+    period = func.date_trunc(literal_column(f"'{granularity}'"), counts.c.bucket)
+    series_result = await db.execute(
+        select(period.label("period"), total.label("count"))
+        .group_by(period)
+        .order_by(period)
+    )
+    series = [
+        {"bucket": row.period.isoformat(), "count": int(row.count)}
+        for row in series_result
+    ]
+
+    # Top actions
+    top_actions = await db.execute(
+        select(counts.c.action, total.label("count"))
+        .group_by(counts.c.action)
+        .order_by(desc("count"))
+        .limit(top)
+    )
+    top_actions_list = [{"action": row[0], "count": int(row[1])} for row in top_actions]
+
+    # Top users
+    top_users = await db.execute(
+        select(counts.c.user_id, total.label("count"))
+        .where(counts.c.user_id != SYSTEM_USER_ID)
+        .group_by(counts.c.user_id)
+        .order_by(desc("count"))
+        .limit(top)
+    )
+    top_users_list = [{"user_id": str(row[0]), "count": int(row[1])} for row in top_users]
+
+    # Logs from the last 24 hours
+    recent = _audit_counts(now - timedelta(days=1), now, watermark)
+    recent_result = await db.execute(select(func.coalesce(func.sum(recent.c.count), 0)))
+
+    return {
+        "total_logs": sum(point["count"] for point in series),
+        "recent_logs_24h": int(recent_result.scalar()),
+        "top_actions": top_actions_list,
+        "top_users": top_users_list,
+        "series": series,
+        "granularity": granularity,
+        "date_from": date_from.isoformat() if date_from else None,
+        "date_to": date_to.isoformat(),
+        "rolled_up_through": watermark.isoformat() if watermark else None,
+    }
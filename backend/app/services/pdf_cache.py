@@ -0,0 +1,154 @@
+import hashlib
+import logging
+import os
+import shutil
+import tempfile
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import BinaryIO, Optional, Tuple
+from uuid import UUID
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class PDFCache:
+    """
+    Content-addressed on-disk cache of rendered PDFs with LRU eviction.
+
+    Files live at <directory>/<form_id>/<key>.pdf, where the key hashes every
+    input that affects the output, so a stale entry is simply never looked up
+    again. The LRU index is per process; workers sharing the directory adopt
+    each other's files on lookup.
+    """
+
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Tuple[str, str], int]" = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self._loaded = False
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    @staticmethod
+    def make_key(*parts: object) -> str:
+        """Hash the cache inputs into a stable key (also used as the ETag)"""
+        digest = hashlib.sha256()
+        for part in parts:
+            digest.update(repr(part).encode("utf-8"))
+            digest.update(b"\x00")
+        return digest.hexdigest()
+
+    def open(self, form_id: UUID, key: str) -> Optional[BinaryIO]:
+        """
+        Open the cached file for a key, marking it most recently used. The
+        handle stays readable if the file is evicted or invalidated meanwhile,
+        so callers read from it rather than reopening the path.
+        """
+        if not self.enabled:
+            return None
+
+        entry = (str(form_id), key)
+        path = self._path(*entry)
+        with self._lock:
+            self._load()
+            try:
+                file = path.open("rb")
+            except FileNotFoundError:
+                self._forget(entry)
+                return None
+
+            if entry not in self._entries:
+                # Written by another worker; take it into this index
+                size = os.fstat(file.fileno()).st_size
+                self._entries[entry] = size
+                self._size += size
+            self._entries.move_to_end(entry)
+            self._evict(keep=entry)
+            return file
+
+    def put(self, form_id: UUID, key: str, data: bytes) -> Optional[Path]:
+        """Store a rendered PDF and evict least recently used files over the cap"""
+        if not self.enabled or len(data) > self.max_bytes:
+            return None
+
+        entry = (str(form_id), key)
+        path = self._path(*entry)
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        # Write to a temp file first so readers never see a partial PDF
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as tmp:
+                tmp.write(data)
+            os.replace(tmp_path, path)
+        except OSError:
+            logger.warning("Could not write PDF cache entry %s", path, exc_info=True)
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            return None
+
+        with self._lock:
+            self._load()
+            self._forget(entry)
+            self._entries[entry] = len(data)
+            self._size += len(data)
+            self._evict(keep=entry)
+        return path
+
+    def invalidate(self, form_id: UUID) -> None:
+        """Drop every cached export of a form"""
+        form_key = str(form_id)
+        with self._lock:
+            for entry in [e for e in self._entries if e[0] == form_key]:
+                self._forget(entry)
+        shutil.rmtree(self.directory / form_key, ignore_errors=True)
+
+    def _path(self, form_key: str, key: str) -> Path:
+        return self.directory / form_key / f"{key}.pdf"
+
+    def _load(self) -> None:
+        # Rebuild the index from disk once, oldest files first
+        if self._loaded:
+            return
+        self._loaded = True
+        if not self.directory.is_dir():
+            return
+
+        files = []
+        for path in self.directory.glob("*/*.pdf"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            files.append((stat.st_mtime, path, stat.st_size))
+
+        for _, path, size in sorted(files):
+            self._entries[(path.parent.name, path.stem)] = size
+            self._size += size
+        self._evict()
+
+    def _forget(self, entry: Tuple[str, str]) -> None:
+        size = self._entries.pop(entry, None)
+        if size is not None:
+            self._size -= size
+
+    def _evict(self, keep: Optional[Tuple[str, str]] = None) -> None:
+        while self._size > self.max_bytes and self._entries:
+            entry = next(iter(self._entries))
+            if entry == keep:
+                break
+            self._forget(entry)
+            try:
+                self._path(*entry).unlink()
+            except FileNotFoundError:
+                pass
+
+
+pdf_cache = PDFCache(settings.PDF_CACHE_DIR, settings.PDF_CACHE_MAX_MB * 1024 * 1024)
@@ -0,0 +1,304 @@
+# PDF rendering for form exports. This runs inside the PDF worker processes,
+# so it only depends on reportlab and works on the plain, picklable documents
+# built by PDFExportService.
+import json
+from io import BytesIO
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+from xml.sax.saxutils import escape
+
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+from reportlab.lib.units import mm
+from reportlab.platypus import (
+    PageBreak,
+    Paragraph,
+    SimpleDocTemplate,
+    Spacer,
+    Table,
+    TableStyle,
+)
+
+# Bump whenever the rendered output changes, so cached exports are not reused
+RENDERER_VERSION = "2"
+
+PAGE_WIDTH, PAGE_HEIGHT = A4
+MARGIN = 18 * mm
+HEADER_COLOR = colors.HexColor("#2563eb")
+BORDER_COLOR = colors.HexColor("#e5e7eb")
+MUTED_COLOR = colors.HexColor("#6b7280")
+
+STATUS_COLORS = {
+    "draft": "#6b7280",
+    "submitted": "#3b82f6",
+    "approved": "#10b981",
+    "rejected": "#ef4444",
+    "locked": "#6366f1",
+}
+
+# Audit rows per table; reportlab splits small tables across pages much faster
+AUDIT_ROWS_PER_TABLE = 100
+# Flowables kept queued ahead of the layout engine when the story is streamed
+STORY_LOOKAHEAD = 3
+
+_styles = getSampleStyleSheet()
+STYLES = {
+    "title": ParagraphStyle("EDCTitle", parent=_styles["Heading1"], textColor=HEADER_COLOR),
+    "subtitle": ParagraphStyle("EDCSubtitle", parent=_styles["Heading2"]),
+    "section": ParagraphStyle("EDCSection", parent=_styles["Heading3"], spaceBefore=12),
+    "body": ParagraphStyle("EDCBody", parent=_styles["BodyText"], fontSize=9, leading=12),
+    "cell": ParagraphStyle("EDCCell", parent=_styles["BodyText"], fontSize=8, leading=10),
+}
+
+
+def _text(value: Any, default: str = "N/A") -> str:
+    """Escape a value for use inside a Paragraph"""
+    if value is None or value == "":
+        return default
+    return escape(str(value))
+
+
+def _label(key: str) -> str:
+    return escape(str(key).replace("_", " ").title())
+
+
+def _field_style(depth: int) -> ParagraphStyle:
+    return ParagraphStyle(
+        f"EDCField{depth}", parent=STYLES["body"], leftIndent=depth * 12
+    )
+
+
+def _format_form_data(data: Any, depth: int = 0) -> Iterable[Paragraph]:
+    """Yield one paragraph per field, indenting nested structures"""
+    style = _field_style(depth)
+
+    for key, value in data.items():
+        if isinstance(value, dict):
+            yield Paragraph(f"<b>{_label(key)}</b>", style)
+            yield from _format_form_data(value, depth + 1)
+        elif isinstance(value, list):
+            if not value:
+                yield Paragraph(f"<b>{_label(key)}:</b> None", style)
+            elif all(isinstance(item, (str, int, float, bool)) for item in value):
+                joined = ", ".join(str(item) for item in value)
+                yield Paragraph(f"<b>{_label(key)}:</b> {escape(joined)}", style)
+            else:
+                yield Paragraph(f"<b>{_label(key)}</b>", style)
+                for index, item in enumerate(value, start=1):
+                    if isinstance(item, dict):
+                        yield Paragraph(f"<i>Item {index}</i>", _field_style(depth + 1))
+                        yield from _format_form_data(item, depth + 2)
+                    else:
+                        yield Paragraph(_text(item), _field_style(depth + 1))
+        else:
+            yield Paragraph(f"<b>{_label(key)}:</b> {_text(value)}", style)
+
+
+def _meta_table(form: Dict[str, Any]) -> Table:
+    status = form.get("status") or "draft"
+    status_color = STATUS_COLORS.get(status, STATUS_COLORS["draft"])
+
+    left = [
+        ("Form ID", form.get("id")),
+        ("Form Type", form.get("form_type")),
+        ("Version", form.get("version")),
+        ("Status", f'<font color="{status_color}"><b>{escape(status.upper())}</b></font>'),
+        ("Created", form.get("created_at")),
+        ("Created By", form.get("created_by")),
+    ]
+    right = [
+        ("Case ID", form.get("case_id")),
+        ("Volunteer ID", form.get("volunteer_id")),
+        ("Study Number", form.get("study_number")),
+        ("Period Number", form.get("period_number")),
+        ("Project", form.get("project")),
+        ("Submitted", form.get("submitted_at") or "Not submitted"),
+    ]
+
+    def cell(label: str, value: Any) -> Paragraph:
+        # Status is pre-formatted markup; everything else is escaped
+        text = value if label == "Status" else _text(value)
+        return Paragraph(f"<b>{label}:</b> {text}", STYLES["body"])
+
+    rows = [[cell(*l), cell(*r)] for l, r in zip(left, right)]
+    table = Table(rows, colWidths=[(PAGE_WIDTH - 2 * MARGIN) / 2] * 2)
+    table.setStyle(TableStyle([
+        ("BACKGROUND", (0, 0), (-1, -1), colors.HexColor("#f9fafb")),
+        ("BOX", (0, 0), (-1, -1), 0.5, BORDER_COLOR),
+        ("VALIGN", (0, 0), (-1, -1), "TOP"),
+    ]))
+    return table
+
+
+def _review_section(form: Dict[str, Any]) -> List[Any]:
+    story: List[Any] = []
+
+    if form.get("status") == "approved" and form.get("approved_at"):
+        story.append(Paragraph(
+            f"<b>Approved:</b> {_text(form['approved_at'])} &nbsp; "
+            f"<b>Approved By:</b> {_text(form.get('approved_by'))}",
+            STYLES["body"],
+        ))
+    elif form.get("status") == "rejected" and form.get("rejected_at"):
+        story.append(Paragraph(
+            f"<b>Rejected:</b> {_text(form['rejected_at'])} &nbsp; "
+            f"<b>Rejected By:</b> {_text(form.get('rejected_by'))}",
+            STYLES["body"],
+        ))
+        if form.get("rejection_reason"):
+            story.append(Paragraph(
+                f"<b>Reason:</b> {_text(form['rejection_reason'])}", STYLES["body"]
+            ))
+
+    if form.get("review_comments"):
+        story.append(Paragraph("Review Comments", STYLES["section"]))
+        story.append(Paragraph(_text(form["review_comments"]), STYLES["body"]))
+
+    return story
+
+
+class _StreamedStory(list):
+    """
+    Story list that pulls further flowables from an iterator as reportlab
+    consumes it. The build loop and keep-with-next lookahead both go through
+    len(), so topping up there keeps only a few flowables alive at a time.
+    """
+
+    def __init__(self, head: List[Any], tail: Iterable[Any]):
+        super().__init__(head)
+        self._tail: Optional[Iterator[Any]] = iter(tail)
+
+    def __len__(self) -> int:
+        while self._tail is not None and list.__len__(self) < STORY_LOOKAHEAD:
+            try:
+                self.append(next(self._tail))
+            except StopIteration:
+                self._tail = None
+        return list.__len__(self)
+
+
+def _read_audit_rows(path: str) -> Iterator[Dict[str, Any]]:
+    with open(path, encoding="utf-8") as spool:
+        for line in spool:
+            yield json.loads(line)
+
+
+def _audit_tables(rows: Iterable[Dict[str, Any]]) -> Iterator[Table]:
+    """Render the audit trail as a run of tables that share a repeated header"""
+    header = [
+        Paragraph(f"<b>{title}</b>", STYLES["cell"])
+        for title in ("Timestamp", "User", "Action", "Changes")
+    ]
+    width = PAGE_WIDTH - 2 * MARGIN
+    col_widths = [width * 0.18, width * 0.18, width * 0.16, width * 0.48]
+    style = TableStyle([
+        ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#f9fafb")),
+        ("GRID", (0, 0), (-1, -1), 0.5, BORDER_COLOR),
+        ("VALIGN", (0, 0), (-1, -1), "TOP"),
+    ])
+
+    def make_table(body: List[List[Paragraph]]) -> Table:
+        table = Table([header] + body, colWidths=col_widths, repeatRows=1)
+        table.setStyle(style)
+        return table
+
+    body: List[List[Paragraph]] = []
+    for row in rows:
+        body.append([
+            Paragraph(_text(row.get("timestamp")), STYLES["cell"]),
+            Paragraph(_text(row.get("user"), "System"), STYLES["cell"]),
+            Paragraph(_text(row.get("action")), STYLES["cell"]),
+            Paragraph(
+                "<br/>".join(_text(change) for change in row.get("changes") or [])
+                or _text(row.get("reason"), ""),
+                STYLES["cell"],
+            ),
+        ])
+        if len(body) == AUDIT_ROWS_PER_TABLE:
+            yield make_table(body)
+            body = []
+
+    if body:
+        yield make_table(body)
+
+
+def _page_decorator(document: Dict[str, Any]):
+    """Draw the watermark, running header and footer on every page"""
+    form = document["form"]
+    watermark: Optional[str] = document.get("watermark")
+    header_text = f"{form.get('title') or 'Form'}  |  Case {form.get('case_id') or 'N/A'}"
+    footer_text = f"Generated on: {document.get('generated_at')} UTC  |  EDC - Electronic Data Capture System"
+
+    def draw(canvas, doc) -> None:
+        canvas.saveState()
+
+        if watermark:
+            canvas.setFillColor(colors.Color(0, 0, 0, alpha=0.08))
+            canvas.setFont("Helvetica-Bold", 64)
+            canvas.translate(PAGE_WIDTH / 2, PAGE_HEIGHT / 2)
+            canvas.rotate(45)
+            canvas.drawCentredString(0, 0, watermark)
+            canvas.rotate(-45)
+            canvas.translate(-PAGE_WIDTH / 2, -PAGE_HEIGHT / 2)
+
+        canvas.setFont("Helvetica", 8)
+        canvas.setFillColor(MUTED_COLOR)
+        canvas.drawString(MARGIN, PAGE_HEIGHT - 12 * mm, header_text)
+        canvas.drawRightString(PAGE_WIDTH - MARGIN, PAGE_HEIGHT - 12 * mm, f"Page {doc.page}")
+        canvas.setStrokeColor(BORDER_COLOR)
+        canvas.line(MARGIN, PAGE_HEIGHT - 13 * mm, PAGE_WIDTH - MARGIN, PAGE_HEIGHT - 13 * mm)
+        canvas.drawCentredString(PAGE_WIDTH / 2, 10 * mm, footer_text)
+
+        canvas.restoreState()
+
+    return draw
+
+
+def render_form_pdf(document: Dict[str, Any]) -> bytes:
+    """
+    Render a form export document to PDF bytes
+    """
+    form = document["form"]
+    buffer = BytesIO()
+    doc = SimpleDocTemplate(
+        buffer,
+        pagesize=A4,
+        leftMargin=MARGIN,
+        rightMargin=MARGIN,
+        topMargin=MARGIN + 4 * mm,
+        bottomMargin=MARGIN,
+        title=f"Form: {form.get('title') or ''}",
+        author="EDC - Electronic Data Capture System",
+    )
+
+    story: List[Any] = [
+        Paragraph("Electronic Data Capture Form", STYLES["title"]),
+        Paragraph(_text(form.get("title"), ""), STYLES["subtitle"]),
+        _meta_table(form),
+        Spacer(1, 6 * mm),
+        *_review_section(form),
+        Paragraph("Form Data", STYLES["section"]),
+    ]
+
+    form_data = document.get("form_data")
+    if form_data:
+        story.extend(_format_form_data(form_data))
+    else:
+        story.append(Paragraph("No form data available.", STYLES["body"]))
+
+    # The audit trail arrives as a spooled file and is laid out one table at a
+    # time, so its length does not affect memory use
+    audit_tables: Iterable[Table] = ()
+    audit_trail_path = document.get("audit_trail_path")
+    if audit_trail_path:
+        audit_tables = _audit_tables(_read_audit_rows(audit_trail_path))
+        first_table = next(audit_tables, None)
+        if first_table is not None:
+            story.append(PageBreak())
+            story.append(Paragraph("Audit Trail", STYLES["subtitle"]))
+            story.append(first_table)
+
+    decorate = _page_decorator(document)
+    doc.build(_StreamedStory(story, audit_tables), onFirstPage=decorate, onLaterPages=decorate)
+
+    return buffer.getvalue()
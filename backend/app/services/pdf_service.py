@@ -1,39 +1,60 @@
-from typing import Optional, Dict, Any
-from uuid import UUID
+from typing import Optional, Dict, Any, List, AsyncIterator, BinaryIO, Iterator, TextIO, Tuple
+from uuid import UUID, uuid4
+import asyncio
 import json
-import base64
-from datetime import datetime
-from io import BytesIO
+import logging
+import multiprocessing
+import os
+import tempfile
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime, timezone
 
 from fastapi import HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, desc
 from sqlalchemy.orm import selectinload
 
-from app.models.unified_models import Form, AuditLog
-from app.services.audit_service import get_audit_trail
+from app.core.config import settings
+from app.models.unified_models import Form, AuditLog, User
+from app.services.pdf_cache import PDFCache, pdf_cache
+from app.services.pdf_renderer import RENDERER_VERSION, render_form_pdf
+from app.services.pdf_templates import form_template, iter_chunks
+
+DATETIME_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+# Exports are logged against the form like any other event and appear in its
+# trail, but they don't invalidate cached exports: a cached PDF shows the
+# trail as of the render that produced it
+EXPORT_AUDIT_ACTIONS = ("export_pdf",)
+
+# Audit rows fetched per round trip when spooling a full audit trail. Small:
+# a form edit's field_changes holds the old and new form data in full
+AUDIT_FETCH_SIZE = 100
+# HTML previews show only the most recent audit entries
+PREVIEW_AUDIT_LIMIT = 1000
+
+# Forms loaded per query when rendering a batch
+BATCH_LOAD_SIZE = 50
+# Batch progress records kept for polling
+BATCH_HISTORY_SIZE = 200
+
+logger = logging.getLogger(__name__)
 
-# For production, you would use libraries like:
-# import pdfkit  # For HTML to PDF conversion
-# from reportlab.pdfgen import canvas  # For programmatic PDF generation
-# import weasyprint  # Alternative HTML to PDF
 
 class PDFExportService:
     """
-    Service for generating PDF exports of forms and audit trails
-    Note: This is a basic implementation. In production, you would use
-    proper PDF generation libraries like pdfkit, reportlab, or weasyprint
+    Service for generating PDF exports of forms and audit trails.
+    PDFs are rendered with reportlab in a separate process pool so large
+    exports never block the event loop; previews stream precompiled HTML.
     """
     
     def __init__(self):
-        self.default_styles = {
-            "font_family": "Arial, sans-serif",
-            "font_size": "12px",
-            "line_height": "1.4",
-            "margin": "20px",
-            "header_color": "#2563eb",
-            "border_color": "#e5e7eb"
-        }
+        self._render_pool: Optional[ProcessPoolExecutor] = None
+        # Caps renders in flight (running or queued on the pool) for this worker
+        self._render_slots = asyncio.Semaphore(settings.PDF_RENDER_MAX_CONCURRENCY)
+        self._batches: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
     
     async def generate_form_pdf(
         self,
@@ -45,17 +66,265 @@ class PDFExportService:
         """
         Generate PDF for a form
         """
-        # Get form with all related data
-        result = await db.execute(
-            select(Form)
-            .options(
-                selectinload(Form.creator),
-                selectinload(Form.approver),
-                selectinload(Form.rejector),
-                selectinload(Form.project)
+        form = await self._get_form(db, form_id)
+        audit_trail_path = await self._spool_audit_trail(db, form_id) if include_audit_trail else None
+
+        try:
+            document = self._build_document(form, watermark, audit_trail_path)
+            return await self.render(document)
+        finally:
+            if audit_trail_path:
+                os.unlink(audit_trail_path)
+
+    async def get_form_pdf(
+        self,
+        db: AsyncSession,
+        form: Form,
+        cache_key: str,
+        include_audit_trail: bool = False,
+        watermark: Optional[str] = None
+    ) -> BinaryIO | bytes:
+        """
+        Return the cached PDF for a key as an open file, rendering and caching
+        it on a miss
+        """
+        cached = pdf_cache.open(form.id, cache_key)
+        if cached is not None:
+            return cached
+
+        pdf_bytes = await self.generate_form_pdf(
+            db=db,
+            form_id=form.id,
+            include_audit_trail=include_audit_trail,
+            watermark=watermark
+        )
+        await asyncio.to_thread(pdf_cache.put, form.id, cache_key, pdf_bytes)
+        return pdf_bytes
+
+    async def get_cache_key(
+        self,
+        db: AsyncSession,
+        form: Form,
+        include_audit_trail: bool = False,
+        watermark: Optional[str] = None
+    ) -> str:
+        """
+        Key a form export by everything that changes the rendered output
+        """
+        audit_version = None
+        if include_audit_trail:
+            # New audit entries change the trail without touching the form;
+            # the newest one other than an export versions it
+            result = await db.execute(
+                select(AuditLog.created_at, AuditLog.id)
+                .where(
+                    AuditLog.resource_type == "form",
+                    AuditLog.resource_id == form.id,
+                    AuditLog.action.not_in(EXPORT_AUDIT_ACTIONS)
+                )
+                .order_by(desc(AuditLog.created_at), desc(AuditLog.id))
+                .limit(1)
             )
-            .where(Form.id == form_id)
+            audit_version = tuple(result.one_or_none() or ())
+
+        return PDFCache.make_key(
+            form.id,
+            form.updated_at,
+            include_audit_trail,
+            audit_version,
+            watermark,
+            RENDERER_VERSION
         )
+
+    async def iter_batch_pdfs(
+        self,
+        db: AsyncSession,
+        form_ids: List[UUID],
+        progress: Dict[str, Any],
+        include_audit_trail: bool = False,
+        watermark: Optional[str] = None
+    ) -> AsyncIterator[Tuple[Form, bytes]]:
+        """
+        Render a batch of forms on the worker pool, yielding each PDF as it finishes.
+        Forms are loaded in chunks and only a small window of renders is kept in
+        flight, so memory stays flat however large the batch is.
+        """
+        window = settings.PDF_RENDER_MAX_CONCURRENCY * 2
+        tasks: Dict[asyncio.Task, Form] = {}
+        spools: Dict[asyncio.Task, str] = {}
+
+        try:
+            for start in range(0, len(form_ids), BATCH_LOAD_SIZE):
+                result = await db.execute(
+                    self._form_query().where(Form.id.in_(form_ids[start:start + BATCH_LOAD_SIZE]))
+                )
+                for form in result.scalars():
+                    # The session is not shared with the render tasks; all DB work happens here
+                    cache_key = await self.get_cache_key(db, form, include_audit_trail, watermark)
+                    cached = pdf_cache.open(form.id, cache_key)
+                    if cached is not None:
+                        task = asyncio.create_task(asyncio.to_thread(self._read_cached, cached))
+                    else:
+                        audit_trail_path = await self._spool_audit_trail(db, form.id) if include_audit_trail else None
+                        document = self._build_document(form, watermark, audit_trail_path)
+                        task = asyncio.create_task(self._render_and_cache(form.id, cache_key, document))
+                        if audit_trail_path:
+                            spools[task] = audit_trail_path
+                    tasks[task] = form
+
+                    while len(tasks) >= window:
+                        done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                        for task in done:
+                            self._remove_spool(spools.pop(task, None))
+                            item = self._batch_result(tasks.pop(task), task, progress)
+                            if item is not None:
+                                yield item
+
+            while tasks:
+                done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    self._remove_spool(spools.pop(task, None))
+                    item = self._batch_result(tasks.pop(task), task, progress)
+                    if item is not None:
+                        yield item
+        finally:
+            # Client went away or the batch failed; stop queued renders
+            for task in tasks:
+                task.cancel()
+            for path in spools.values():
+                self._remove_spool(path)
+
+    def start_batch(self, form_count: int, user_id: UUID) -> Dict[str, Any]:
+        """Register progress tracking for a batch export"""
+        progress = {
+            "batch_id": str(uuid4()),
+            "status": "running",
+            "total": form_count,
+            "completed": 0,
+            "failed": [],
+            "requested_by": str(user_id),
+            "started_at": datetime.now(timezone.utc).isoformat(),
+            "finished_at": None,
+        }
+        self._batches[progress["batch_id"]] = progress
+        while len(self._batches) > BATCH_HISTORY_SIZE:
+            self._batches.popitem(last=False)
+        return progress
+
+    def get_batch(self, batch_id: str) -> Optional[Dict[str, Any]]:
+        """Progress of a batch export started by this API worker"""
+        return self._batches.get(batch_id)
+
+    async def _render_and_cache(self, form_id: UUID, cache_key: str, document: Dict[str, Any]) -> bytes:
+        pdf_bytes = await self.render(document)
+        await asyncio.to_thread(pdf_cache.put, form_id, cache_key, pdf_bytes)
+        return pdf_bytes
+
+    def _batch_result(
+        self,
+        form: Form,
+        task: asyncio.Task,
+        progress: Dict[str, Any]
+    ) -> Optional[Tuple[Form, bytes]]:
+        try:
+            pdf_bytes = task.result()
+        except Exception as e:
+            # One bad form should not abort a study-wide export
+            logger.warning("Batch %s: failed to render form %s: %s", progress["batch_id"], form.id, e)
+            progress["failed"].append({
+                "form_id": str(form.id),
+                "error": getattr(e, "detail", None) or str(e) or type(e).__name__
+            })
+            return None
+
+        progress["completed"] += 1
+        return form, pdf_bytes
+
+    async def generate_form_html(
+        self,
+        db: AsyncSession,
+        form_id: UUID,
+        include_audit_trail: bool = False,
+        watermark: Optional[str] = None
+    ) -> Iterator[str]:
+        """
+        Generate the HTML preview for a form as a stream of chunks
+        """
+        form = await self._get_form(db, form_id)
+        audit_logs = await self._get_recent_audit_logs(db, form_id) if include_audit_trail else []
+
+        return self._iter_form_html(form, audit_logs, watermark)
+
+    async def render(self, document: Dict[str, Any]) -> bytes:
+        """
+        Render a document on the worker pool, waiting for a free slot first
+        """
+        async with self._render_slots:
+            loop = asyncio.get_running_loop()
+            pool = self._get_render_pool()
+            try:
+                return await asyncio.wait_for(
+                    loop.run_in_executor(pool, render_form_pdf, document),
+                    timeout=settings.PDF_RENDER_TIMEOUT_SECONDS
+                )
+            except BrokenProcessPool:
+                # A worker died (e.g. OOM); start a fresh pool for the next render
+                self._reset_render_pool(pool)
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail="PDF renderer is restarting, please retry"
+                )
+            except asyncio.TimeoutError:
+                # shutdown() doesn't stop a stuck worker, so kill the pool's
+                # processes; other renders on it fail with a 503
+                self._reset_render_pool(pool, terminate=True)
+                raise HTTPException(
+                    status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+                    detail="PDF rendering timed out"
+                )
+
+    def shutdown(self) -> None:
+        """Stop the render worker processes"""
+        self._reset_render_pool(wait=True)
+
+    def _get_render_pool(self) -> ProcessPoolExecutor:
+        if self._render_pool is None:
+            # Spawned workers do not inherit the event loop, DB pool or sockets
+            self._render_pool = ProcessPoolExecutor(
+                max_workers=settings.PDF_RENDER_WORKERS,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._render_pool
+
+    def _reset_render_pool(
+        self,
+        pool: Optional[ProcessPoolExecutor] = None,
+        wait: bool = False,
+        terminate: bool = False
+    ) -> None:
+        pool = pool or self._render_pool
+        if pool is None:
+            return
+        # Renders that failed on an old pool must not reset its replacement
+        if self._render_pool is pool:
+            self._render_pool = None
+        processes = list((pool._processes or {}).values()) if terminate else []
+        pool.shutdown(wait=wait, cancel_futures=True)
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+
+    def _form_query(self):
+        # Form with all related data
+        return select(Form).options(
+            selectinload(Form.creator),
+            selectinload(Form.approver),
+            selectinload(Form.rejector),
+            selectinload(Form.project)
+        )
+
+    async def _get_form(self, db: AsyncSession, form_id: UUID) -> Form:
+        result = await db.execute(self._form_query().where(Form.id == form_id))
         form = result.scalar_one_or_none()
         
         if not form:
@@ -63,321 +332,150 @@ class PDFExportService:
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Form not found"
             )
-        
-        # Generate HTML content
-        html_content = self._generate_form_html(form, watermark)
-        
-        # Add audit trail if requested
-        if include_audit_trail:
-            audit_logs = await get_audit_trail(
-                db=db,
-                resource_type="form",
-                resource_id=form_id,
-                limit=1000
-            )
-            audit_html = self._generate_audit_html(audit_logs)
-            html_content += audit_html
-        
-        # Convert HTML to PDF (basic implementation)
-        pdf_bytes = self._html_to_pdf(html_content)
-        
-        return pdf_bytes
-    
-    def _generate_form_html(self, form: Form, watermark: Optional[str] = None) -> str:
-        """
-        Generate HTML content for a form
-        """
-        status_color = {
-            "draft": "#6b7280",
-            "submitted": "#3b82f6", 
-            "approved": "#10b981",
-            "rejected": "#ef4444",
-            "locked": "#6366f1"
-        }.get(form.status, "#6b7280")
-        
-        watermark_html = ""
-        if watermark:
-            watermark_html = f"""
-            <div style="position: fixed; top: 50%; left: 50%; transform: translate(-50%, -50%) rotate(-45deg); 
-                        font-size: 72px; color: rgba(0,0,0,0.1); z-index: -1; font-weight: bold;">
-                {watermark}
-            </div>
-            """
-        
-        html = f"""
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <meta charset="UTF-8">
-            <title>Form: {form.title}</title>
-            <style>
-                body {{
-                    font-family: {self.default_styles['font_family']};
-                    font-size: {self.default_styles['font_size']};
-                    line-height: {self.default_styles['line_height']};
-                    margin: {self.default_styles['margin']};
-                    color: #374151;
-                }}
-                .header {{
-                    color: {self.default_styles['header_color']};
-                    border-bottom: 2px solid {self.default_styles['border_color']};
-                    padding-bottom: 15px;
-                    margin-bottom: 30px;
-                }}
-                .form-meta {{
-                    background-color: #f9fafb;
-                    padding: 20px;
-                    border-radius: 8px;
-                    margin-bottom: 30px;
-                    border: 1px solid {self.default_styles['border_color']};
-                }}
-                .status {{
-                    display: inline-block;
-                    padding: 4px 12px;
-                    border-radius: 20px;
-                    color: white;
-                    background-color: {status_color};
-                    font-weight: bold;
-                    text-transform: uppercase;
-                    font-size: 11px;
-                }}
-                .form-data {{
-                    margin-top: 30px;
-                }}
-                .field {{
-                    margin-bottom: 15px;
-                    padding: 10px 0;
-                    border-bottom: 1px solid #f3f4f6;
-                }}
-                .field-label {{
-                    font-weight: bold;
-                    color: #374151;
-                    margin-bottom: 5px;
-                }}
-                .field-value {{
-                    color: #6b7280;
-                    margin-left: 20px;
-                }}
-                .page-break {{
-                    page-break-before: always;
-                }}
-                @media print {{
-                    body {{ margin: 0; }}
-                    .no-print {{ display: none; }}
-                }}
-            </style>
-        </head>
-        <body>
-            {watermark_html}
-            
-            <div class="header">
-                <h1>Electronic Data Capture Form</h1>
-                <h2>{form.title}</h2>
-            </div>
-            
-            <div class="form-meta">
-                <div style="display: grid; grid-template-columns: 1fr 1fr; gap: 20px;">
-                    <div>
-                        <strong>Form ID:</strong> {form.id}<br>
-                        <strong>Form Type:</strong> {form.form_type}<br>
-                        <strong>Version:</strong> {form.version}<br>
-                        <strong>Status:</strong> <span class="status">{form.status}</span><br>
-                        <strong>Created:</strong> {form.created_at.strftime('%Y-%m-%d %H:%M:%S') if form.created_at else 'N/A'}<br>
-                        <strong>Created By:</strong> {form.creator.full_name if form.creator else 'N/A'}
-                    </div>
-                    <div>
-                        <strong>Case ID:</strong> {form.case_id or 'N/A'}<br>
-                        <strong>Volunteer ID:</strong> {form.volunteer_id or 'N/A'}<br>
-                        <strong>Study Number:</strong> {form.study_number or 'N/A'}<br>
-                        <strong>Period Number:</strong> {form.period_number or 'N/A'}<br>
-                        <strong>Project:</strong> {form.project.name if form.project else 'N/A'}<br>
-                        <strong>Submitted:</strong> {form.submitted_at.strftime('%Y-%m-%d %H:%M:%S') if form.submitted_at else 'Not submitted'}
-                    </div>
-                </div>
-                
-                {self._generate_approval_info(form)}
-            </div>
-            
-            <div class="form-data">
-                <h3>Form Data</h3>
-                {self._format_form_data(form.form_data)}
-            </div>
-            
-            {self._generate_comments_section(form)}
-            
-            <div style="margin-top: 50px; padding-top: 20px; border-top: 1px solid {self.default_styles['border_color']}; 
-                        font-size: 10px; color: #9ca3af; text-align: center;">
-                Generated on: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')} UTC<br>
-                EDC - Electronic Data Capture System
-            </div>
-        </body>
-        </html>
-        """
-        
-        return html
-    
-    def _generate_approval_info(self, form: Form) -> str:
-        """Generate approval/rejection information"""
-        if form.status == "approved" and form.approved_at:
-            return f"""
-            <div style="margin-top: 15px; padding: 10px; background-color: #dcfce7; border-radius: 4px; border-left: 4px solid #10b981;">
-                <strong>Approved:</strong> {form.approved_at.strftime('%Y-%m-%d %H:%M:%S')}<br>
-                <strong>Approved By:</strong> {form.approver.full_name if form.approver else 'N/A'}
-            </div>
-            """
-        elif form.status == "rejected" and form.rejected_at:
-            return f"""
-            <div style="margin-top: 15px; padding: 10px; background-color: #fef2f2; border-radius: 4px; border-left: 4px solid #ef4444;">
-                <strong>Rejected:</strong> {form.rejected_at.strftime('%Y-%m-%d %H:%M:%S')}<br>
-                <strong>Rejected By:</strong> {form.rejector.full_name if form.rejector else 'N/A'}<br>
-                {f'<strong>Reason:</strong> {form.rejection_reason}' if form.rejection_reason else ''}
-            </div>
-            """
-        return ""
-    
-    def _generate_comments_section(self, form: Form) -> str:
-        """Generate comments section"""
-        if form.review_comments:
-            return f"""
-            <div style="margin-top: 30px;">
-                <h3>Review Comments</h3>
-                <div style="background-color: #f9fafb; padding: 15px; border-radius: 4px; border-left: 4px solid #3b82f6;">
-                    {form.review_comments}
-                </div>
-            </div>
-            """
-        return ""
-    
-    def _format_form_data(self, form_data: Dict[str, Any]) -> str:
-        """Format form data as HTML"""
-        if not form_data:
-            return "<p>No form data available.</p>"
-        
-        html = ""
-        for key, value in form_data.items():
-            formatted_key = key.replace('_', ' ').title()
-            
-            if isinstance(value, dict):
-                formatted_value = self._format_nested_data(value)
-            elif isinstance(value, list):
-                formatted_value = self._format_list_data(value)
-            else:
-                formatted_value = str(value) if value is not None else "N/A"
-            
-            html += f"""
-            <div class="field">
-                <div class="field-label">{formatted_key}</div>
-                <div class="field-value">{formatted_value}</div>
-            </div>
-            """
-        
-        return html
-    
-    def _format_nested_data(self, data: Dict[str, Any], indent: int = 0) -> str:
-        """Format nested dictionary data"""
-        html = "<div style='margin-left: 20px;'>"
-        for key, value in data.items():
-            formatted_key = key.replace('_', ' ').title()
-            if isinstance(value, dict):
-                html += f"<strong>{formatted_key}:</strong><br>{self._format_nested_data(value, indent + 1)}"
-            elif isinstance(value, list):
-                html += f"<strong>{formatted_key}:</strong> {self._format_list_data(value)}<br>"
-            else:
-                html += f"<strong>{formatted_key}:</strong> {value if value is not None else 'N/A'}<br>"
-        html += "</div>"
-        return html
-    
-    def _format_list_data(self, data: list) -> str:
-        """Format list data"""
-        if not data:
-            return "None"
-        
-        if all(isinstance(item, (str, int, float, bool)) for item in data):
-            return ", ".join(str(item) for item in data)
-        else:
-            html = "<ul style='margin: 5px 0; padding-left: 20px;'>"
-            for item in data:
-                if isinstance(item, dict):
-                    html += f"<li>{self._format_nested_data(item)}</li>"
-                else:
-                    html += f"<li>{item}</li>"
-            html += "</ul>"
-            return html
-    
-    def _generate_audit_html(self, audit_logs: list) -> str:
-        """Generate HTML for audit trail"""
-        if not audit_logs:
-            return ""
-        
-        html = """
-        <div class="page-break">
-            <div class="header">
-                <h2>Audit Trail</h2>
-            </div>
-            <table style="width: 100%; border-collapse: collapse; margin-top: 20px;">
-                <thead>
-                    <tr style="background-color: #f9fafb;">
-                        <th style="border: 1px solid #e5e7eb; padding: 10px; text-align: left;">Timestamp</th>
-                        <th style="border: 1px solid #e5e7eb; padding: 10px; text-align: left;">User</th>
-                        <th style="border: 1px solid #e5e7eb; padding: 10px; text-align: left;">Action</th>
-                        <th style="border: 1px solid #e5e7eb; padding: 10px; text-align: left;">Changes</th>
-                    </tr>
-                </thead>
-                <tbody>
+
+        return form
+
+    def _audit_trail_query(self, form_id: UUID):
+        return select(AuditLog).where(
+            AuditLog.resource_type == "form",
+            AuditLog.resource_id == form_id
+        )
+
+    async def _get_recent_audit_logs(self, db: AsyncSession, form_id: UUID) -> List[AuditLog]:
+        result = await db.execute(
+            self._audit_trail_query(form_id)
+            .options(selectinload(AuditLog.user))
+            .order_by(desc(AuditLog.created_at))
+            .limit(PREVIEW_AUDIT_LIMIT)
+        )
+        return result.scalars().all()
+
+    async def _spool_audit_trail(self, db: AsyncSession, form_id: UUID) -> str:
         """
-        
-        for log in audit_logs:
-            user_name = log.user.full_name if log.user else "System"
-            timestamp = log.created_at.strftime('%Y-%m-%d %H:%M:%S') if log.created_at else "N/A"
-            
-            changes_html = ""
-            if log.field_changes:
-                changes_html = "<ul style='margin: 0; padding-left: 15px; font-size: 11px;'>"
-                for field, change in log.field_changes.items():
-                    changes_html += f"<li><strong>{field}:</strong> {change.get('old', 'N/A')} → {change.get('new', 'N/A')}</li>"
-                changes_html += "</ul>"
-            elif log.reason:
-                changes_html = f"<em>{log.reason}</em>"
-            
-            html += f"""
-                <tr>
-                    <td style="border: 1px solid #e5e7eb; padding: 8px; font-size: 11px;">{timestamp}</td>
-                    <td style="border: 1px solid #e5e7eb; padding: 8px; font-size: 11px;">{user_name}</td>
-                    <td style="border: 1px solid #e5e7eb; padding: 8px; font-size: 11px;">{log.action}</td>
-                    <td style="border: 1px solid #e5e7eb; padding: 8px; font-size: 11px;">{changes_html}</td>
-                </tr>
-            """
-        
-        html += """
-                </tbody>
-            </table>
-        </div>
+        Write a form's complete audit trail to a temporary JSON-lines file.
+        Rows come through a server-side cursor as plain tuples (nothing enters
+        the identity map), a small batch at a time, so memory stays flat
+        however long the trail is; the render worker then reads the file back
+        one table at a time. Formatting and writing each batch runs in a
+        thread.
         """
-        
-        return html
-    
-    def _html_to_pdf(self, html_content: str) -> bytes:
+        query = (
+            self._audit_trail_query(form_id)
+            .with_only_columns(
+                AuditLog.created_at,
+                AuditLog.action,
+                AuditLog.field_changes,
+                AuditLog.reason,
+                User.first_name,
+                User.last_name,
+                User.email
+            )
+            .outerjoin(User, User.id == AuditLog.user_id)
+            .order_by(desc(AuditLog.created_at), desc(AuditLog.id))
+            .execution_options(yield_per=AUDIT_FETCH_SIZE)
+        )
+
+        fd, path = tempfile.mkstemp(prefix="edc-audit-", suffix=".jsonl")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as spool:
+                result = await db.stream(query)
+                async for rows in result.partitions():
+                    await asyncio.to_thread(self._write_audit_rows, spool, rows)
+        except BaseException:
+            os.unlink(path)
+            raise
+
+        return path
+
+    def _write_audit_rows(self, spool: TextIO, rows: List[Any]) -> None:
+        spool.writelines(json.dumps(self._audit_row(*row)) + "\n" for row in rows)
+
+    def _read_cached(self, file: BinaryIO) -> bytes:
+        with file:
+            return file.read()
+
+    def _remove_spool(self, path: Optional[str]) -> None:
+        if path and os.path.exists(path):
+            os.unlink(path)
+
+    def _build_document(
+        self,
+        form: Form,
+        watermark: Optional[str] = None,
+        audit_trail_path: Optional[str] = None
+    ) -> Dict[str, Any]:
         """
-        Convert HTML to PDF
-        Note: This is a basic implementation that returns the HTML as base64-encoded bytes
-        In production, you would use a proper PDF library like:
-        
-        # Using pdfkit (requires wkhtmltopdf)
-        # import pdfkit
-        # return pdfkit.from_string(html_content, False)
-        
-        # Using weasyprint
-        # import weasyprint
-        # pdf = weasyprint.HTML(string=html_content).write_pdf()
-        # return pdf
-        
-        # Using reportlab for programmatic generation
-        # (more complex but gives full control)
+        Flatten a form and its audit trail into the plain dict the renderer takes
         """
-        
-        # For now, return HTML content as bytes (for demonstration)
-        # In production, replace this with actual PDF generation
-        return html_content.encode('utf-8')
+        def fmt(value: Optional[datetime]) -> Optional[str]:
+            return value.strftime(DATETIME_FORMAT) if value else None
+
+        return {
+            "form": {
+                "id": str(form.id),
+                "title": form.title,
+                "form_type": form.form_type,
+                "version": form.version,
+                "status": form.status,
+                "created_at": fmt(form.created_at),
+                "created_by": form.creator.full_name if form.creator else None,
+                "case_id": form.case_id,
+                "volunteer_id": form.volunteer_id,
+                "study_number": form.study_number,
+                "period_number": form.period_number,
+                "project": form.project.name if form.project else None,
+                "submitted_at": fmt(form.submitted_at),
+                "approved_at": fmt(form.approved_at),
+                "approved_by": form.approver.full_name if form.approver else None,
+                "rejected_at": fmt(form.rejected_at),
+                "rejected_by": form.rejector.full_name if form.rejector else None,
+                "rejection_reason": form.rejection_reason,
+                "review_comments": form.review_comments,
+            },
+            "form_data": form.form_data or {},
+            "audit_trail_path": audit_trail_path,
+            "watermark": watermark,
+            "generated_at": datetime.now(timezone.utc).strftime(DATETIME_FORMAT),
+        }
+
+    def _iter_form_html(
+        self,
+        form: Form,
+        audit_logs: List[AuditLog],
+        watermark: Optional[str] = None
+    ) -> Iterator[str]:
+        # Everything is loaded up front, so the template never touches the session
+        return iter_chunks(form_template.generate(
+            form=form,
+            audit_logs=audit_logs,
+            watermark=watermark,
+            generated_at=datetime.now(timezone.utc).strftime(DATETIME_FORMAT)
+        ))
+
+    def _audit_row(
+        self,
+        created_at: Optional[datetime],
+        action: str,
+        field_changes: Optional[Dict[str, Any]],
+        reason: Optional[str],
+        first_name: Optional[str],
+        last_name: Optional[str],
+        email: Optional[str]
+    ) -> Dict[str, Any]:
+        changes = [
+            f"{field}: {change.get('old', 'N/A')} → {change.get('new', 'N/A')}"
+            if isinstance(change, dict) else f"{field}: {change}"
+            for field, change in (field_changes or {}).items()
+        ]
+        # Same rule as User.full_name
+        user = f"{first_name} {last_name}" if first_name and last_name else email
+        return {
+            "timestamp": created_at.strftime(DATETIME_FORMAT) if created_at else None,
+            "user": user,
+            "action": action,
+            "changes": changes,
+            "reason": reason,
+        }
 
 # Export service instance
 pdf_export_service = PDFExportService()
\ No newline at end of file
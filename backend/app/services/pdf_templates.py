@@ -0,0 +1,333 @@
+from functools import lru_cache
+from html import escape as html_escape
+from typing import Any, Iterator, List
+
+from jinja2 import DictLoader, Environment
+from markupsafe import Markup
+
+# HTML layout for form previews. The environment and templates are compiled
+# once at import; rendering goes through Template.generate() so callers get
+# chunks instead of one large string.
+
+DEFAULT_STYLES = {
+    "font_family": "Arial, sans-serif",
+    "font_size": "12px",
+    "line_height": "1.4",
+    "margin": "20px",
+    "header_color": "#2563eb",
+    "border_color": "#e5e7eb"
+}
+
+# HTML fragments of a form value handed to the template at a time
+VALUE_CHUNK_SIZE = 1024
+
+STATUS_COLORS = {
+    "draft": "#6b7280",
+    "submitted": "#3b82f6",
+    "approved": "#10b981",
+    "rejected": "#ef4444",
+    "locked": "#6366f1"
+}
+
+
+def _build_stylesheet(styles: dict) -> str:
+    status_rules = "\n".join(
+        f"        .status-{name} {{ background-color: {color}; }}"
+        for name, color in STATUS_COLORS.items()
+    )
+    return f"""
+        body {{
+            font-family: {styles['font_family']};
+            font-size: {styles['font_size']};
+            line-height: {styles['line_height']};
+            margin: {styles['margin']};
+            color: #374151;
+        }}
+        .header {{
+            color: {styles['header_color']};
+            border-bottom: 2px solid {styles['border_color']};
+            padding-bottom: 15px;
+            margin-bottom: 30px;
+        }}
+        .form-meta {{
+            background-color: #f9fafb;
+            padding: 20px;
+            border-radius: 8px;
+            margin-bottom: 30px;
+            border: 1px solid {styles['border_color']};
+        }}
+        .status {{
+            display: inline-block;
+            padding: 4px 12px;
+            border-radius: 20px;
+            color: white;
+            background-color: {STATUS_COLORS['draft']};
+            font-weight: bold;
+            text-transform: uppercase;
+            font-size: 11px;
+        }}
+{status_rules}
+        .form-data {{
+            margin-top: 30px;
+        }}
+        .field {{
+            margin-bottom: 15px;
+            padding: 10px 0;
+            border-bottom: 1px solid #f3f4f6;
+        }}
+        .field-label {{
+            font-weight: bold;
+            color: #374151;
+            margin-bottom: 5px;
+        }}
+        .field-value {{
+            color: #6b7280;
+            margin-left: 20px;
+        }}
+        .nested {{
+            margin-left: 20px;
+        }}
+        .page-break {{
+            page-break-before: always;
+        }}
+        .footer {{
+            margin-top: 50px;
+            padding-top: 20px;
+            border-top: 1px solid {styles['border_color']};
+            font-size: 10px;
+            color: #9ca3af;
+            text-align: center;
+        }}
+        .audit-table {{
+            width: 100%;
+            border-collapse: collapse;
+            margin-top: 20px;
+        }}
+        .audit-table th, .audit-table td {{
+            border: 1px solid {styles['border_color']};
+            text-align: left;
+            vertical-align: top;
+        }}
+        .audit-table th {{
+            background-color: #f9fafb;
+            padding: 10px;
+        }}
+        .audit-table td {{
+            padding: 8px;
+            font-size: 11px;
+        }}
+        @media print {{
+            body {{ margin: 0; }}
+            .no-print {{ display: none; }}
+        }}
+    """
+
+
+FORM_TEMPLATE = """\
+<!DOCTYPE html>
+<html>
+<head>
+    <meta charset="UTF-8">
+    <title>Form: {{ form.title }}</title>
+    <style>{{ stylesheet | safe }}</style>
+</head>
+<body>
+{%- if watermark %}
+    <div style="position: fixed; top: 50%; left: 50%; transform: translate(-50%, -50%) rotate(-45deg);
+                font-size: 72px; color: rgba(0,0,0,0.1); z-index: -1; font-weight: bold;">{{ watermark }}</div>
+{%- endif %}
+    <div class="header">
+        <h1>Electronic Data Capture Form</h1>
+        <h2>{{ form.title }}</h2>
+    </div>
+    <div class="form-meta">
+        <div style="display: grid; grid-template-columns: 1fr 1fr; gap: 20px;">
+            <div>
+                <strong>Form ID:</strong> {{ form.id }}<br>
+                <strong>Form Type:</strong> {{ form.form_type }}<br>
+                <strong>Version:</strong> {{ form.version }}<br>
+                <strong>Status:</strong> <span class="status status-{{ form.status }}">{{ form.status }}</span><br>
+                <strong>Created:</strong> {{ form.created_at | datetime }}<br>
+                <strong>Created By:</strong> {{ form.creator.full_name if form.creator else "N/A" }}
+            </div>
+            <div>
+                <strong>Case ID:</strong> {{ form.case_id or "N/A" }}<br>
+                <strong>Volunteer ID:</strong> {{ form.volunteer_id or "N/A" }}<br>
+                <strong>Study Number:</strong> {{ form.study_number or "N/A" }}<br>
+                <strong>Period Number:</strong> {{ form.period_number or "N/A" }}<br>
+                <strong>Project:</strong> {{ form.project.name if form.project else "N/A" }}<br>
+                <strong>Submitted:</strong> {{ form.submitted_at | datetime("Not submitted") }}
+            </div>
+        </div>
+{%- if form.status == "approved" and form.approved_at %}
+        <div style="margin-top: 15px; padding: 10px; background-color: #dcfce7; border-radius: 4px; border-left: 4px solid #10b981;">
+            <strong>Approved:</strong> {{ form.approved_at | datetime }}<br>
+            <strong>Approved By:</strong> {{ form.approver.full_name if form.approver else "N/A" }}
+        </div>
+{%- elif form.status == "rejected" and form.rejected_at %}
+        <div style="margin-top: 15px; padding: 10px; background-color: #fef2f2; border-radius: 4px; border-left: 4px solid #ef4444;">
+            <strong>Rejected:</strong> {{ form.rejected_at | datetime }}<br>
+            <strong>Rejected By:</strong> {{ form.rejector.full_name if form.rejector else "N/A" }}<br>
+            {% if form.rejection_reason %}<strong>Reason:</strong> {{ form.rejection_reason }}{% endif %}
+        </div>
+{%- endif %}
+    </div>
+    <div class="form-data">
+        <h3>Form Data</h3>
+{%- for key, value in (form.form_data or {}).items() %}
+        <div class="field">
+            <div class="field-label">{{ key | label }}</div>
+            <div class="field-value">{% for chunk in value | format_value %}{{ chunk }}{% endfor %}</div>
+        </div>
+{%- else %}
+        <p>No form data available.</p>
+{%- endfor %}
+    </div>
+{%- if form.review_comments %}
+    <div style="margin-top: 30px;">
+        <h3>Review Comments</h3>
+        <div style="background-color: #f9fafb; padding: 15px; border-radius: 4px; border-left: 4px solid #3b82f6;">
+            {{ form.review_comments }}
+        </div>
+    </div>
+{%- endif %}
+    <div class="footer">
+        Generated on: {{ generated_at }} UTC<br>
+        EDC - Electronic Data Capture System
+    </div>
+{%- if audit_logs %}
+    <div class="page-break">
+        <div class="header">
+            <h2>Audit Trail</h2>
+        </div>
+        <table class="audit-table">
+            <thead>
+                <tr><th>Timestamp</th><th>User</th><th>Action</th><th>Changes</th></tr>
+            </thead>
+            <tbody>
+{%- for log in audit_logs %}
+                <tr>
+                    <td>{{ log.created_at | datetime }}</td>
+                    <td>{{ log.user.full_name if log.user else "System" }}</td>
+                    <td>{{ log.action }}</td>
+                    <td>
+{%- if log.field_changes -%}
+                        <ul style="margin: 0; padding-left: 15px; font-size: 11px;">
+{%- for field, change in log.field_changes.items() -%}
+<li><strong>{{ field }}:</strong> {% if change is mapping %}{{ change.get("old", "N/A") }} → {{ change.get("new", "N/A") }}{% else %}{{ change }}{% endif %}</li>
+{%- endfor -%}
+</ul>
+{%- elif log.reason -%}
+<em>{{ log.reason }}</em>
+{%- endif -%}
+                    </td>
+                </tr>
+{%- endfor %}
+            </tbody>
+        </table>
+    </div>
+{%- endif %}
+</body>
+</html>
+"""
+
+
+def _format_datetime(value, default: str = "N/A") -> str:
+    return value.strftime('%Y-%m-%d %H:%M:%S') if value else default
+
+
+def _format_label(key) -> str:
+    return str(key).replace('_', ' ').title()
+
+
+def _iter_value(value) -> Iterator[str]:
+    """
+    Escaped HTML for a form value, in chunks of about VALUE_CHUNK_SIZE
+    fragments. Nested data is walked with an explicit stack of pending work,
+    not recursion in Jinja or chained generators: an entry is either HTML to
+    emit (str) or a value still to render (wrapped in a 1-tuple).
+    """
+    out: List[str] = []
+    stack: List[Any] = [(value,)]
+    while stack:
+        item = stack.pop()
+        if item.__class__ is str:
+            out.append(item)
+            continue
+        value = item[0]
+        if isinstance(value, dict):
+            out.append('<div class="nested">')
+            pending: List[Any] = []
+            for key, item in value.items():
+                pending.append(_strong_label(key))
+                if isinstance(item, dict):
+                    pending += ("<br>", (item,))
+                elif isinstance(item, list) or item is None:
+                    pending += (" ", (item,), "<br>")
+                else:
+                    # Leaves are the bulk of a large form; render them in place
+                    pending.append(f" {html_escape(str(item))}<br>")
+            pending.append("</div>")
+            stack.extend(reversed(pending))
+        elif isinstance(value, list):
+            if not value:
+                out.append("None")
+            elif all(isinstance(item, (str, int, float, bool)) for item in value):
+                out.append(html_escape(", ".join(map(str, value))))
+            else:
+                out.append('<ul style="margin: 5px 0; padding-left: 20px;">')
+                pending = []
+                for item in value:
+                    pending += ("<li>", (item,), "</li>")
+                pending.append("</ul>")
+                stack.extend(reversed(pending))
+        elif value is None:
+            out.append("N/A")
+        else:
+            out.append(html_escape(str(value)))
+        if len(out) >= VALUE_CHUNK_SIZE:
+            yield "".join(out)
+            out.clear()
+    if out:
+        yield "".join(out)
+
+
+@lru_cache(maxsize=4096)
+def _strong_label(key: str) -> str:
+    # Field names repeat across rows and sections, so format each one once
+    return f"<strong>{html_escape(_format_label(key))}:</strong>"
+
+
+def _format_value(value) -> Iterator[Markup]:
+    """
+    A form value as escaped HTML in chunks the template iterates, so a huge
+    value (a long table, say) is never held as one string
+    """
+    for chunk in _iter_value(value):
+        yield Markup(chunk)
+
+
+def iter_chunks(fragments: Iterator[str], size: int = 16 * 1024) -> Iterator[str]:
+    """Coalesce template output into chunks of roughly `size` characters"""
+    buffer, length = [], 0
+    for fragment in fragments:
+        buffer.append(fragment)
+        length += len(fragment)
+        if length >= size:
+            yield "".join(buffer)
+            buffer, length = [], 0
+    if buffer:
+        yield "".join(buffer)
+
+
+environment = Environment(
+    loader=DictLoader({"form.html": FORM_TEMPLATE}),
+    autoescape=True,
+    auto_reload=False,
+)
+environment.filters["datetime"] = _format_datetime
+environment.filters["label"] = _format_label
+environment.filters["format_value"] = _format_value
+environment.globals["stylesheet"] = _build_stylesheet(DEFAULT_STYLES)
+
+form_template = environment.get_template("form.html")
@@ -0,0 +1,124 @@
+import asyncio
+import time
+from collections import OrderedDict
+from itertools import chain
+from typing import Any, Dict, Iterable, Optional, Set, Tuple
+from uuid import UUID
+
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.base import AsyncSessionLocal
+from app.models.unified_models import User
+
+USER_COLUMNS = (User.id, User.email, User.first_name, User.last_name, User.role, User.status)
+
+
+class UserCache:
+    """
+    Short-lived per-process cache of user rows for the auth dependency.
+
+    Misses that arrive in the same event loop tick are resolved with one
+    batched query. ORM writes to users invalidate their entries on commit
+    (see the session hooks below); bulk UPDATE statements must call
+    invalidate() themselves. Other workers pick changes up within the TTL.
+    """
+
+    def __init__(self, ttl_seconds: float, max_size: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[UUID, Tuple[float, Optional[Dict[str, Any]]]]" = OrderedDict()
+        self._pending: Dict[UUID, asyncio.Future] = {}
+        # The event loop only keeps weak references to tasks; hold the
+        # loaders until they finish. A new one can start while another is
+        # still querying, hence a set.
+        self._loaders: Set[asyncio.Task] = set()
+        self._version = 0
+
+    async def get(self, user_id: UUID) -> Optional[Dict[str, Any]]:
+        """Return the user's row, or None if there is no such user"""
+        entry = self._entries.get(user_id)
+        if entry is not None and entry[0] > time.monotonic():
+            self.hits += 1
+            return entry[1]
+
+        self.misses += 1
+        future = self._pending.get(user_id)
+        if future is None:
+            if not self._pending:
+                # The loader starts on the next loop iteration, so misses from
+                # requests already scheduled in this one join the same query
+                loader = asyncio.create_task(self._load_pending())
+                self._loaders.add(loader)
+                loader.add_done_callback(self._loaders.discard)
+            future = asyncio.get_running_loop().create_future()
+            self._pending[user_id] = future
+        # Shielded so one cancelled request does not fail the others waiting
+        return await asyncio.shield(future)
+
+    def invalidate(self, user_ids: Iterable[UUID]) -> None:
+        for user_id in user_ids:
+            self._entries.pop(user_id, None)
+        # Loads already in flight may have read the old row; don't store them
+        self._version += 1
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._version += 1
+
+    def stats(self) -> Dict[str, int]:
+        return {"size": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+    async def _load_pending(self) -> None:
+        pending, self._pending = self._pending, {}
+        version = self._version
+
+        try:
+            async with AsyncSessionLocal() as db:
+                result = await db.execute(
+                    select(*USER_COLUMNS).where(User.id.in_(list(pending)))
+                )
+                rows = {row.id: dict(row._mapping) for row in result}
+        except Exception as exc:
+            for future in pending.values():
+                if not future.done():
+                    future.set_exception(exc)
+            return
+
+        expires = time.monotonic() + self.ttl_seconds
+        for user_id, future in pending.items():
+            row = rows.get(user_id)
+            if version == self._version:
+                self._entries[user_id] = (expires, row)
+                self._entries.move_to_end(user_id)
+            if not future.done():
+                future.set_result(row)
+
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+
+user_cache = UserCache(settings.USER_CACHE_TTL_SECONDS, settings.USER_CACHE_SIZE)
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_changed_users(session: Session, flush_context: Any) -> None:
+    changed = session.info.setdefault("changed_user_ids", set())
+    for obj in chain(session.new, session.dirty, session.deleted):
+        if isinstance(obj, User) and obj.id is not None:
+            changed.add(obj.id)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_changed_users(session: Session) -> None:
+    changed = session.info.pop("changed_user_ids", None)
+    if changed:
+        user_cache.invalidate(changed)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_changed_users(session: Session) -> None:
+    session.info.pop("changed_user_ids", None)
@@ -0,0 +1,64 @@
+import asyncio
+import zipfile
+from typing import AsyncIterator, BinaryIO, Iterator, Tuple
+
+FILE_CHUNK_SIZE = 64 * 1024
+
+
+class _ChunkBuffer:
+    """Write-only file object that hands out what was written since the last drain"""
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data: bytes) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+async def iter_zip(
+    entries: AsyncIterator[Tuple[str, bytes]],
+    compression: int = zipfile.ZIP_STORED
+) -> AsyncIterator[bytes]:
+    """
+    Stream a ZIP archive, emitting each member as soon as it is added.
+    The buffer has no seek(), so zipfile writes data descriptors and never
+    needs the whole archive in memory.
+
+    Members are stored by default: PDFs are already compressed, so deflating
+    them costs CPU for next to no size. Any other compression runs in a
+    thread to keep the event loop free.
+    """
+    buffer = _ChunkBuffer()
+    with zipfile.ZipFile(buffer, mode="w", compression=compression) as archive:
+        async for name, data in entries:
+            if compression == zipfile.ZIP_STORED:
+                archive.writestr(name, data)
+            else:
+                await asyncio.to_thread(archive.writestr, name, data)
+            yield buffer.drain()
+    # Central directory is written on close
+    yield buffer.drain()
+
+
+def iter_file(file: BinaryIO, chunk_size: int = FILE_CHUNK_SIZE) -> Iterator[bytes]:
+    """
+    Stream an already open file and close it at the end. A synchronous
+    iterator, so StreamingResponse reads each chunk in a thread.
+    """
+    try:
+        while True:
+            chunk = file.read(chunk_size)
+            if not chunk:
+                break
+            yield chunk
+    finally:
+        file.close()
@@ -0,0 +1,134 @@
+"""
+Requests per second through the old @app.middleware("http") stack and
+through APIMiddleware.
+
+    python -m benchmarks.middleware_throughput
+
+Requests are driven straight into the ASGI app in one process, with no
+server or client in the way, for a small JSON response and a 1 MB streamed
+one. Both stacks use the same in-memory rate limiter (with a limit that is
+never reached), so the difference is the middleware itself.
+"""
+import asyncio
+import time
+
+from fastapi import FastAPI, Request, status
+from fastapi.responses import JSONResponse, StreamingResponse
+from starlette.middleware.sessions import SessionMiddleware
+
+from app.core.middleware import APIMiddleware
+from app.core.rate_limit import MemoryBackend, RateLimiter, client_key
+
+JSON_REQUESTS = 5000
+STREAM_REQUESTS = 1000
+WARMUP_REQUESTS = 200
+
+
+def _limiter() -> RateLimiter:
+    return RateLimiter(MemoryBackend(100000), "1000000000/60", {})
+
+
+def _add_routes(app: FastAPI) -> FastAPI:
+    @app.get("/api/v1/ping")
+    async def ping():
+        return {"ok": True}
+
+    @app.get("/api/v1/stream")
+    async def stream():
+        async def body():
+            chunk = b"x" * 16384
+            for _ in range(64):
+                yield chunk
+        return StreamingResponse(body(), media_type="application/octet-stream")
+
+    return app
+
+
+def middleware_functions_app() -> FastAPI:
+    """The stack APIMiddleware replaced: two BaseHTTPMiddleware functions plus sessions"""
+    app = FastAPI()
+    rate_limiter = _limiter()
+
+    @app.middleware("http")
+    async def add_security_headers(request: Request, call_next):
+        start_time = time.time()
+        response = await call_next(request)
+        response.headers["X-Content-Type-Options"] = "nosniff"
+        response.headers["X-Frame-Options"] = "DENY"
+        response.headers["X-XSS-Protection"] = "1; mode=block"
+        response.headers["Strict-Transport-Security"] = "max-age=31536000; includeSubDomains"
+        response.headers["Referrer-Policy"] = "strict-origin-when-cross-origin"
+        response.headers["Content-Security-Policy"] = "default-src 'self'"
+        response.headers["X-Process-Time"] = str(time.time() - start_time)
+        return response
+
+    @app.middleware("http")
+    async def rate_limit_middleware(request: Request, call_next):
+        client = client_key(request.headers.get("authorization"), request.client.host if request.client else None)
+        _, retry_after = await rate_limiter.hit(request.url.path, client)
+        if retry_after:
+            return JSONResponse(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                content={"detail": "Rate limit exceeded"}
+            )
+        return await call_next(request)
+
+    app.add_middleware(SessionMiddleware, secret_key="s" * 32, max_age=3600, same_site="strict")
+    return _add_routes(app)
+
+
+def api_middleware_app() -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(APIMiddleware, rate_limiter=_limiter())
+    return _add_routes(app)
+
+
+def bare_app() -> FastAPI:
+    return _add_routes(FastAPI())
+
+
+async def _requests_per_second(app: FastAPI, path: str, count: int) -> float:
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": path, "raw_path": path.encode(), "query_string": b"",
+        "root_path": "", "headers": [(b"host", b"test"), (b"authorization", b"Bearer unverified")],
+        "client": ("10.0.0.1", 1234), "server": ("test", 80),
+    }
+
+    def receiver():
+        sent = False
+
+        async def receive():
+            nonlocal sent
+            if not sent:
+                sent = True
+                return {"type": "http.request", "body": b"", "more_body": False}
+            await asyncio.Event().wait()  # The client never disconnects
+        return receive
+
+    async def send(message):
+        pass
+
+    for _ in range(WARMUP_REQUESTS):
+        await app(dict(scope), receiver(), send)
+    started = time.perf_counter()
+    for _ in range(count):
+        await app(dict(scope), receiver(), send)
+    return count / (time.perf_counter() - started)
+
+
+async def main() -> None:
+    stacks = [
+        ("before (middleware functions)", middleware_functions_app),
+        ("after (APIMiddleware)", api_middleware_app),
+        ("no middleware", bare_app),
+    ]
+    for name, make_app in stacks:
+        app = make_app()
+        json_rps = await _requests_per_second(app, "/api/v1/ping", JSON_REQUESTS)
+        stream_rps = await _requests_per_second(app, "/api/v1/stream", STREAM_REQUESTS)
+        print(f"{name:30s} JSON {json_rps:8,.0f} req/s   1 MB stream {stream_rps:8,.0f} req/s")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
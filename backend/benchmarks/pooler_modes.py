@@ -0,0 +1,69 @@
+"""
+Throughput of each DB_POOLER_MODE engine setup.
+
+    python -m benchmarks.pooler_modes DIRECT_URL [POOLED_URL]
+
+direct runs against DIRECT_URL; transaction and serverless against
+POOLED_URL (e.g. PgBouncer in transaction mode or Neon's -pooler host),
+or DIRECT_URL when no pooler is given, which isolates the client-side cost
+of each mode. Every session runs an aggregate query and a small select.
+"""
+import argparse
+import asyncio
+import time
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+from app.core.config import settings
+from app.db import base
+
+AGGREGATE = text(
+    "SELECT c.relkind::text, count(*), max(a.attnum) FROM pg_class c"
+    " JOIN pg_attribute a ON a.attrelid = c.oid"
+    " WHERE c.relname LIKE :prefix GROUP BY c.relkind"
+)
+SMALL = text("SELECT oid, relname FROM pg_class WHERE relname LIKE :prefix ORDER BY oid LIMIT 5")
+
+
+async def _sessions(engine: AsyncEngine, count: int) -> None:
+    for _ in range(count):
+        async with AsyncSession(engine) as session:
+            await session.execute(AGGREGATE, {"prefix": "pg_%"})
+            await session.execute(SMALL, {"prefix": "pg_%"})
+
+
+async def run(mode: str, url: str, workers: int, sessions: int) -> None:
+    settings.DB_POOLER_MODE = mode
+    engine = base._create_engine(url)
+    try:
+        await _sessions(engine, 20)  # Warm up connections and caches
+        started = time.perf_counter()
+        await asyncio.gather(*(_sessions(engine, sessions) for _ in range(workers)))
+        elapsed = time.perf_counter() - started
+        async with engine.connect() as conn:
+            prepared = (await conn.execute(text("SELECT count(*) FROM pg_prepared_statements"))).scalar()
+    finally:
+        await engine.dispose()
+    print(
+        f"{mode:12s} {workers * sessions / elapsed:8.0f} sessions/s"
+        f"  {prepared} prepared statements left on a server connection"
+    )
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("direct_url")
+    parser.add_argument("pooled_url", nargs="?")
+    parser.add_argument("--workers", type=int, default=10)
+    parser.add_argument("--sessions", type=int, default=100, help="sessions per worker")
+    args = parser.parse_args()
+
+    settings.DEBUG = False  # No statement echo
+    await run("direct", args.direct_url, args.workers, args.sessions)
+    for mode in ("transaction", "serverless"):
+        await run(mode, args.pooled_url or args.direct_url, args.workers, args.sessions)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
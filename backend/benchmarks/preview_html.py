@@ -0,0 +1,88 @@
+"""
+Time and peak memory of streaming a form preview.
+
+    python -m benchmarks.preview_html
+
+Renders a ~5 MB form with 2,000 audit entries in two shapes: many sections
+(135 top-level values) and one huge top-level value (a single 5 MB table),
+consuming the chunks as the preview endpoint does. Peak memory is what is
+held at once, so it should stay near the chunk size for both shapes.
+"""
+import json
+import random
+import time
+import tracemalloc
+from datetime import datetime
+from types import SimpleNamespace
+
+from app.services.pdf_service import pdf_export_service
+
+ROUNDS = 5
+
+
+def _node(depth: int, rng: random.Random):
+    if depth == 0:
+        return "".join(rng.choice("abcdefgh ") for _ in range(40))
+    return {
+        f"field_{i}": _node(depth - 1, rng) if i % 3 else [_node(depth - 2, rng) if depth > 1 else i for _ in range(3)]
+        for i in range(6)
+    }
+
+
+def _form(form_data):
+    user = SimpleNamespace(full_name="Ann Lee")
+    now = datetime.now()
+    return SimpleNamespace(
+        id="f", title="Vitals", form_type="vitals", version=1, status="approved", created_at=now,
+        creator=user, case_id="C-1", volunteer_id="V-1", study_number="S-1", period_number="1",
+        project=SimpleNamespace(name="Study"), submitted_at=now, approved_at=now, approver=user,
+        rejected_at=None, rejector=None, rejection_reason=None, review_comments="ok", form_data=form_data
+    )
+
+
+def _audit_logs():
+    user = SimpleNamespace(full_name="Ann Lee")
+    return [
+        SimpleNamespace(
+            user=user, created_at=datetime.now(), action="update", reason=None,
+            field_changes={"a": {"old": i, "new": i + 1}, "b": {"old": "x", "new": "y"}}
+        )
+        for i in range(2000)
+    ]
+
+
+def _render(form, audit_logs) -> int:
+    size = 0
+    for chunk in pdf_export_service._iter_form_html(form, audit_logs, "DRAFT"):
+        size += len(chunk)
+    return size
+
+
+def main() -> None:
+    rng = random.Random(1)
+    sections = {f"section_{i}": _node(4, rng) for i in range(135)}
+    shapes = {
+        "135 sections": sections,
+        "one 5 MB value": {"table": list(sections.values())},
+    }
+    audit_logs = _audit_logs()
+    for name, form_data in shapes.items():
+        form = _form(form_data)
+        size = _render(form, audit_logs)  # Warm up
+        started = time.perf_counter()
+        for _ in range(ROUNDS):
+            _render(form, audit_logs)
+        elapsed = (time.perf_counter() - started) / ROUNDS
+
+        tracemalloc.start()
+        _render(form, audit_logs)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        print(
+            f"{name:16s} form_data {len(json.dumps(form_data)) / 1e6:.1f} MB, html {size / 1e6:.1f} MB:"
+            f" {elapsed:.3f} s, peak {peak / 1e6:.1f} MB"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""Replace single-column audit_logs indexes with composite and BRIN indexes
+
+Revision ID: 20261019_audit_log_indexes
+Revises: 20261019_audit_rollup_hourly
+Create Date: 2026-10-19
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '20261019_audit_log_indexes'
+down_revision: Union[str, None] = '20261019_audit_rollup_hourly'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # audit_logs is large and written constantly, so build without blocking writes
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'idx_audit_logs_user_created', 'audit_logs',
+            ['user_id', sa.text('created_at DESC')],
+            postgresql_concurrently=True, if_not_exists=True
+        )
+        op.create_index(
+            'idx_audit_logs_form_created', 'audit_logs',
+            ['form_id', sa.text('created_at DESC')],
+            postgresql_concurrently=True, if_not_exists=True
+        )
+        op.create_index(
+            'idx_audit_logs_resource_created', 'audit_logs',
+            ['resource_type', 'resource_id', sa.text('created_at DESC')],
+            postgresql_concurrently=True, if_not_exists=True
+        )
+        op.create_index(
+            'idx_audit_logs_created_at_brin', 'audit_logs', ['created_at'],
+            postgresql_using='brin', postgresql_concurrently=True, if_not_exists=True
+        )
+
+        # Superseded by the composite indexes above (same leading columns)
+        op.drop_index('idx_audit_logs_user_id', table_name='audit_logs', postgresql_concurrently=True, if_exists=True)
+        op.drop_index('idx_audit_logs_form_id', table_name='audit_logs', postgresql_concurrently=True, if_exists=True)
+        op.drop_index('idx_audit_logs_resource', table_name='audit_logs', postgresql_concurrently=True, if_exists=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index('idx_audit_logs_user_id', 'audit_logs', ['user_id'], postgresql_concurrently=True, if_not_exists=True)
+        op.create_index('idx_audit_logs_form_id', 'audit_logs', ['form_id'], postgresql_concurrently=True, if_not_exists=True)
+        op.create_index(
+            'idx_audit_logs_resource', 'audit_logs', ['resource_type', 'resource_id'],
+            postgresql_concurrently=True, if_not_exists=True
+        )
+
+        op.drop_index('idx_audit_logs_created_at_brin', table_name='audit_logs', postgresql_concurrently=True, if_exists=True)
+        op.drop_index('idx_audit_logs_resource_created', table_name='audit_logs', postgresql_concurrently=True, if_exists=True)
+        op.drop_index('idx_audit_logs_form_created', table_name='audit_logs', postgresql_concurrently=True, if_exists=True)
+        op.drop_index('idx_audit_logs_user_created', table_name='audit_logs', postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,112 @@
+"""Add a searchable changed-path column and a reason full-text index to audit_logs
+
+Revision ID: 20261019_audit_log_search
+Revises: 20261019_audit_log_indexes
+Create Date: 2026-10-19
+
+"""
+from typing import Any, List, Optional, Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = '20261019_audit_log_search'
+down_revision: Union[str, None] = '20261019_audit_log_indexes'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+BACKFILL_BATCH_SIZE = 5000
+
+# Frozen copy of audit_service.DATA_ROOT_FIELDS / get_changed_paths, so the
+# backfill records the same paths the API writes for new entries
+DATA_ROOT_FIELDS = ("form_data",)
+
+
+def _changed_paths(field_changes: Any) -> Optional[List[str]]:
+    if not isinstance(field_changes, dict) or not field_changes:
+        return None
+
+    paths = set()
+
+    def walk(path: str, old: Any, new: Any) -> None:
+        paths.add(path)
+        for root in DATA_ROOT_FIELDS:
+            if path.startswith(f"{root}."):
+                paths.add(path[len(root) + 1:])
+
+        if isinstance(old, dict) or isinstance(new, dict):
+            old = old if isinstance(old, dict) else {}
+            new = new if isinstance(new, dict) else {}
+            for key in old.keys() | new.keys():
+                if old.get(key) != new.get(key):
+                    walk(f"{path}.{key}", old.get(key), new.get(key))
+
+    for field, change in field_changes.items():
+        if isinstance(change, dict) and ("old" in change or "new" in change):
+            walk(field, change.get("old"), change.get("new"))
+        else:
+            paths.add(field)
+
+    return sorted(paths)
+
+
+def upgrade() -> None:
+    # Nullable with no default: a catalog-only change, no table rewrite
+    op.add_column('audit_logs', sa.Column('changed_paths', postgresql.ARRAY(sa.Text()), nullable=True))
+
+    with op.get_context().autocommit_block():
+        # Backfill in id order, one committed batch at a time, so row locks
+        # are short and a failed run resumes where it stopped. Paths are
+        # computed in Python to match get_changed_paths, nested form fields
+        # included.
+        bind = op.get_bind()
+        select_batch = sa.text(
+            """
+            SELECT id, field_changes FROM audit_logs
+            WHERE changed_paths IS NULL
+              AND field_changes IS NOT NULL
+              AND (CAST(:last_id AS uuid) IS NULL OR id > CAST(:last_id AS uuid))
+            ORDER BY id
+            LIMIT :batch_size
+            """
+        ).columns(sa.column('id'), sa.column('field_changes', sa.JSON()))
+        update_paths = sa.text(
+            "UPDATE audit_logs SET changed_paths = :paths WHERE id = :id AND changed_paths IS NULL"
+        ).bindparams(sa.bindparam('paths', type_=postgresql.ARRAY(sa.Text())))
+
+        last_id = None
+        while True:
+            rows = bind.execute(select_batch, {"last_id": last_id, "batch_size": BACKFILL_BATCH_SIZE}).all()
+            if not rows:
+                break
+            updates = []
+            for row in rows:
+                paths = _changed_paths(row.field_changes)
+                if paths:
+                    updates.append({"id": row.id, "paths": paths})
+            if updates:
+                bind.execute(update_paths, updates)
+            last_id = rows[-1].id
+
+        op.create_index(
+            'idx_audit_logs_changed_paths', 'audit_logs', ['changed_paths'],
+            postgresql_using='gin', postgresql_concurrently=True, if_not_exists=True
+        )
+        # Expression index rather than a stored tsvector column: adding a
+        # generated column rewrites the whole table under ACCESS EXCLUSIVE
+        op.create_index(
+            'idx_audit_logs_reason_tsv', 'audit_logs',
+            [sa.text("to_tsvector('english', coalesce(reason, ''))")],
+            postgresql_using='gin', postgresql_concurrently=True, if_not_exists=True
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('idx_audit_logs_reason_tsv', table_name='audit_logs', postgresql_concurrently=True, if_exists=True)
+        op.drop_index('idx_audit_logs_changed_paths', table_name='audit_logs', postgresql_concurrently=True, if_exists=True)
+
+    op.drop_column('audit_logs', 'changed_paths')
@@ -0,0 +1,34 @@
+"""Add hourly audit rollup table
+
+Revision ID: 20261019_audit_rollup_hourly
+Revises: 20250612_initial
+Create Date: 2026-10-19
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = '20261019_audit_rollup_hourly'
+down_revision: Union[str, None] = '20250612_initial'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Hourly audit counts served by GET /audit/stats
+    op.create_table(
+        'audit_rollup_hourly',
+        sa.Column('bucket', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('action', sa.String(100), nullable=False),
+        sa.Column('user_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('count', sa.BigInteger(), nullable=False, server_default='0'),
+        sa.PrimaryKeyConstraint('bucket', 'action', 'user_id'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('audit_rollup_hourly')
@@ -0,0 +1,46 @@
+"""Add project assignment and user prefix-search indexes
+
+Revision ID: 20261019_project_user_indexes
+Revises: 20261019_audit_log_search
+Create Date: 2026-10-19
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '20261019_project_user_indexes'
+down_revision: Union[str, None] = '20261019_audit_log_search'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+PREFIX_INDEXES = {
+    'idx_users_email_prefix': 'email',
+    'idx_users_first_name_prefix': 'first_name',
+    'idx_users_last_name_prefix': 'last_name',
+}
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'idx_user_projects_project_user', 'user_projects', ['project_id', 'user_id'],
+            postgresql_concurrently=True, if_not_exists=True
+        )
+        for name, column in PREFIX_INDEXES.items():
+            op.create_index(
+                name, 'users', [sa.text(f'lower({column}) text_pattern_ops')],
+                postgresql_concurrently=True, if_not_exists=True
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name in PREFIX_INDEXES:
+            op.drop_index(name, table_name='users', postgresql_concurrently=True, if_exists=True)
+        op.drop_index(
+            'idx_user_projects_project_user', table_name='user_projects',
+            postgresql_concurrently=True, if_exists=True
+        )
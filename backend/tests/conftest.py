@@ -0,0 +1,39 @@
+import os
+from typing import AsyncIterator, List, Tuple
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.pool import NullPool
+
+# Tests that need PostgreSQL run against TEST_DATABASE_URL (its tables are
+# dropped and recreated) and are skipped when it isn't set
+TEST_DATABASE_URL = os.environ.get("TEST_DATABASE_URL")
+
+
+@pytest.fixture
+def test_database_url() -> str:
+    if not TEST_DATABASE_URL:
+        pytest.skip("TEST_DATABASE_URL is not set")
+    return TEST_DATABASE_URL
+
+
+@pytest.fixture
+async def pg_engine(test_database_url: str) -> AsyncIterator[AsyncEngine]:
+    engine = create_async_engine(test_database_url, poolclass=NullPool)
+    try:
+        yield engine
+    finally:
+        await engine.dispose()
+
+
+@pytest.fixture
+def statements(pg_engine: AsyncEngine) -> List[Tuple[str, tuple]]:
+    """(SQL, parameters) of every statement the engine executes from now on"""
+    executed: List[Tuple[str, tuple]] = []
+
+    @event.listens_for(pg_engine.sync_engine, "before_cursor_execute")
+    def record(conn, cursor, statement, parameters, context, executemany) -> None:
+        executed.append((statement, parameters))
+
+    return executed
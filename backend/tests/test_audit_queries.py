@@ -0,0 +1,152 @@
+"""
+The paginated audit endpoints must come back in order straight from their
+composite indexes, with no sort over a user's, project's or the whole
+table's history
+"""
+from datetime import datetime, timedelta, timezone
+from typing import List, Tuple
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+from app.api.endpoints import audit
+from app.core.security import User as SecurityUser
+from app.db.base import Base
+from app.models import unified_models  # noqa: F401  (registers the tables)
+
+ADMIN = SecurityUser(id="00000000-0000-0000-0000-000000000001", email="admin@example.com", role="admin")
+
+FIXTURE_SQL = [
+    """
+    INSERT INTO users (id, email, hashed_password, role, status)
+    SELECT ('00000000-0000-0000-0000-' || lpad(to_hex(g), 12, '0'))::uuid,
+           'user' || g || '@example.com', 'x', 'admin', 'active'
+    FROM generate_series(1, 200) g
+    """,
+    """
+    INSERT INTO projects (id, name, status, created_by)
+    SELECT ('00000000-0000-0000-0001-' || lpad(to_hex(g), 12, '0'))::uuid,
+           'Project ' || g, 'active', '00000000-0000-0000-0000-000000000001'
+    FROM generate_series(1, 20) g
+    """,
+    """
+    INSERT INTO forms (id, form_type, title, form_data, status, project_id, created_by)
+    SELECT ('00000000-0000-0000-0002-' || lpad(to_hex(g), 12, '0'))::uuid,
+           'screening', 'Form ' || g, '{}', 'draft',
+           ('00000000-0000-0000-0001-' || lpad(to_hex(g % 20 + 1), 12, '0'))::uuid,
+           '00000000-0000-0000-0000-000000000001'
+    FROM generate_series(1, 500) g
+    """,
+    # 100k entries over ~4 months: form edits, project changes, user events
+    """
+    INSERT INTO audit_logs (action, resource_type, resource_id, user_id, form_id, created_at)
+    SELECT CASE g % 3 WHEN 0 THEN 'update' WHEN 1 THEN 'create' ELSE 'approve' END,
+           kind,
+           CASE kind
+               WHEN 'form' THEN ('00000000-0000-0000-0002-' || lpad(to_hex(g % 500 + 1), 12, '0'))::uuid
+               WHEN 'project' THEN ('00000000-0000-0000-0001-' || lpad(to_hex(g % 20 + 1), 12, '0'))::uuid
+               ELSE ('00000000-0000-0000-0000-' || lpad(to_hex(g % 200 + 1), 12, '0'))::uuid
+           END,
+           ('00000000-0000-0000-0000-' || lpad(to_hex(g % 200 + 1), 12, '0'))::uuid,
+           CASE WHEN kind = 'form'
+                THEN ('00000000-0000-0000-0002-' || lpad(to_hex(g % 500 + 1), 12, '0'))::uuid END,
+           now() - make_interval(mins => g)
+    FROM generate_series(1, 100000) g,
+         LATERAL (SELECT CASE WHEN g % 10 < 8 THEN 'form' WHEN g % 10 = 8 THEN 'project' ELSE 'user' END AS kind) k
+    """,
+]
+
+
+@pytest.fixture
+async def audit_db(pg_engine: AsyncEngine, statements) -> AsyncSession:
+    tables = [Base.metadata.tables[name] for name in ("users", "projects", "user_projects", "forms", "audit_logs")]
+    async with pg_engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all, tables=tables)
+        await conn.run_sync(Base.metadata.create_all, tables=tables)
+        for sql in FIXTURE_SQL:
+            await conn.execute(text(sql))
+    async with pg_engine.connect() as conn:
+        await conn.execute(text("COMMIT"))
+        await conn.execute(text("ANALYZE"))
+    statements.clear()
+    async with AsyncSession(pg_engine) as session:
+        yield session
+
+
+async def _ordered_audit_plans(session: AsyncSession, statements) -> List[List[str]]:
+    """EXPLAIN of each ordered audit_logs query the endpoint ran, with its parameters"""
+    executed: List[Tuple[str, tuple]] = [
+        (sql, params) for sql, params in statements
+        if "FROM audit_logs" in sql and "ORDER BY" in sql and not sql.startswith("EXPLAIN")
+    ]
+    assert executed, "the endpoint ran no ordered audit_logs query"
+    plans = []
+    for sql, params in executed:
+        result = await session.connection()
+        rows = await result.exec_driver_sql("EXPLAIN " + sql, params)
+        plans.append([row[0] for row in rows])
+    return plans
+
+
+def _assert_index_ordered(plan: List[str], index: str) -> None:
+    rendered = "\n".join(plan)
+    assert f"Index Scan using {index}" in rendered or f"Index Scan Backward using {index}" in rendered, rendered
+    assert "Sort" not in rendered, rendered
+
+
+USER_ID = "00000000-0000-0000-0000-000000000007"
+PROJECT_ID = "00000000-0000-0000-0001-000000000003"
+FORM_ID = "00000000-0000-0000-0002-000000000011"
+
+
+async def test_audit_list_is_index_ordered(audit_db, statements):
+    await audit.get_audit_logs(
+        db=audit_db, current_user=ADMIN, page=3, limit=50, resource_type=None, resource_id=None,
+        user_id=None, action=None, date_from=None, date_to=None
+    )
+    for plan in await _ordered_audit_plans(audit_db, statements):
+        _assert_index_ordered(plan, "idx_audit_logs_created_at")
+
+
+async def test_audit_list_by_user_uses_user_index(audit_db, statements):
+    await audit.get_audit_logs(
+        db=audit_db, current_user=ADMIN, page=1, limit=50, resource_type=None, resource_id=None,
+        user_id=USER_ID, action=None, date_from=None, date_to=None
+    )
+    for plan in await _ordered_audit_plans(audit_db, statements):
+        _assert_index_ordered(plan, "idx_audit_logs_user_created")
+
+
+async def test_user_trail_is_index_ordered(audit_db, statements):
+    date_to = datetime.now(timezone.utc) - timedelta(days=7)
+    for date_from in (None, date_to - timedelta(days=30)):
+        statements.clear()
+        await audit.get_user_audit_trail(
+            user_id=USER_ID, db=audit_db, current_user=ADMIN, page=2, limit=50,
+            date_from=date_from, date_to=date_to
+        )
+        for plan in await _ordered_audit_plans(audit_db, statements):
+            _assert_index_ordered(plan, "idx_audit_logs_user_created")
+
+
+async def test_project_trail_is_index_ordered(audit_db, statements):
+    await audit.get_project_audit_trail(
+        project_id=PROJECT_ID, db=audit_db, current_user=ADMIN, page=1, limit=50,
+        date_from=None, date_to=None
+    )
+    for plan in await _ordered_audit_plans(audit_db, statements):
+        _assert_index_ordered(plan, "idx_audit_logs_resource_created")
+
+
+async def test_form_trail_reads_only_the_form_index(audit_db, statements):
+    # The form trail isn't paginated, so for a few hundred entries the
+    # planner rightly prefers a bitmap scan plus an in-memory sort of just
+    # this form's rows over an ordered index scan; only the index is required
+    await audit.get_form_audit_trail(
+        form_id=FORM_ID, db=audit_db, current_user=ADMIN, date_from=None, date_to=None
+    )
+    for plan in await _ordered_audit_plans(audit_db, statements):
+        rendered = "\n".join(plan)
+        assert "idx_audit_logs_form_created" in rendered, rendered
+        assert "Seq Scan" not in rendered, rendered
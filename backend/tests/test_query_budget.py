@@ -0,0 +1,82 @@
+import json
+import logging
+
+import pytest
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import create_engine, text
+
+from app.core.config import settings
+from app.core.middleware import APIMiddleware
+from app.db.instrumentation import assert_query_budget, query_budget
+
+# Statements are counted by engine events on every Engine, so an in-memory
+# SQLite engine is enough to exercise the budgets without PostgreSQL
+engine = create_engine("sqlite://")
+
+
+def _run_statements(count: int) -> None:
+    with engine.connect() as conn:
+        for n in range(count):
+            conn.execute(text("SELECT :n"), {"n": n})
+
+
+def test_assert_query_budget_within_budget():
+    with assert_query_budget(3) as stats:
+        _run_statements(3)
+    assert stats.count == 3
+
+
+def test_assert_query_budget_over_budget():
+    with pytest.raises(AssertionError, match="block executed 3 SQL statements, budget is 2"):
+        with assert_query_budget(2):
+            _run_statements(3)
+
+
+def _app() -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(APIMiddleware, instrument_sql=True)
+
+    @app.get("/within")
+    @query_budget(2)
+    async def within():
+        _run_statements(2)
+        return {"ok": True}
+
+    @app.get("/over")
+    @query_budget(1)
+    async def over():
+        _run_statements(3)
+        return {"ok": True}
+
+    return app
+
+
+async def _get(path: str):
+    async with AsyncClient(transport=ASGITransport(app=_app()), base_url="http://test") as client:
+        return await client.get(path)
+
+
+async def test_strict_budget_replaces_the_response(monkeypatch):
+    monkeypatch.setattr(settings, "SQL_QUERY_BUDGET_STRICT", True)
+
+    response = await _get("/within")
+    assert response.status_code == 200
+
+    response = await _get("/over")
+    assert response.status_code == 500
+    assert response.headers["x-query-budget"] == "exceeded"
+    assert "GET /over executed 3 SQL statements, budget is 1" in response.text
+    # Security headers still go out on the replacement response
+    assert response.headers["x-content-type-options"] == "nosniff"
+
+
+async def test_budget_overrun_is_logged_when_not_strict(monkeypatch, caplog):
+    monkeypatch.setattr(settings, "SQL_QUERY_BUDGET_STRICT", False)
+
+    with caplog.at_level(logging.WARNING, logger="app.core.middleware"):
+        response = await _get("/over")
+
+    assert response.status_code == 200
+    records = [json.loads(record.getMessage()) for record in caplog.records]
+    assert [(r["path"], r["queries"], r["query_budget"]) for r in records] == [("/over", 3, 1)]
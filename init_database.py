@@ -16,7 +16,7 @@ from sqlalchemy.ext.asyncio import create_async_engine
 from sqlalchemy import text
 from app.db.base import Base
 from app.models.unified_models import User, UserRole, UserStatus
-from app.core.security import get_password_hash
+from app.core.security import password_hasher
 from app.core.config import settings
 
 
@@ -100,7 +100,7 @@ async def seed_test_users():
                     """),
                     {
                         "email": user_data["email"],
-                        "password": get_password_hash(user_data["password"]),
+                        "password": await password_hasher.hash(user_data["password"]),
                         "first_name": user_data["first_name"],
                         "last_name": user_data["last_name"],
                         "role": user_data["role"],
@@ -117,7 +117,7 @@ async def seed_test_users():
                     """),
                     {
                         "email": user_data["email"],
-                        "password": get_password_hash(user_data["password"]),
+                        "password": await password_hasher.hash(user_data["password"]),
                         "first_name": user_data["first_name"],
                         "last_name": user_data["last_name"],
                         "role": user_data["role"],
@@ -9,7 +9,9 @@ from sqlalchemy.ext.asyncio import AsyncEngine
 # Import your models here
 from app.db.base import Base
 from app.models.volunteer import Volunteer
+from app.models.template_blob import TemplateBlob
 from app.models.form_template import FormTemplate
+from app.models.template_schema import TemplateSchema
 from app.models.form import Form
 from app.models.change_log import ChangeLog
 
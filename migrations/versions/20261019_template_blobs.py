@@ -0,0 +1,90 @@
+"""Store template content in content-addressed blobs
+
+Revision ID: template_blobs
+Revises: add_volunteer_fields
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+import hashlib
+import json
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = 'template_blobs'
+down_revision = 'add_volunteer_fields'
+branch_labels = None
+depends_on = None
+
+CONTENT_COLUMNS = ('sections', 'side_headers', 'logic')
+
+
+def _hash(content: dict) -> tuple:
+    # Must match app.services.template_blob.canonical_content
+    encoded = json.dumps(
+        content, sort_keys=True, separators=(',', ':'), ensure_ascii=False
+    ).encode('utf-8')
+    return hashlib.sha256(encoded).hexdigest(), len(encoded)
+
+
+def upgrade() -> None:
+    op.create_table(
+        'template_blobs',
+        sa.Column('content_hash', sa.String(64), primary_key=True),
+        sa.Column('sections', postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+        sa.Column('side_headers', postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+        sa.Column('logic', postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+        sa.Column('size', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    )
+    op.add_column('form_templates', sa.Column('content_hash', sa.String(64), nullable=True))
+
+    # The hash is of Python's canonical JSON, so the backfill runs here
+    # rather than in SQL
+    connection = op.get_bind()
+    blobs = sa.table(
+        'template_blobs',
+        sa.column('content_hash', sa.String),
+        sa.column('sections', postgresql.JSONB(none_as_null=True)),
+        sa.column('side_headers', postgresql.JSONB(none_as_null=True)),
+        sa.column('logic', postgresql.JSONB(none_as_null=True)),
+        sa.column('size', sa.Integer),
+    )
+    rows = connection.execute(
+        sa.text('SELECT id, sections, side_headers, logic FROM form_templates')
+    ).mappings().all()
+    stored = set()
+    for row in rows:
+        content = {column: row[column] for column in CONTENT_COLUMNS}
+        content_hash, size = _hash(content)
+        if content_hash not in stored:
+            connection.execute(blobs.insert().values(content_hash=content_hash, size=size, **content))
+            stored.add(content_hash)
+        connection.execute(
+            sa.text('UPDATE form_templates SET content_hash = :hash WHERE id = :id'),
+            {'hash': content_hash, 'id': row['id']},
+        )
+
+    op.alter_column('form_templates', 'content_hash', nullable=False)
+    op.create_foreign_key(
+        'form_templates_content_hash_fkey', 'form_templates', 'template_blobs',
+        ['content_hash'], ['content_hash'],
+    )
+    op.create_index(op.f('ix_form_templates_content_hash'), 'form_templates', ['content_hash'], unique=False)
+    for column in CONTENT_COLUMNS:
+        op.drop_column('form_templates', column)
+
+
+def downgrade() -> None:
+    for column in CONTENT_COLUMNS:
+        op.add_column('form_templates', sa.Column(column, postgresql.JSONB(astext_type=sa.Text()), nullable=True))
+    op.execute(
+        'UPDATE form_templates SET sections = b.sections, side_headers = b.side_headers, logic = b.logic '
+        'FROM template_blobs b WHERE b.content_hash = form_templates.content_hash'
+    )
+    op.drop_index(op.f('ix_form_templates_content_hash'), table_name='form_templates')
+    op.drop_constraint('form_templates_content_hash_fkey', 'form_templates', type_='foreignkey')
+    op.drop_column('form_templates', 'content_hash')
+    op.drop_table('template_blobs')
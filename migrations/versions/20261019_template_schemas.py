@@ -0,0 +1,31 @@
+"""Store the published JSON Schema of each template version
+
+Revision ID: template_schemas
+Revises: template_blobs
+Create Date: 2026-10-19 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = 'template_schemas'
+down_revision = 'template_blobs'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'template_schemas',
+        sa.Column('template_id', postgresql.UUID(as_uuid=True), sa.ForeignKey('form_templates.id', ondelete='CASCADE'), primary_key=True),
+        sa.Column('version', sa.Integer(), primary_key=True),
+        sa.Column('content_hash', sa.String(64), nullable=False),
+        sa.Column('document', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('template_schemas')
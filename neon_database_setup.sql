@@ -83,7 +83,9 @@ CREATE TABLE IF NOT EXISTS audit_logs (
     old_values JSONB,
     new_values JSONB,
     field_changes JSONB,
+    changed_paths TEXT[],  -- Dotted paths of every changed field, for search
     reason TEXT,
+    reason_tsv TSVECTOR GENERATED ALWAYS AS (to_tsvector('english', coalesce(reason, ''))) STORED,
     ip_address VARCHAR(45),
     user_agent TEXT,
     session_id VARCHAR(100),
@@ -92,6 +94,15 @@ CREATE TABLE IF NOT EXISTS audit_logs (
     created_at TIMESTAMPTZ DEFAULT NOW() NOT NULL
 );
 
+-- Hourly audit counts, rolled up from audit_logs by the API (serves /audit/stats)
+CREATE TABLE IF NOT EXISTS audit_rollup_hourly (
+    bucket TIMESTAMPTZ NOT NULL,
+    action VARCHAR(100) NOT NULL,
+    user_id UUID NOT NULL,  -- Nil UUID for system actions
+    count BIGINT NOT NULL DEFAULT 0,
+    PRIMARY KEY (bucket, action, user_id)
+);
+
 -- ================================================================
 -- EXTENDED TABLES FOR COMPLETE EDC FUNCTIONALITY
 -- ================================================================
@@ -231,6 +242,12 @@ CREATE TABLE IF NOT EXISTS system_settings (
 CREATE INDEX IF NOT EXISTS idx_users_email ON users(email);
 CREATE INDEX IF NOT EXISTS idx_users_role ON users(role);
 CREATE INDEX IF NOT EXISTS idx_users_status ON users(status);
+CREATE INDEX IF NOT EXISTS idx_users_email_prefix ON users(lower(email) text_pattern_ops);
+CREATE INDEX IF NOT EXISTS idx_users_first_name_prefix ON users(lower(first_name) text_pattern_ops);
+CREATE INDEX IF NOT EXISTS idx_users_last_name_prefix ON users(lower(last_name) text_pattern_ops);
+
+-- Assignment indexes (the primary key leads with user_id)
+CREATE INDEX IF NOT EXISTS idx_user_projects_project_user ON user_projects(project_id, user_id);
 
 -- Project indexes
 CREATE INDEX IF NOT EXISTS idx_projects_status ON projects(status);
@@ -246,11 +263,14 @@ CREATE INDEX IF NOT EXISTS idx_forms_created_by ON forms(created_by);
 CREATE INDEX IF NOT EXISTS idx_forms_submitted_at ON forms(submitted_at);
 
 -- Audit log indexes
-CREATE INDEX IF NOT EXISTS idx_audit_logs_user_id ON audit_logs(user_id);
-CREATE INDEX IF NOT EXISTS idx_audit_logs_resource ON audit_logs(resource_type, resource_id);
+CREATE INDEX IF NOT EXISTS idx_audit_logs_user_created ON audit_logs(user_id, created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_audit_logs_form_created ON audit_logs(form_id, created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_audit_logs_resource_created ON audit_logs(resource_type, resource_id, created_at DESC);
 CREATE INDEX IF NOT EXISTS idx_audit_logs_action ON audit_logs(action);
 CREATE INDEX IF NOT EXISTS idx_audit_logs_created_at ON audit_logs(created_at);
-CREATE INDEX IF NOT EXISTS idx_audit_logs_form_id ON audit_logs(form_id);
+CREATE INDEX IF NOT EXISTS idx_audit_logs_created_at_brin ON audit_logs USING BRIN (created_at);
+CREATE INDEX IF NOT EXISTS idx_audit_logs_changed_paths ON audit_logs USING GIN (changed_paths);
+CREATE INDEX IF NOT EXISTS idx_audit_logs_reason_tsv ON audit_logs USING GIN (reason_tsv);
 
 -- Form template indexes
 CREATE INDEX IF NOT EXISTS idx_form_templates_project_id ON form_templates(project_id);